@@ -0,0 +1,57 @@
+"""add denormalized reserved counter to slots
+
+Revision ID: 002
+Revises: 001
+Create Date: 2025-02-03 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "002"
+down_revision = "001"
+branch_labels = None
+depends_on = None
+
+# バックフィル1回あたりのスロットID範囲
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def upgrade():
+    op.add_column(
+        "slots",
+        sa.Column("reserved", sa.Integer(), nullable=False, server_default="0"),
+        schema="yoga_reserve",
+    )
+
+    # 確定予約数をチャンク単位でバックフィル（チャンクごとにコミットしてロックを短く保つ）
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        min_id, max_id = bind.execute(
+            sa.text("SELECT min(id), max(id) FROM yoga_reserve.slots")
+        ).one()
+        if min_id is None:
+            return
+
+        for start in range(min_id, max_id + 1, BACKFILL_CHUNK_SIZE):
+            bind.execute(
+                sa.text("""
+                    UPDATE yoga_reserve.slots AS s
+                    SET reserved = c.reserved
+                    FROM (
+                        SELECT slot_id, count(*) AS reserved
+                        FROM yoga_reserve.bookings
+                        WHERE status = 'confirmed'
+                          AND slot_id BETWEEN :start AND :end
+                        GROUP BY slot_id
+                    ) AS c
+                    WHERE s.id = c.slot_id
+                    """),
+                {"start": start, "end": start + BACKFILL_CHUNK_SIZE - 1},
+            )
+
+
+def downgrade():
+    op.drop_column("slots", "reserved", schema="yoga_reserve")
@@ -0,0 +1,195 @@
+"""add indexes for booking hot paths
+
+Revision ID: 003
+Revises: 002
+Create Date: 2025-02-10 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "003"
+down_revision = "002"
+branch_labels = None
+depends_on = None
+
+
+SLOT_KEY_INDEX = "uq_yoga_reserve_slots_service_id_date_start_time"
+
+
+def _drop_invalid_index(name: str) -> None:
+    """前回の CREATE INDEX CONCURRENTLY が失敗して残った INVALID なインデックスを削除する
+
+    残したままだと if_not_exists で作成が飛ばされ、使われないインデックスが残る
+    """
+    invalid = (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT 1 FROM pg_index i "
+                "JOIN pg_class c ON c.oid = i.indexrelid "
+                "JOIN pg_namespace n ON n.oid = c.relnamespace "
+                "WHERE n.nspname = 'yoga_reserve' AND c.relname = :name "
+                "AND NOT i.indisvalid"
+            ),
+            {"name": name},
+        )
+        .scalar()
+    )
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY yoga_reserve.{name}")
+
+
+def _constraint_exists(name: str) -> bool:
+    return (
+        op.get_bind()
+        .execute(
+            sa.text(
+                "SELECT 1 FROM pg_constraint "
+                "WHERE conname = :name "
+                "AND connamespace = 'yoga_reserve'::regnamespace"
+            ),
+            {"name": name},
+        )
+        .scalar()
+        is not None
+    )
+
+
+def upgrade():
+    # 一意インデックスを作れるよう、重複スロットは id が最小のものに予約を寄せて削除する
+    op.execute("""
+        UPDATE yoga_reserve.bookings AS b
+        SET slot_id = d.keep_id
+        FROM (
+            SELECT id, min(id) OVER (
+                PARTITION BY service_id, date, start_time
+            ) AS keep_id
+            FROM yoga_reserve.slots
+        ) AS d
+        WHERE b.slot_id = d.id AND d.id <> d.keep_id
+        """)
+    op.execute("""
+        UPDATE yoga_reserve.slots AS s
+        SET capacity = d.capacity,
+            reserved = (
+                SELECT count(*)
+                FROM yoga_reserve.bookings AS b
+                WHERE b.slot_id = s.id AND b.status = 'confirmed'
+            )
+        FROM (
+            SELECT min(id) AS keep_id, max(capacity) AS capacity
+            FROM yoga_reserve.slots
+            GROUP BY service_id, date, start_time
+            HAVING count(*) > 1
+        ) AS d
+        WHERE s.id = d.keep_id
+        """)
+    op.execute("""
+        DELETE FROM yoga_reserve.slots AS s
+        USING (
+            SELECT id, min(id) OVER (
+                PARTITION BY service_id, date, start_time
+            ) AS keep_id
+            FROM yoga_reserve.slots
+        ) AS d
+        WHERE s.id = d.id AND d.id <> d.keep_id
+        """)
+
+    # CREATE INDEX CONCURRENTLY はトランザクション外で実行する必要がある
+    with op.get_context().autocommit_block():
+        # スロット検索 (service_id, date, start_time) は一意制約で担保
+        # （再実行時は制約に変換済みのインデックスをそのまま使う）
+        if not _constraint_exists(SLOT_KEY_INDEX):
+            _drop_invalid_index(SLOT_KEY_INDEX)
+            op.create_index(
+                SLOT_KEY_INDEX,
+                "slots",
+                ["service_id", "date", "start_time"],
+                unique=True,
+                schema="yoga_reserve",
+                postgresql_concurrently=True,
+                if_not_exists=True,
+            )
+            op.execute(
+                f"ALTER TABLE yoga_reserve.slots "
+                f"ADD CONSTRAINT {SLOT_KEY_INDEX} UNIQUE USING INDEX {SLOT_KEY_INDEX}"
+            )
+
+        # スロットごとの確定予約数の集計
+        _drop_invalid_index("ix_yoga_reserve_bookings_slot_id_confirmed")
+        op.create_index(
+            "ix_yoga_reserve_bookings_slot_id_confirmed",
+            "bookings",
+            ["slot_id"],
+            schema="yoga_reserve",
+            postgresql_where=sa.text("status = 'confirmed'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        # /bookings/mine の絞り込みと並び順
+        # (date, start_time, id) の行値比較と並び順をインデックスだけで解決できるよう id を末尾に含める
+        _drop_invalid_index("ix_yoga_reserve_bookings_user_id_date_start_time_id")
+        op.create_index(
+            "ix_yoga_reserve_bookings_user_id_date_start_time_id",
+            "bookings",
+            ["user_id", "date", "start_time", "id"],
+            schema="yoga_reserve",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        # /admin/bookings の並び順
+        _drop_invalid_index("ix_yoga_reserve_bookings_date_start_time_id")
+        op.create_index(
+            "ix_yoga_reserve_bookings_date_start_time_id",
+            "bookings",
+            ["date", "start_time", "id"],
+            schema="yoga_reserve",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+        # 以前の版の 003 が作成した id なしのインデックスは上の2つで置き換わる
+        for legacy in (
+            "ix_yoga_reserve_bookings_user_id_date_start_time",
+            "ix_yoga_reserve_bookings_date_start_time",
+        ):
+            op.drop_index(
+                legacy,
+                table_name="bookings",
+                schema="yoga_reserve",
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_yoga_reserve_bookings_date_start_time_id",
+            table_name="bookings",
+            schema="yoga_reserve",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_yoga_reserve_bookings_user_id_date_start_time_id",
+            table_name="bookings",
+            schema="yoga_reserve",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_yoga_reserve_bookings_slot_id_confirmed",
+            table_name="bookings",
+            schema="yoga_reserve",
+            postgresql_concurrently=True,
+        )
+        op.drop_constraint(
+            SLOT_KEY_INDEX,
+            "slots",
+            type_="unique",
+            schema="yoga_reserve",
+        )
@@ -0,0 +1,52 @@
+"""add schedule templates
+
+Revision ID: 005
+Revises: 003
+Create Date: 2025-03-03 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "005"
+down_revision = "003"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "schedule_templates",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("service_id", sa.Integer(), nullable=False),
+        sa.Column("weekdays", postgresql.ARRAY(sa.Integer()), nullable=False),
+        sa.Column("start_times", postgresql.ARRAY(sa.Time()), nullable=False),
+        sa.Column("capacity", sa.Integer(), nullable=False),
+        sa.Column("valid_from", sa.Date(), nullable=False),
+        sa.Column("valid_to", sa.Date(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["service_id"],
+            ["yoga_reserve.services.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        schema="yoga_reserve",
+    )
+    op.create_index(
+        "ix_yoga_reserve_schedule_templates_id",
+        "schedule_templates",
+        ["id"],
+        schema="yoga_reserve",
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_yoga_reserve_schedule_templates_id",
+        table_name="schedule_templates",
+        schema="yoga_reserve",
+    )
+    op.drop_table("schedule_templates", schema="yoga_reserve")
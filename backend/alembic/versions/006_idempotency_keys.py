@@ -0,0 +1,84 @@
+"""add idempotency keys and unique confirmed booking per user and slot
+
+Revision ID: 006
+Revises: 005
+Create Date: 2025-03-10 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "idempotency_keys",
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("key", sa.String(length=255), nullable=False),
+        sa.Column("request_hash", sa.String(length=64), nullable=False),
+        sa.Column("status_code", sa.Integer(), nullable=False),
+        sa.Column("response", postgresql.JSONB(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["yoga_reserve.users.id"],
+        ),
+        sa.PrimaryKeyConstraint("user_id", "key"),
+        schema="yoga_reserve",
+    )
+
+    # 既存の重複予約は最初の1件を残してキャンセルし、予約数カウンタを戻す
+    op.execute("""
+        WITH duplicates AS (
+            UPDATE yoga_reserve.bookings AS b
+            SET status = 'cancelled', updated_at = now()
+            FROM (
+                SELECT id, row_number() OVER (
+                    PARTITION BY user_id, slot_id ORDER BY id
+                ) AS position
+                FROM yoga_reserve.bookings
+                WHERE status = 'confirmed'
+            ) AS d
+            WHERE b.id = d.id AND d.position > 1
+            RETURNING b.slot_id
+        )
+        UPDATE yoga_reserve.slots AS s
+        SET reserved = s.reserved - c.cancelled
+        FROM (
+            SELECT slot_id, count(*) AS cancelled
+            FROM duplicates
+            GROUP BY slot_id
+        ) AS c
+        WHERE s.id = c.slot_id
+        """)
+
+    # CREATE INDEX CONCURRENTLY はトランザクション外で実行する必要がある
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "uq_yoga_reserve_bookings_user_id_slot_id_confirmed",
+            "bookings",
+            ["user_id", "slot_id"],
+            unique=True,
+            schema="yoga_reserve",
+            postgresql_where=sa.text("status = 'confirmed'"),
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "uq_yoga_reserve_bookings_user_id_slot_id_confirmed",
+            table_name="bookings",
+            schema="yoga_reserve",
+            postgresql_concurrently=True,
+        )
+    op.drop_table("idempotency_keys", schema="yoga_reserve")
@@ -0,0 +1,56 @@
+"""add per-slot waitlist
+
+Revision ID: 007
+Revises: 006
+Create Date: 2025-03-17 10:00:00.000000
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "waitlist_entries",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("slot_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["slot_id"],
+            ["yoga_reserve.slots.id"],
+        ),
+        sa.ForeignKeyConstraint(
+            ["user_id"],
+            ["yoga_reserve.users.id"],
+        ),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint(
+            "slot_id",
+            "user_id",
+            name="uq_yoga_reserve_waitlist_entries_slot_id_user_id",
+        ),
+        schema="yoga_reserve",
+    )
+    op.create_index(
+        "ix_yoga_reserve_waitlist_entries_slot_id_id",
+        "waitlist_entries",
+        ["slot_id", "id"],
+        schema="yoga_reserve",
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_yoga_reserve_waitlist_entries_slot_id_id",
+        table_name="waitlist_entries",
+        schema="yoga_reserve",
+    )
+    op.drop_table("waitlist_entries", schema="yoga_reserve")
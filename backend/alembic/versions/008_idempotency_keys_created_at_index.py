@@ -0,0 +1,38 @@
+"""index idempotency keys by created_at for purging expired keys
+
+Revision ID: 008
+Revises: 007
+Create Date: 2025-03-24 10:00:00.000000
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CREATE INDEX CONCURRENTLY はトランザクション外で実行する必要がある
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_yoga_reserve_idempotency_keys_created_at",
+            "idempotency_keys",
+            ["created_at"],
+            schema="yoga_reserve",
+            postgresql_concurrently=True,
+            if_not_exists=True,
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_yoga_reserve_idempotency_keys_created_at",
+            table_name="idempotency_keys",
+            schema="yoga_reserve",
+            postgresql_concurrently=True,
+        )
@@ -1,19 +1,34 @@
-from fastapi import Depends, HTTPException, status
+import secrets
+from datetime import datetime
+from typing import Optional
+from fastapi import Depends, Header, HTTPException, Query, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
-from app.db.database import get_db
+from app.core.config import get_settings
 from app.core.security import decode_token
-from app.models.models import User
+from app.core.token_cache import token_cache
+from app.models.models import BookingStatus
+from app.queries.bookings import decode_cursor
+from app.repositories.base import Repository
+from app.repositories.factory import get_repository, open_read_repository
+from app.schemas.schemas import UserResponse
 
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db),
-) -> User:
-    """現在のユーザーを取得"""
+    repo: Repository = Depends(get_repository),
+) -> UserResponse:
+    """現在のユーザーを取得
+
+    検証済みトークンはキャッシュし、同じトークンでの再デコードとユーザー検索を省略する
+    """
     token = credentials.credentials
+    cached = token_cache.get(token)
+    if cached is not None:
+        _claims, current_user = cached
+        return current_user
+
     payload = decode_token(token)
 
     if payload is None:
@@ -42,13 +57,63 @@ def get_current_user(
             detail="Could not validate credentials",
         )
 
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await repo.get_user(user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
         )
 
-    return user
+    current_user = UserResponse(id=user.id, name=user.name, email=user.email)
+    token_cache.set(token, (payload, current_user), payload["exp"])
+    return current_user
+
+
+async def get_current_admin(
+    current_user: UserResponse = Depends(get_current_user),
+) -> UserResponse:
+    """管理者ユーザーを取得（ADMIN_EMAILS に含まれないユーザーは403）"""
+    if not get_settings().is_admin(current_user.email):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required",
+        )
+    return current_user
+
+
+async def get_user_read_repository(
+    current_user: UserResponse = Depends(get_current_user),
+    x_last_write: Optional[str] = Header(None),
+):
+    """ログインユーザーの読み取り用リポジトリを取得
+
+    予約・キャンセルの直後はレプリカが追いついていない可能性があるため、プライマリから読む
+    （書き込みのレスポンスの X-Last-Write をクライアントが送り返せば、別のワーカーでも効く）
+    """
+    async with open_read_repository(current_user.id, x_last_write) as repository:
+        yield repository
+
+
+def require_internal_access(
+    x_internal_token: Optional[str] = Header(None),
+) -> None:
+    """/internal/* のアクセス制御
+
+    INTERNAL_API_TOKEN を設定していれば X-Internal-Token ヘッダーの一致を求める。
+    未設定なら local / mock 環境でのみ許可し、それ以外では存在しないものとして404を返す
+    """
+    settings = get_settings()
+    if settings.is_internal_api_open():
+        return
+
+    if not settings.INTERNAL_API_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+
+    if x_internal_token is None or not secrets.compare_digest(
+        x_internal_token.encode(), settings.INTERNAL_API_TOKEN.encode()
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Invalid internal token"
+        )
 
 
 def verify_refresh_token(token: str) -> int:
@@ -87,3 +152,65 @@ def verify_refresh_token(token: str) -> int:
         )
 
     return user_id
+
+
+class BookingFilterParams:
+    """予約一覧・エクスポートの絞り込み条件"""
+
+    def __init__(
+        self,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        service_id: Optional[int] = None,
+        status_filter: Optional[BookingStatus] = Query(None, alias="status"),
+    ):
+        try:
+            self.date_from = (
+                datetime.strptime(date_from, "%Y-%m-%d").date() if date_from else None
+            )
+            self.date_to = (
+                datetime.strptime(date_to, "%Y-%m-%d").date() if date_to else None
+            )
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid date format. Use YYYY-MM-DD",
+            )
+
+        self.service_id = service_id
+        self.status = status_filter
+
+    def as_filters(self) -> dict:
+        return {
+            "date_from": self.date_from,
+            "date_to": self.date_to,
+            "service_id": self.service_id,
+            "status": self.status,
+        }
+
+
+class BookingListParams(BookingFilterParams):
+    """予約一覧のページング・絞り込み条件"""
+
+    def __init__(
+        self,
+        limit: int = Query(50, ge=1, le=200),
+        cursor: Optional[str] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        service_id: Optional[int] = None,
+        status_filter: Optional[BookingStatus] = Query(None, alias="status"),
+    ):
+        super().__init__(date_from, date_to, service_id, status_filter)
+
+        try:
+            self.cursor = decode_cursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+
+        self.limit = limit
+
+    def as_filters(self) -> dict:
+        return {**super().as_filters(), "limit": self.limit, "cursor": self.cursor}
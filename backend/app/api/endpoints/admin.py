@@ -1,31 +1,278 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.db.database import get_db
-from app.schemas.schemas import AdminBookingDetail
-from app.models.models import Booking
+import csv
+import io
+import json
+from datetime import datetime
+from typing import Literal
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from app.schemas.schemas import (
+    AdminBookingPage,
+    ScheduleTemplateCreate,
+    ScheduleTemplateResponse,
+    SlotGenerationResponse,
+)
+from app.api.deps import BookingFilterParams, BookingListParams
+from app.cache.availability import notify_days_changed, slot_changed
+from app.cache.service_catalog import service_catalog
+from app.queries.schedules import expand_template
+from app.core.query_budget import query_budget
+from app.repositories.base import Repository
+from app.repositories.factory import get_read_repository, get_repository
 
 router = APIRouter()
 
+# 1回のスロット生成で展開できる最大日数
+MAX_SCHEDULE_DAYS = 366
 
-@router.get("/bookings", response_model=list[AdminBookingDetail])
-def get_all_bookings(db: Session = Depends(get_db)):
-    """全予約一覧取得（管理者用）"""
-    bookings = (
-        db.query(Booking).order_by(Booking.date.desc(), Booking.start_time.desc()).all()
+
+@router.get("/bookings", response_model=AdminBookingPage)
+@query_budget(2)
+async def get_all_bookings(
+    params: BookingListParams = Depends(),
+    repo: Repository = Depends(get_read_repository),
+):
+    """全予約一覧取得（管理者用、キーセットページング）"""
+    rows, next_cursor = await repo.list_bookings(
+        with_user_name=True, **params.as_filters()
+    )
+
+    # 行は整形済みなので、response_model による検証を通さずにそのまま返す
+    return ORJSONResponse(
+        {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
     )
 
-    result = []
-    for booking in bookings:
-        result.append(
-            AdminBookingDetail(
-                id=booking.id,
-                service_id=booking.service_id,
-                service_name=booking.service.name,
-                user_name=booking.user.name,
-                date=booking.date.strftime("%Y-%m-%d"),
-                start_time=booking.start_time.strftime("%H:%M"),
-                status=booking.status.value,
+
+EXPORT_COLUMNS = [
+    "id",
+    "service_id",
+    "service_name",
+    "user_name",
+    "date",
+    "start_time",
+    "status",
+]
+
+
+def _export_record(row) -> list:
+    return [
+        row.id,
+        row.service_id,
+        row.service_name,
+        row.user_name,
+        row.date.strftime("%Y-%m-%d"),
+        row.start_time.strftime("%H:%M"),
+        row.status.value,
+    ]
+
+
+async def _ndjson_chunks(repo: Repository, filters: dict):
+    async for rows in repo.stream_booking_export(**filters):
+        lines = [
+            json.dumps(
+                dict(zip(EXPORT_COLUMNS, _export_record(row))), ensure_ascii=False
             )
+            for row in rows
+        ]
+        yield "\n".join(lines) + "\n"
+
+
+async def _csv_chunks(repo: Repository, filters: dict):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # Excelで文字化けしないようBOMを付与
+    buffer.write("\ufeff")
+    writer.writerow(EXPORT_COLUMNS)
+    yield buffer.getvalue()
+
+    async for rows in repo.stream_booking_export(**filters):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(_export_record(row) for row in rows)
+        yield buffer.getvalue()
+
+
+@router.get("/bookings/export")
+async def export_bookings(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    params: BookingFilterParams = Depends(),
+    repo: Repository = Depends(get_read_repository),
+):
+    """全予約のエクスポート（管理者用、NDJSON / CSV をストリーミング）"""
+    filters = params.as_filters()
+    if format == "csv":
+        return StreamingResponse(
+            _csv_chunks(repo, filters),
+            media_type="text/csv; charset=utf-8",
+            headers={"Content-Disposition": 'attachment; filename="bookings.csv"'},
+        )
+
+    return StreamingResponse(
+        _ndjson_chunks(repo, filters),
+        media_type="application/x-ndjson",
+        headers={"Content-Disposition": 'attachment; filename="bookings.ndjson"'},
+    )
+
+
+def _template_response(template) -> ScheduleTemplateResponse:
+    return ScheduleTemplateResponse(
+        id=template.id,
+        service_id=template.service_id,
+        weekdays=template.weekdays,
+        start_times=[t.strftime("%H:%M") for t in template.start_times],
+        capacity=template.capacity,
+        valid_from=template.valid_from.strftime("%Y-%m-%d"),
+        valid_to=template.valid_to.strftime("%Y-%m-%d"),
+    )
+
+
+def _parse_period(date_from: str, date_to: str):
+    try:
+        period_from = datetime.strptime(date_from, "%Y-%m-%d").date()
+        period_to = datetime.strptime(date_to, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD",
         )
 
-    return result
+    if period_from > period_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Start date must be on or before end date",
+        )
+    if (period_to - period_from).days + 1 > MAX_SCHEDULE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must be at most {MAX_SCHEDULE_DAYS} days",
+        )
+    return period_from, period_to
+
+
+async def _generate_slots(repo: Repository, rows: list[dict]) -> SlotGenerationResponse:
+    created = await repo.insert_slots(rows)
+
+    # スロットが増えた日を予約と同じ経路で全ワーカーへ通知（キャッシュ破棄とSSE）
+    changes = await notify_days_changed(repo, set(created)) if created else []
+    await repo.commit()
+    for change in changes:
+        slot_changed(change)
+
+    return SlotGenerationResponse(requested=len(rows), created=len(created))
+
+
+@router.get("/schedule-templates", response_model=list[ScheduleTemplateResponse])
+@query_budget(2)
+async def get_schedule_templates(repo: Repository = Depends(get_repository)):
+    """定期スケジュール一覧取得（管理者用）"""
+    templates = await repo.list_schedule_templates()
+    return [_template_response(template) for template in templates]
+
+
+@router.post(
+    "/schedule-templates",
+    response_model=ScheduleTemplateResponse,
+    status_code=status.HTTP_201_CREATED,
+)
+@query_budget(3)
+async def create_schedule_template(
+    template_data: ScheduleTemplateCreate, repo: Repository = Depends(get_repository)
+):
+    """定期スケジュール登録（管理者用）"""
+    if not await service_catalog.exists(repo, template_data.service_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
+        )
+
+    if not template_data.weekdays or any(
+        day < 0 or day > 6 for day in template_data.weekdays
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Weekdays must be between 0 (Monday) and 6 (Sunday)",
+        )
+
+    if template_data.capacity < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Capacity must be at least 1",
+        )
+
+    try:
+        start_times = sorted(
+            {datetime.strptime(t, "%H:%M").time() for t in template_data.start_times}
+        )
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid time format. Use HH:MM",
+        )
+    if not start_times:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one start time is required",
+        )
+
+    valid_from, valid_to = _parse_period(
+        template_data.valid_from, template_data.valid_to
+    )
+
+    template = await repo.add_schedule_template(
+        service_id=template_data.service_id,
+        weekdays=sorted(set(template_data.weekdays)),
+        start_times=start_times,
+        capacity=template_data.capacity,
+        valid_from=valid_from,
+        valid_to=valid_to,
+    )
+    await repo.commit()
+
+    return _template_response(template)
+
+
+@router.post(
+    "/schedule-templates/{template_id}/generate",
+    response_model=SlotGenerationResponse,
+)
+async def generate_template_slots(
+    template_id: int, repo: Repository = Depends(get_repository)
+):
+    """定期スケジュールの有効期間全体のスロットを生成（既存スロットはそのまま）"""
+    template = await repo.get_schedule_template(template_id)
+    if not template:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Schedule template not found"
+        )
+
+    rows = expand_template(
+        template.service_id,
+        template.weekdays,
+        template.start_times,
+        template.capacity,
+        template.valid_from,
+        template.valid_to,
+    )
+    return await _generate_slots(repo, rows)
+
+
+@router.post("/schedule-templates/generate", response_model=SlotGenerationResponse)
+async def generate_all_slots(
+    date_from: str = Query(..., alias="from"),
+    date_to: str = Query(..., alias="to"),
+    repo: Repository = Depends(get_repository),
+):
+    """全定期スケジュールから指定期間のスロットを一括生成（管理者用）"""
+    period_from, period_to = _parse_period(date_from, date_to)
+
+    rows = []
+    for template in await repo.list_schedule_templates(period_from, period_to):
+        rows.extend(
+            expand_template(
+                template.service_id,
+                template.weekdays,
+                template.start_times,
+                template.capacity,
+                max(template.valid_from, period_from),
+                min(template.valid_to, period_to),
+            )
+        )
+    return await _generate_slots(repo, rows)
@@ -1,6 +1,4 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from app.db.database import get_db
 from app.schemas.schemas import (
     UserCreate,
     LoginRequest,
@@ -9,29 +7,47 @@ from app.schemas.schemas import (
     RefreshResponse,
     UserResponse,
 )
-from app.models.models import User
 from app.core.security import (
-    verify_password,
-    get_password_hash,
+    verify_and_update_password_async,
+    get_password_hash_async,
     create_access_token,
     create_refresh_token,
 )
 from app.api.deps import verify_refresh_token
+from app.repositories.base import Repository
+from app.repositories.factory import get_repository
+from app.core.query_budget import query_budget
 
 router = APIRouter()
 
 
 @router.post("/login", response_model=LoginResponse)
-def login(login_data: LoginRequest, db: Session = Depends(get_db)):
+@query_budget(2)
+async def login(login_data: LoginRequest, repo: Repository = Depends(get_repository)):
     """ユーザーログイン"""
-    user = db.query(User).filter(User.email == login_data.email).first()
+    user = await repo.get_user_by_email(login_data.email)
 
-    if not user or not verify_password(login_data.password, user.hashed_password):
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="メールアドレスまたはパスワードが正しくありません",
+        )
+
+    # bcryptはCPUを占有するため専用のプロセスプールで実行
+    verified, new_hash = await verify_and_update_password_async(
+        login_data.password, user.hashed_password
+    )
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="メールアドレスまたはパスワードが正しくありません",
         )
 
+    # コスト設定が変わっていれば新しいコストで保存し直す
+    if new_hash:
+        await repo.set_password_hash(user, new_hash)
+        await repo.commit()
+
     access_token = create_access_token(data={"sub": user.id})
     refresh_token = create_refresh_token(data={"sub": user.id})
 
@@ -45,7 +61,8 @@ def login(login_data: LoginRequest, db: Session = Depends(get_db)):
 @router.post(
     "/register", response_model=LoginResponse, status_code=status.HTTP_201_CREATED
 )
-def register(user_data: UserCreate, db: Session = Depends(get_db)):
+@query_budget(2)
+async def register(user_data: UserCreate, repo: Repository = Depends(get_repository)):
     """ユーザー登録"""
     # バリデーション
     if not user_data.name or len(user_data.name.strip()) == 0:
@@ -72,23 +89,16 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
         )
 
     # メールアドレスの重複チェック
-    existing_user = db.query(User).filter(User.email == user_data.email).first()
-    if existing_user:
+    if await repo.get_user_by_email(user_data.email) is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="このメールアドレスは既に登録されています",
         )
 
     # 新規ユーザー作成
-    new_user = User(
-        name=user_data.name,
-        email=user_data.email,
-        hashed_password=get_password_hash(user_data.password),
-    )
-
-    db.add(new_user)
-    db.commit()
-    db.refresh(new_user)
+    hashed_password = await get_password_hash_async(user_data.password)
+    new_user = await repo.add_user(user_data.name, user_data.email, hashed_password)
+    await repo.commit()
 
     # トークン生成
     access_token = create_access_token(data={"sub": new_user.id})
@@ -102,12 +112,15 @@ def register(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=RefreshResponse)
-def refresh_token(refresh_data: RefreshRequest, db: Session = Depends(get_db)):
+@query_budget(1)
+async def refresh_token(
+    refresh_data: RefreshRequest, repo: Repository = Depends(get_repository)
+):
     """トークンリフレッシュ"""
     user_id = verify_refresh_token(refresh_data.refresh)
 
     # ユーザーの存在確認
-    user = db.query(User).filter(User.id == user_id).first()
+    user = await repo.get_user(user_id)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found"
@@ -1,27 +1,75 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+import hashlib
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+from fastapi.responses import JSONResponse, ORJSONResponse
 from datetime import datetime
-from app.db.database import get_db
 from app.schemas.schemas import (
+    BookingBatchCreate,
+    BookingBatchItemResult,
+    BookingBatchResponse,
     BookingCreate,
     BookingResponse,
-    BookingDetail,
+    BookingPage,
     BookingCancelResponse,
+    UserResponse,
 )
-from app.models.models import Booking, Service, Slot, BookingStatus, User
-from app.api.deps import get_current_user
+from app.models.models import BookingStatus
+from app.api.deps import (
+    BookingListParams,
+    get_current_user,
+    get_user_read_repository,
+)
+from app.cache.availability import (
+    notify_slot_changed,
+    notify_slots_changed,
+    slot_changed,
+)
+from app.cache.service_catalog import service_catalog
+from app.core.query_budget import query_budget
+from app.db.replica import replica_router
+from app.repositories.base import DuplicateBookingError, Repository
+from app.repositories.factory import get_repository
 
 router = APIRouter()
 
+# 一括予約の最大件数
+MAX_BATCH_ITEMS = 20
+
+
+def _replay_response(stored, request_hash: str) -> JSONResponse:
+    """保存済みレスポンスを返す（同じキーで別内容のリクエストは422）"""
+    if stored.request_hash != request_hash:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Idempotency-Key was already used for a different request",
+        )
+    return JSONResponse(
+        status_code=stored.status_code,
+        content=stored.response,
+        headers={"Idempotent-Replayed": "true"},
+    )
+
 
 @router.post("", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
-def create_booking(
+@query_budget(8)
+async def create_booking(
     booking_data: BookingCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, max_length=255),
 ):
-    """予約作成"""
+    """予約作成（Idempotency-Key ヘッダーがあれば再送時に保存済みレスポンスを返す）"""
+    # 再送なら予約処理をやり直さず、主キー1回の検索で保存済みレスポンスを返す
+    request_hash = None
+    if idempotency_key:
+        request_hash = hashlib.sha256(
+            booking_data.model_dump_json().encode()
+        ).hexdigest()
+        stored = await repo.get_stored_response(current_user.id, idempotency_key)
+        if stored is not None:
+            return _replay_response(stored, request_hash)
+
     # 日付と時刻をパース
     try:
         booking_date = datetime.strptime(booking_data.date, "%Y-%m-%d").date()
@@ -33,99 +81,235 @@ def create_booking(
         )
 
     # サービスの存在確認
-    service = db.query(Service).filter(Service.id == booking_data.service_id).first()
-    if not service:
+    if not await service_catalog.exists(repo, booking_data.service_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
         )
 
-    # スロットの存在確認
-    slot = (
-        db.query(Slot)
-        .filter(
-            Slot.service_id == booking_data.service_id,
-            Slot.date == booking_date,
-            Slot.start_time == booking_time,
-        )
-        .first()
-    )
+    # 空きがあれば予約数カウンタを原子的に確保
+    slot = await repo.admit_slot(booking_data.service_id, booking_date, booking_time)
 
-    if not slot:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Slot not found"
+    if slot is None:
+        # 確保できなかった理由を判定（スロットなし / 満席）
+        slot_id = await repo.find_slot_id(
+            booking_data.service_id, booking_date, booking_time
         )
+        await repo.rollback()
 
-    # 空き状況の確認
-    reserved_count = (
-        db.query(func.count(Booking.id))
-        .filter(Booking.slot_id == slot.id, Booking.status == BookingStatus.confirmed)
-        .scalar()
-    )
+        if slot_id is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND, detail="Slot not found"
+            )
 
-    if reserved_count >= slot.capacity:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Slot is full"
         )
 
     # 予約作成
-    new_booking = Booking(
-        user_id=current_user.id,
+    try:
+        booking_id = await repo.add_booking(
+            current_user.id,
+            booking_data.service_id,
+            slot.id,
+            booking_date,
+            booking_time,
+        )
+    except DuplicateBookingError:
+        # 同じスロットの確定予約が既にある（同じキーで並行した再送を含む）
+        await repo.rollback()
+        if idempotency_key:
+            stored = await repo.get_stored_response(current_user.id, idempotency_key)
+            if stored is not None:
+                return _replay_response(stored, request_hash)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You have already booked this slot",
+        )
+
+    booking = BookingResponse(
+        booking_id=booking_id,
+        status=BookingStatus.confirmed.value,
         service_id=booking_data.service_id,
-        slot_id=slot.id,
-        date=booking_date,
-        start_time=booking_time,
-        status=BookingStatus.confirmed,
+        date=booking_data.date,
+        start_time=booking_data.start_time,
     )
 
-    db.add(new_booking)
-    db.commit()
-    db.refresh(new_booking)
+    # 予約と同じトランザクションでレスポンスを保存
+    if idempotency_key and not await repo.store_response(
+        current_user.id,
+        idempotency_key,
+        request_hash,
+        status.HTTP_201_CREATED,
+        booking.model_dump(),
+    ):
+        # 同じキーの別リクエストが先に保存された
+        await repo.rollback()
+        stored = await repo.get_stored_response(current_user.id, idempotency_key)
+        if stored is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is in progress",
+            )
+        return _replay_response(stored, request_hash)
 
-    return BookingResponse(
-        booking_id=new_booking.id,
-        status=new_booking.status.value,
-        service_id=new_booking.service_id,
-        date=booking_data.date,
-        start_time=booking_data.start_time,
+    change = await notify_slot_changed(
+        repo, booking_data.service_id, booking_date, slot
     )
+    await repo.commit()
+    slot_changed(change)
+    replica_router.mark_write(current_user.id, response)
 
+    return booking
 
-@router.get("/mine", response_model=list[BookingDetail])
-def get_my_bookings(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
-):
-    """自分の予約一覧取得"""
-    bookings = (
-        db.query(Booking)
-        .filter(Booking.user_id == current_user.id)
-        .order_by(Booking.date.desc(), Booking.start_time.desc())
-        .all()
+
+def _batch_response(
+    batch: BookingBatchCreate, errors: dict, booking_ids: dict
+) -> BookingBatchResponse:
+    results = []
+    for index, item in enumerate(batch.items):
+        booking_id = booking_ids.get(index)
+        if booking_id is not None:
+            results.append(
+                BookingBatchItemResult(
+                    **item.model_dump(),
+                    status=BookingStatus.confirmed.value,
+                    booking_id=booking_id,
+                )
+            )
+        else:
+            results.append(
+                BookingBatchItemResult(
+                    **item.model_dump(),
+                    status="failed",
+                    error=errors.get(index, "Not booked because another item failed"),
+                )
+            )
+    return BookingBatchResponse(
+        mode=batch.mode, confirmed=len(booking_ids), results=results
     )
 
-    result = []
-    for booking in bookings:
-        result.append(
-            BookingDetail(
-                id=booking.id,
-                service_id=booking.service_id,
-                service_name=booking.service.name,
-                date=booking.date.strftime("%Y-%m-%d"),
-                start_time=booking.start_time.strftime("%H:%M"),
-                status=booking.status.value,
+
+@router.post("/batch", response_model=BookingBatchResponse)
+@query_budget(5)
+async def create_bookings_batch(
+    batch: BookingBatchCreate,
+    response: Response,
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """一括予約（回数券などで複数クラスを1トランザクションでまとめて予約）"""
+    if not batch.items or len(batch.items) > MAX_BATCH_ITEMS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Items must contain 1 to {MAX_BATCH_ITEMS} entries",
+        )
+
+    # 日付と時刻をパース（失敗した項目は errors に理由を記録）
+    errors: dict[int, str] = {}
+    keys: dict[int, tuple] = {}
+    for index, item in enumerate(batch.items):
+        try:
+            key = (
+                item.service_id,
+                datetime.strptime(item.date, "%Y-%m-%d").date(),
+                datetime.strptime(item.start_time, "%H:%M").time(),
             )
+        except ValueError:
+            errors[index] = "Invalid date or time format"
+            continue
+        if key in keys.values():
+            errors[index] = "Duplicate item in batch"
+            continue
+        keys[index] = key
+
+    # 全スロットを1クエリで取得してロック
+    slots = {}
+    if keys:
+        for row in await repo.resolve_slots(current_user.id, list(keys.values())):
+            slots[(row.service_id, row.date, row.start_time)] = row
+
+    candidates = {}
+    for index, key in keys.items():
+        slot = slots.get(key)
+        if slot is None:
+            errors[index] = "Slot not found"
+        elif slot.booked:
+            errors[index] = "You have already booked this slot"
+        else:
+            candidates[index] = slot
+
+    # 空きのあるスロットの予約数カウンタを1文でまとめて確保
+    all_or_nothing = batch.mode == "all_or_nothing"
+    admitted = {}
+    if candidates and not (all_or_nothing and errors):
+        for row in await repo.admit_slots([slot.id for slot in candidates.values()]):
+            admitted[row.id] = row
+        for index, slot in candidates.items():
+            if slot.id not in admitted:
+                errors[index] = "Slot is full"
+
+    if not admitted or (all_or_nothing and errors):
+        await repo.rollback()
+        return _batch_response(batch, errors, {})
+
+    # 確保できた分の予約を1文で作成
+    booked = {index: slot for index, slot in candidates.items() if slot.id in admitted}
+    try:
+        booking_ids_by_slot = await repo.add_bookings(
+            current_user.id, list(booked.values())
+        )
+    except DuplicateBookingError:
+        # 並行した別リクエストで同じスロットを予約済み
+        await repo.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You have already booked one of these slots",
         )
 
-    return result
+    changes = await notify_slots_changed(
+        repo,
+        [(slot.service_id, slot.date, admitted[slot.id]) for slot in booked.values()],
+    )
+    await repo.commit()
+    for change in changes:
+        slot_changed(change)
+    replica_router.mark_write(current_user.id, response)
+
+    return _batch_response(
+        batch,
+        errors,
+        {index: booking_ids_by_slot[slot.id] for index, slot in booked.items()},
+    )
+
+
+@router.get("/mine", response_model=BookingPage)
+@query_budget(2)
+async def get_my_bookings(
+    params: BookingListParams = Depends(),
+    repo: Repository = Depends(get_user_read_repository),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """自分の予約一覧取得（キーセットページング、レプリカがあればレプリカから読む）"""
+    rows, next_cursor = await repo.list_bookings(
+        user_id=current_user.id, **params.as_filters()
+    )
+
+    # 行は整形済みなので、response_model による検証を通さずにそのまま返す
+    return ORJSONResponse(
+        {"items": [row._asdict() for row in rows], "next_cursor": next_cursor}
+    )
 
 
 @router.delete("/{booking_id}", response_model=BookingCancelResponse)
-def cancel_booking(
+@query_budget(7)
+async def cancel_booking(
     booking_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    response: Response,
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     """予約キャンセル"""
-    booking = db.query(Booking).filter(Booking.id == booking_id).first()
+    booking = await repo.get_booking(booking_id)
 
     if not booking:
         raise HTTPException(
@@ -145,8 +329,35 @@ def cancel_booking(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Booking already cancelled"
         )
 
-    # キャンセル処理
-    booking.status = BookingStatus.cancelled
-    db.commit()
+    # 予約作成（スロット→予約の順に行をロック）と同じ順序でロックし、デッドロックを防ぐ
+    # スロットのロックはキャンセル待ち登録との競合も防ぐ
+    await repo.lock_slot(booking.slot_id)
+
+    # キャンセル処理（同時キャンセルでカウンタを二重に減らさないよう条件付き更新）
+    if not await repo.cancel_booking(booking.id):
+        await repo.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Booking already cancelled"
+        )
+
+    # キャンセル待ちがいれば先頭を同じトランザクションで繰り上げ（予約数は変わらない）
+    promoted = await repo.promote_waitlist_head(
+        booking.slot_id, booking.service_id, booking.date, booking.start_time
+    )
+
+    change = None
+    if promoted is None:
+        slot = await repo.release_slot(booking.slot_id)
+        if slot is not None:
+            change = await notify_slot_changed(
+                repo, booking.service_id, booking.date, slot
+            )
+    await repo.commit()
+    if change is not None:
+        slot_changed(change)
+    replica_router.mark_write(current_user.id, response)
+    # 繰り上がったユーザーも予約一覧が変わる
+    if promoted is not None:
+        replica_router.mark_write(promoted.user_id)
 
-    return BookingCancelResponse(id=booking.id, status=booking.status.value)
+    return BookingCancelResponse(id=booking_id, status=BookingStatus.cancelled.value)
@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends
+from app.db.database import get_created_engines
+from app.db.pool import get_pool_status, pool_wait_seconds
+from app.core.token_cache import token_cache
+from app.cache.availability import availability_cache
+from app.cache.service_catalog import notify_catalog_changed, service_catalog
+from app.core.availability_hub import availability_hub
+from app.db.notify import listener
+from app.db.replica import replica_router
+from app.repositories.base import Repository
+from app.repositories.factory import get_repository
+
+router = APIRouter()
+
+
+@router.get("/pool")
+async def get_pool_stats():
+    """コネクションプールの利用状況（内部向け、作成済みのエンジンのみ）"""
+    pools = {
+        name: get_pool_status(engine.pool)
+        for name, engine in get_created_engines().items()
+    }
+    return {"pools": pools, "wait_seconds": pool_wait_seconds.snapshot()}
+
+
+@router.get("/replica")
+async def get_replica_stats():
+    """読み取りレプリカへの振り分け状況（内部向け）"""
+    return replica_router.stats()
+
+
+@router.get("/token-cache")
+async def get_token_cache_stats():
+    """検証済みトークンキャッシュのヒット率（内部向け）"""
+    return token_cache.stats()
+
+
+@router.get("/service-catalog")
+async def get_service_catalog_stats():
+    """サービス一覧キャッシュの状態（内部向け）"""
+    return service_catalog.stats()
+
+
+@router.post("/service-catalog/invalidate")
+async def invalidate_service_catalog(repo: Repository = Depends(get_repository)):
+    """サービス一覧キャッシュを全ワーカーで無効化（内部向け）"""
+    await notify_catalog_changed(repo)
+    await repo.commit()
+    return service_catalog.stats()
+
+
+@router.get("/availability-cache")
+async def get_availability_cache_stats():
+    """スロット空き状況キャッシュの状態（内部向け）"""
+    return {**availability_cache.stats(), "listener_connected": listener.connected}
+
+
+@router.get("/live")
+async def get_live_stats():
+    """空き状況SSE配信の接続状況（内部向け）"""
+    return availability_hub.stats()
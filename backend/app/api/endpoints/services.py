@@ -1,96 +1,265 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from datetime import datetime, date, time
-from app.db.database import get_db
-from app.schemas.schemas import ServiceResponse, SlotsResponse, SlotInfo
-from app.models.models import Service, Slot, Booking, BookingStatus
-from app.api.deps import get_current_user
-from app.models.models import User
+import asyncio
+import json
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from datetime import date, datetime, timedelta
+from app.core.availability_hub import availability_hub
+from app.core.config import get_settings
+from app.schemas.schemas import (
+    AvailabilityCalendarResponse,
+    DayAvailability,
+    ServiceResponse,
+    SlotsResponse,
+    UserResponse,
+)
+from app.cache.availability import availability_cache
+from app.cache.service_catalog import service_catalog
+from app.api.deps import get_current_user, get_user_read_repository
+from app.api.etag import conditional_json_response, conditional_response
+from app.core.query_budget import query_budget
+from app.repositories.base import Repository
+from app.repositories.factory import get_repository, open_repository
+
+settings = get_settings()
 
 router = APIRouter()
 
+# 空き状況カレンダーで一度に取得できる最大日数
+MAX_AVAILABILITY_DAYS = 31
+
 
 @router.get("", response_model=list[ServiceResponse])
-def get_services(
-    db: Session = Depends(get_db), current_user: User = Depends(get_current_user)
+@query_budget(2)
+async def get_services(
+    request: Request,
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
 ):
-    """サービス一覧取得"""
-    services = db.query(Service).all()
-    return services
+    """サービス一覧取得（キャッシュから返し、ETagによる条件付きGET対応）"""
+    body, etag = await service_catalog.get_list(repo)
+    return conditional_response(request, body, etag)
 
 
 @router.get("/{service_id}", response_model=ServiceResponse)
-def get_service(
+@query_budget(2)
+async def get_service(
+    request: Request,
     service_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
 ):
-    """サービス詳細取得"""
-    service = db.query(Service).filter(Service.id == service_id).first()
+    """サービス詳細取得（キャッシュから返し、ETagによる条件付きGET対応）"""
+    cached = await service_catalog.get(repo, service_id)
 
-    if not service:
+    if not cached:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
         )
 
-    return service
+    body, etag = cached
+    return conditional_response(request, body, etag)
+
+
+async def load_slots_body(
+    repo: Repository, service_id: int, target_date: date
+) -> bytes:
+    """指定日のスロット空き状況をJSON本文で取得（予約数は slots.reserved カウンタから読む）
+
+    行は整形済みで取得するため、モデルを組み立てずにそのままシリアライズする。
+    """
+    slots = await repo.get_slot_availability(service_id, target_date)
+    return orjson.dumps(
+        {
+            "service_id": service_id,
+            "date": target_date.isoformat(),
+            "slots": [slot._asdict() for slot in slots],
+        }
+    )
+
+
+async def _validate_slot_request(
+    repo: Repository, service_id: int, date_param: str
+) -> date:
+    # サービスの存在確認
+    if not await service_catalog.exists(repo, service_id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
+        )
+
+    # 日付をパース
+    try:
+        return datetime.strptime(date_param, "%Y-%m-%d").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date format. Use YYYY-MM-DD",
+        )
 
 
 @router.get("/{service_id}/slots", response_model=SlotsResponse)
-def get_service_slots(
+@query_budget(3)
+async def get_service_slots(
     service_id: int,
     date_param: str = Query(..., alias="date"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
 ):
     """サービスの予約可能枠取得"""
-    # サービスの存在確認
-    service = db.query(Service).filter(Service.id == service_id).first()
-    if not service:
+    target_date = await _validate_slot_request(repo, service_id, date_param)
+
+    # 予約の作成・キャンセルで無効化されるまでキャッシュ済みの本文を返す
+    # 無効化直後にレプリカから読み込むと変更前の状態がTTLの間残るため、プライマリから読む
+    body = await availability_cache.get_or_load(
+        (service_id, target_date),
+        lambda: load_slots_body(repo, service_id, target_date),
+    )
+    return Response(content=body, media_type="application/json")
+
+
+def _sse(event: str, data: str) -> str:
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _slot_snapshot(service_id: int, target_date: date) -> str:
+    # ストリーム中は依存関係のリポジトリが閉じているため、都度開く
+    async with open_repository() as repo:
+        snapshot = await availability_cache.get_or_load(
+            (service_id, target_date),
+            lambda: load_slots_body(repo, service_id, target_date),
+        )
+    return _sse("snapshot", snapshot.decode())
+
+
+async def _slot_events(service_id: int, target_date: date):
+    subscription = availability_hub.subscribe((service_id, target_date))
+    if subscription is None:
+        return
+
+    try:
+        # 購読してからスナップショットを取るので、その間の変更も取りこぼさない
+        yield await _slot_snapshot(service_id, target_date)
+
+        while True:
+            try:
+                change = await asyncio.wait_for(
+                    subscription.queue.get(), settings.SSE_HEARTBEAT_SECONDS
+                )
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+
+            # 配信が追いつかず差分を捨てた場合や、スロットが追加された場合は
+            # スナップショットを送り直す
+            if subscription.overflowed or "slot_id" not in change:
+                subscription.drain()
+                yield await _slot_snapshot(service_id, target_date)
+                continue
+
+            delta = {
+                "slot_id": change["slot_id"],
+                "reserved": change["reserved"],
+                "available": change["capacity"] - change["reserved"],
+            }
+            yield _sse("delta", json.dumps(delta))
+    finally:
+        availability_hub.unsubscribe(subscription)
+
+
+@router.get("/{service_id}/slots/stream")
+async def stream_service_slots(
+    service_id: int,
+    date_param: str = Query(..., alias="date"),
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """スロット空き状況のライブ配信（Server-Sent Events）
+
+    最初に snapshot イベントで全スロットを送り、以降は予約の作成・キャンセルごとに
+    delta イベントで該当スロットの reserved / available を送る。
+    スロットが追加された場合は snapshot イベントを送り直す。
+    """
+    target_date = await _validate_slot_request(repo, service_id, date_param)
+
+    if availability_hub.connections >= availability_hub.max_connections:
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many live connections",
+            headers={"Retry-After": "5"},
         )
 
-    # 日付をパース
+    return StreamingResponse(
+        _slot_events(service_id, target_date),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@router.get("/{service_id}/availability", response_model=AvailabilityCalendarResponse)
+@query_budget(2)
+async def get_service_availability(
+    request: Request,
+    service_id: int,
+    date_from: str = Query(..., alias="from"),
+    date_to: str = Query(..., alias="to"),
+    repo: Repository = Depends(get_user_read_repository),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """期間内の空き状況カレンダー取得（最大31日、ETagによる条件付きGET対応）"""
     try:
-        target_date = datetime.strptime(date_param, "%Y-%m-%d").date()
+        start = datetime.strptime(date_from, "%Y-%m-%d").date()
+        end = datetime.strptime(date_to, "%Y-%m-%d").date()
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Invalid date format. Use YYYY-MM-DD",
         )
 
-    # 指定日のスロットを取得
-    slots = (
-        db.query(Slot)
-        .filter(Slot.service_id == service_id, Slot.date == target_date)
-        .order_by(Slot.start_time)
-        .all()
-    )
+    if end < start or (end - start).days + 1 > MAX_AVAILABILITY_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Date range must be 1 to {MAX_AVAILABILITY_DAYS} days",
+        )
 
-    # 各スロットの予約状況を計算
-    slot_infos = []
-    for slot in slots:
-        # このスロットの予約数を取得（キャンセルされていないもの）
-        reserved_count = (
-            db.query(func.count(Booking.id))
-            .filter(
-                Booking.slot_id == slot.id, Booking.status == BookingStatus.confirmed
-            )
-            .scalar()
+    rows = await repo.get_availability_calendar(service_id, start, end)
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Service not found"
         )
 
-        available = slot.capacity - reserved_count
+    by_date = {row[0]: row for row in rows if row[0] is not None}
 
-        slot_infos.append(
-            SlotInfo(
-                id=slot.id,
-                start_time=slot.start_time.strftime("%H:%M"),
-                capacity=slot.capacity,
-                reserved=reserved_count,
-                available=available,
+    # スロットのない日も空配列で返し、クライアント側で日付を補完しなくて済むようにする
+    days = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        row = by_date.get(day)
+        if row is None:
+            days.append(
+                DayAvailability(
+                    date=day.strftime("%Y-%m-%d"),
+                    slot_ids=[],
+                    start_times=[],
+                    capacity=[],
+                    reserved=[],
+                    available=[],
+                )
+            )
+            continue
+
+        _, slot_ids, start_times, capacity, reserved = row
+        days.append(
+            DayAvailability(
+                date=day.strftime("%Y-%m-%d"),
+                slot_ids=slot_ids,
+                start_times=start_times,
+                capacity=capacity,
+                reserved=reserved,
+                available=[c - r for c, r in zip(capacity, reserved)],
             )
         )
 
-    return SlotsResponse(service_id=service_id, date=date_param, slots=slot_infos)
+    payload = AvailabilityCalendarResponse(
+        service_id=service_id, date_from=date_from, date_to=date_to, days=days
+    )
+    return conditional_json_response(request, payload)
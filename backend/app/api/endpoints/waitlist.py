@@ -0,0 +1,114 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from datetime import datetime
+from app.schemas.schemas import (
+    UserResponse,
+    WaitlistCreate,
+    WaitlistEntryDetail,
+    WaitlistEntryResponse,
+)
+from app.api.deps import get_current_user, get_user_read_repository
+from app.core.query_budget import query_budget
+from app.db.replica import replica_router
+from app.repositories.base import Repository
+from app.repositories.factory import get_repository
+
+router = APIRouter()
+
+
+@router.post(
+    "", response_model=WaitlistEntryResponse, status_code=status.HTTP_201_CREATED
+)
+@query_budget(4)
+async def create_waitlist_entry(
+    waitlist_data: WaitlistCreate,
+    response: Response,
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """キャンセル待ち登録（満席のスロットのみ、キャンセル発生時に先頭から自動で予約）"""
+    # 日付と時刻をパース
+    try:
+        slot_date = datetime.strptime(waitlist_data.date, "%Y-%m-%d").date()
+        slot_time = datetime.strptime(waitlist_data.start_time, "%H:%M").time()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid date or time format",
+        )
+
+    slot = await repo.lock_slot_for_waitlist(
+        current_user.id, waitlist_data.service_id, slot_date, slot_time
+    )
+    if slot is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Slot not found"
+        )
+
+    if slot.booked:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You have already booked this slot",
+        )
+
+    # 空席があればキャンセル待ちではなく通常の予約を使う
+    if slot.reserved < slot.capacity:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Slot has available seats",
+        )
+
+    entry = await repo.join_waitlist(slot.id, current_user.id)
+    if entry is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="You are already on the waitlist for this slot",
+        )
+    await repo.commit()
+    replica_router.mark_write(current_user.id, response)
+
+    return WaitlistEntryResponse(
+        id=entry.id,
+        service_id=waitlist_data.service_id,
+        date=waitlist_data.date,
+        start_time=waitlist_data.start_time,
+        position=entry.position,
+    )
+
+
+@router.get("/mine", response_model=list[WaitlistEntryDetail])
+@query_budget(2)
+async def get_my_waitlist(
+    repo: Repository = Depends(get_user_read_repository),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """自分のキャンセル待ち一覧取得（順番付き）"""
+    rows = await repo.list_waitlist_entries(current_user.id)
+
+    return [
+        WaitlistEntryDetail(
+            id=row.id,
+            service_id=row.service_id,
+            service_name=row.service_name,
+            date=row.date.strftime("%Y-%m-%d"),
+            start_time=row.start_time.strftime("%H:%M"),
+            position=row.position,
+        )
+        for row in rows
+    ]
+
+
+@router.delete("/{entry_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(2)
+async def delete_waitlist_entry(
+    entry_id: int,
+    response: Response,
+    repo: Repository = Depends(get_repository),
+    current_user: UserResponse = Depends(get_current_user),
+):
+    """キャンセル待ちの取り消し"""
+    if not await repo.leave_waitlist(entry_id, current_user.id):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Waitlist entry not found"
+        )
+    await repo.commit()
+    replica_router.mark_write(current_user.id, response)
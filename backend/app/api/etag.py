@@ -0,0 +1,38 @@
+import hashlib
+import json
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+
+
+def compute_etag(body: bytes) -> str:
+    """レスポンス本文から強いETagを生成"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """If-None-Match に etag が含まれているか判定"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = [value.strip().removeprefix("W/") for value in header.split(",")]
+    return etag in candidates
+
+
+def conditional_response(
+    request: Request, body: bytes, etag: str, cache_control: str = "private, no-cache"
+) -> Response:
+    """If-None-Match が一致すれば304、それ以外は本文付きのJSONレスポンスを返す"""
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def conditional_json_response(request: Request, payload) -> Response:
+    """payload をJSONにしてETag付きで返す（条件付きGET対応）"""
+    body = json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    return conditional_response(request, body, compute_etag(body))
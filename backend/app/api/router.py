@@ -1,9 +1,22 @@
-from fastapi import APIRouter
-from app.api.endpoints import auth, services, bookings, admin
+from fastapi import APIRouter, Depends
+from app.api.deps import get_current_admin, require_internal_access
+from app.api.endpoints import auth, services, bookings, waitlist, admin, internal
 
 api_router = APIRouter()
 
 api_router.include_router(auth.router, prefix="/auth", tags=["auth"])
 api_router.include_router(services.router, prefix="/services", tags=["services"])
 api_router.include_router(bookings.router, prefix="/bookings", tags=["bookings"])
-api_router.include_router(admin.router, prefix="/admin", tags=["admin"])
+api_router.include_router(waitlist.router, prefix="/waitlist", tags=["waitlist"])
+api_router.include_router(
+    admin.router,
+    prefix="/admin",
+    tags=["admin"],
+    dependencies=[Depends(get_current_admin)],
+)
+api_router.include_router(
+    internal.router,
+    prefix="/internal",
+    tags=["internal"],
+    dependencies=[Depends(require_internal_access)],
+)
@@ -0,0 +1,182 @@
+import asyncio
+import time
+from datetime import date
+from typing import Any, Awaitable, Callable
+from app.core.availability_hub import availability_hub
+from app.core.config import get_settings
+from app.db.notify import SLOT_CHANNEL, listener
+from app.repositories.base import Repository
+
+settings = get_settings()
+
+AvailabilityKey = tuple[int, date]
+
+
+class _Inflight:
+    __slots__ = ("future",)
+
+    def __init__(self, future: asyncio.Future):
+        self.future = future
+
+
+class AvailabilityCache:
+    """(service_id, date) ごとのスロット空き状況キャッシュ
+
+    - 予約の作成・キャンセルのコミット後に invalidate() で該当キーを破棄する
+    - 他ワーカーの変更は LISTEN/NOTIFY 経由で handle_notification() が破棄する
+    - 同じキーの再計算は1回にまとめ、後続のリクエストはその結果を待つ（single-flight）
+    - TTL は通知を取りこぼした場合の保険
+    """
+
+    def __init__(self, ttl_seconds: int, max_entries: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self._entries: dict[AvailabilityKey, tuple[float, Any]] = {}
+        self._inflight: dict[AvailabilityKey, _Inflight] = {}
+
+    async def get_or_load(
+        self, key: AvailabilityKey, loader: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """キャッシュ済みの値を返し、なければ loader で計算して保存する"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > time.monotonic():
+            self.hits += 1
+            return entry[1]
+
+        while (inflight := self._inflight.get(key)) is not None:
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(inflight.future)
+            except asyncio.CancelledError:
+                # 計算していたリクエストが中断された場合は自分で計算し直す
+                if (
+                    asyncio.current_task().cancelling()
+                    or not inflight.future.cancelled()
+                ):
+                    raise
+
+        self.misses += 1
+        inflight = _Inflight(asyncio.get_running_loop().create_future())
+        self._inflight[key] = inflight
+        try:
+            value = await loader()
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                inflight.future.cancel()
+            else:
+                inflight.future.set_exception(e)
+                # 待っているリクエストがなくても警告を出さないよう取得済みにする
+                inflight.future.exception()
+            raise
+        finally:
+            # 計算中に invalidate() された場合は結果を保存しない
+            current = self._inflight.get(key) is inflight
+            if current:
+                del self._inflight[key]
+
+        inflight.future.set_result(value)
+        if current:
+            self._store(key, value)
+        return value
+
+    def _store(self, key: AvailabilityKey, value: Any) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, value)
+        while len(self._entries) > self.max_entries:
+            # 最も古く保存されたキーから破棄
+            del self._entries[next(iter(self._entries))]
+
+    def invalidate(self, key: AvailabilityKey) -> None:
+        """キーを破棄（計算中の結果も保存されなくなる）"""
+        self.invalidations += 1
+        self._entries.pop(key, None)
+        self._inflight.pop(key, None)
+
+    def clear(self) -> None:
+        """すべて破棄（通知を取りこぼした可能性がある場合）"""
+        self._entries.clear()
+        self._inflight.clear()
+
+    def handle_notification(self, payload: dict) -> None:
+        """他ワーカー（自身を含む）からの変更通知を処理"""
+        self.invalidate((payload["service_id"], date.fromisoformat(payload["date"])))
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "invalidations": self.invalidations,
+        }
+
+
+availability_cache = AvailabilityCache(
+    ttl_seconds=settings.AVAILABILITY_CACHE_TTL_SECONDS,
+    max_entries=settings.AVAILABILITY_CACHE_MAX_ENTRIES,
+)
+
+
+async def notify_slot_changed(
+    repo: Repository, service_id: int, slot_date: date, slot
+) -> dict:
+    """スロットの予約数変更を通知（コミット前に呼ぶ）
+
+    slot は更新後の (id, reserved, capacity)。コミット後に slot_changed() へ渡す通知内容を返す。
+    """
+    payload = _slot_payload(service_id, slot_date, slot)
+    await repo.publish(SLOT_CHANNEL, [payload])
+    return payload
+
+
+async def notify_slots_changed(repo: Repository, changes: list) -> list[dict]:
+    """複数スロットの予約数変更を1文で通知（changes は (service_id, date, slot) のリスト）"""
+    payloads = [
+        _slot_payload(service_id, slot_date, slot)
+        for service_id, slot_date, slot in changes
+    ]
+    await repo.publish(SLOT_CHANNEL, payloads)
+    return payloads
+
+
+async def notify_days_changed(repo: Repository, days: set) -> list[dict]:
+    """スロットの追加を日ごとに1文で通知（days は (service_id, date) の集合）
+
+    slot_id を含まない通知は、その日のスロット構成が変わったことを表す
+    （キャッシュは破棄し、SSEはスナップショットを送り直す）
+    """
+    payloads = [
+        {"service_id": service_id, "date": slot_date.isoformat()}
+        for service_id, slot_date in sorted(days)
+    ]
+    await repo.publish(SLOT_CHANNEL, payloads)
+    return payloads
+
+
+def _slot_payload(service_id: int, slot_date: date, slot) -> dict:
+    return {
+        "service_id": service_id,
+        "date": slot_date.isoformat(),
+        "slot_id": slot.id,
+        "reserved": slot.reserved,
+        "capacity": slot.capacity,
+    }
+
+
+def slot_changed(payload: dict) -> None:
+    """コミット後にこのワーカー内へ変更を反映
+
+    キャッシュは即座に破棄する。SSEの配信は通常 LISTEN 経由で行うが、
+    待ち受けが止まっている間はここから直接配信する。
+    """
+    availability_cache.invalidate(
+        (payload["service_id"], date.fromisoformat(payload["date"]))
+    )
+    if not listener.connected:
+        availability_hub.publish(payload)
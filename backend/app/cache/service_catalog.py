@@ -0,0 +1,138 @@
+import asyncio
+import json
+import time
+from typing import Optional
+from fastapi.encoders import jsonable_encoder
+from app.api.etag import compute_etag
+from app.core.config import get_settings
+from app.db.notify import SERVICE_CHANNEL
+from app.repositories.base import Repository
+from app.schemas.schemas import ServiceResponse
+
+settings = get_settings()
+
+
+def _encode(payload) -> tuple[bytes, str]:
+    body = json.dumps(
+        jsonable_encoder(payload), ensure_ascii=False, separators=(",", ":")
+    ).encode()
+    return body, compute_etag(body)
+
+
+class ServiceCatalog:
+    """サービス一覧のプロセス内キャッシュ
+
+    invalidate() でバージョンを進めると次回アクセス時に再読み込みする。
+    他ワーカーでの変更は LISTEN/NOTIFY の通知（notify_catalog_changed）で反映し、
+    通知を取りこぼしても refresh_seconds ごとの再読み込みで追いつく。
+    キャッシュにないサービスは404にする前にDBで確認する。
+    一覧・詳細のJSON本文とETagは読み込み時に生成しておく。
+    """
+
+    def __init__(self, refresh_seconds: int):
+        self.refresh_seconds = refresh_seconds
+        self.version = 0
+        self._loaded_version = -1
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._list: tuple[bytes, str] = (b"[]", compute_etag(b"[]"))
+        self._items: dict[int, tuple[bytes, str]] = {}
+
+    def _is_fresh(self) -> bool:
+        return (
+            self._loaded_version == self.version
+            and time.monotonic() - self._loaded_at < self.refresh_seconds
+        )
+
+    async def _ensure_loaded(self, repo: Repository) -> bool:
+        """古ければ読み込み直す（この呼び出しで読み込んだら True）"""
+        if self._is_fresh():
+            return False
+
+        async with self._lock:
+            # 待っている間に他のリクエストが読み込み済みなら何もしない
+            if self._is_fresh():
+                return False
+
+            version = self.version
+            services = [
+                ServiceResponse.model_validate(s) for s in await repo.list_services()
+            ]
+
+            self._list = _encode(services)
+            self._items = {service.id: _encode(service) for service in services}
+            self._loaded_version = version
+            self._loaded_at = time.monotonic()
+            return True
+
+    def invalidate(self) -> None:
+        """このワーカーのキャッシュを無効化（全ワーカーへは notify_catalog_changed で通知）"""
+        self.version += 1
+
+    def handle_notification(self, payload: dict) -> None:
+        """他ワーカー（自身を含む）からの変更通知を処理"""
+        self.invalidate()
+
+    async def _lookup(
+        self, repo: Repository, service_id: int
+    ) -> Optional[ServiceResponse]:
+        """キャッシュにないサービスをDBで確認（他ワーカーで追加された直後など）
+
+        読み込んだばかりの一覧になければ確認しない。見つかった場合は次回アクセス時に
+        一覧を読み込み直す
+        """
+        service = await repo.get_service(service_id)
+        if service is None:
+            return None
+        self.invalidate()
+        return ServiceResponse.model_validate(service)
+
+    async def get_list(self, repo: Repository) -> tuple[bytes, str]:
+        """サービス一覧のJSON本文とETagを取得"""
+        await self._ensure_loaded(repo)
+        return self._list
+
+    async def get(
+        self, repo: Repository, service_id: int
+    ) -> Optional[tuple[bytes, str]]:
+        """サービス詳細のJSON本文とETagを取得（存在しなければ None）"""
+        loaded = await self._ensure_loaded(repo)
+        cached = self._items.get(service_id)
+        if cached is None and not loaded:
+            service = await self._lookup(repo, service_id)
+            if service is not None:
+                cached = _encode(service)
+        return cached
+
+    async def exists(self, repo: Repository, service_id: int) -> bool:
+        """サービスが存在するか"""
+        loaded = await self._ensure_loaded(repo)
+        if service_id in self._items:
+            return True
+        return not loaded and await self._lookup(repo, service_id) is not None
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "loaded_version": self._loaded_version,
+            "age_seconds": (
+                time.monotonic() - self._loaded_at if self._loaded_at else None
+            ),
+            "refresh_seconds": self.refresh_seconds,
+            "services": len(self._items),
+        }
+
+
+service_catalog = ServiceCatalog(
+    refresh_seconds=settings.SERVICE_CATALOG_REFRESH_SECONDS
+)
+
+
+async def notify_catalog_changed(repo: Repository) -> None:
+    """サービスの追加・変更を全ワーカーへ通知（コミット時に配信される）
+
+    このワーカーのキャッシュも無効化する。LISTEN が止まっている他ワーカーは
+    refresh_seconds ごとの再読み込みで反映する。
+    """
+    service_catalog.invalidate()
+    await repo.publish(SERVICE_CHANNEL, [{}])
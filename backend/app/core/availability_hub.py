@@ -0,0 +1,83 @@
+import asyncio
+from datetime import date
+from typing import Optional
+from app.core.config import get_settings
+
+settings = get_settings()
+
+HubKey = tuple[int, date]
+
+
+class Subscription:
+    """1接続分の購読（キューが溢れたら差分を捨て、次にスナップショットを送り直す）"""
+
+    __slots__ = ("key", "queue", "overflowed")
+
+    def __init__(self, key: HubKey, queue_size: int):
+        self.key = key
+        self.queue: asyncio.Queue[dict] = asyncio.Queue(maxsize=queue_size)
+        self.overflowed = False
+
+    def drain(self) -> None:
+        """溜まっている差分を捨てる"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+
+class AvailabilityHub:
+    """(service_id, date) ごとの購読者へスロット予約数の変更を配信する
+
+    publish() は待たずにキューへ積むだけなので、遅い購読者が他を遅らせることはない。
+    """
+
+    def __init__(self, max_connections: int, queue_size: int):
+        self.max_connections = max_connections
+        self.queue_size = queue_size
+        self.connections = 0
+        self.dropped = 0
+        self._subscribers: dict[HubKey, set[Subscription]] = {}
+
+    def subscribe(self, key: HubKey) -> Optional[Subscription]:
+        """購読を開始（接続数の上限に達していれば None）"""
+        if self.connections >= self.max_connections:
+            return None
+        subscription = Subscription(key, self.queue_size)
+        self._subscribers.setdefault(key, set()).add(subscription)
+        self.connections += 1
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.key)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        if not subscribers:
+            del self._subscribers[subscription.key]
+        self.connections -= 1
+
+    def publish(self, payload: dict) -> None:
+        """スロットの変更を該当キーの購読者に配信"""
+        key = (payload["service_id"], date.fromisoformat(payload["date"]))
+        for subscription in self._subscribers.get(key, ()):
+            if subscription.overflowed:
+                continue
+            try:
+                subscription.queue.put_nowait(payload)
+            except asyncio.QueueFull:
+                subscription.overflowed = True
+                self.dropped += 1
+
+    def stats(self) -> dict:
+        return {
+            "connections": self.connections,
+            "max_connections": self.max_connections,
+            "keys": len(self._subscribers),
+            "dropped": self.dropped,
+        }
+
+
+availability_hub = AvailabilityHub(
+    max_connections=settings.SSE_MAX_CONNECTIONS,
+    queue_size=settings.SSE_QUEUE_SIZE,
+)
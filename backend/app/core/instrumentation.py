@@ -0,0 +1,210 @@
+import contextvars
+import time
+from collections import Counter
+from typing import Optional
+from sqlalchemy import event
+from starlette.datastructures import MutableHeaders
+from app.core.config import get_settings
+from app.core.metrics import (
+    Histogram,
+    format_labels,
+    render_header,
+    render_sample,
+)
+from app.core.query_budget import (
+    QUERY_COUNT_HEADER,
+    QUERY_WARNING_HEADER,
+    check_query_budget,
+)
+
+settings = get_settings()
+
+# 1リクエストあたりのSQL文数用バケット
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89)
+
+# ルートに一致しなかったリクエストのラベル（パスをそのまま使うと系列が増え続けるため）
+UNMATCHED_ROUTE = "<unmatched>"
+
+
+class RequestStats:
+    """処理中リクエストのSQL実行数・時間（queries はクエリ予算の検査時のみ記録）"""
+
+    __slots__ = ("statements", "sql_seconds", "queries")
+
+    def __init__(self, record_queries: bool = False):
+        self.statements = 0
+        self.sql_seconds = 0.0
+        self.queries: Optional[Counter] = Counter() if record_queries else None
+
+
+current_request: contextvars.ContextVar[Optional[RequestStats]] = (
+    contextvars.ContextVar("current_request", default=None)
+)
+
+
+class RouteMetrics:
+    """ルート（メソッド + パステンプレート）ごとの系列
+
+    ラベル文字列は作成時に1度だけ組み立て、リクエスト処理中は数値の更新のみ行う。
+    """
+
+    __slots__ = ("labels", "status_counts", "latency", "statements", "sql_seconds")
+
+    def __init__(self, method: str, route: str):
+        self.labels = format_labels(method=method, route=route)
+        self.status_counts: dict[int, int] = {}
+        self.latency = Histogram()
+        self.statements = Histogram(STATEMENT_COUNT_BUCKETS)
+        self.sql_seconds = Histogram()
+
+    def observe(self, status_code: int, elapsed: float, stats: RequestStats) -> None:
+        self.status_counts[status_code] = self.status_counts.get(status_code, 0) + 1
+        self.latency.observe(elapsed)
+        self.statements.observe(stats.statements)
+        self.sql_seconds.observe(stats.sql_seconds)
+
+
+class RequestMetrics:
+    """HTTPリクエストとSQL実行の集計（ロックなし、イベントループ上でのみ更新）"""
+
+    def __init__(self):
+        self.routes: dict[tuple[str, str], RouteMetrics] = {}
+        self.in_flight = 0
+        self.sql_statements_total = 0
+        self.sql_seconds = Histogram()
+
+    def route(self, method: str, route: str) -> RouteMetrics:
+        metrics = self.routes.get((method, route))
+        if metrics is None:
+            metrics = self.routes[(method, route)] = RouteMetrics(method, route)
+        return metrics
+
+    def record_statement(self, statement: str, elapsed: float) -> None:
+        self.sql_statements_total += 1
+        self.sql_seconds.observe(elapsed)
+        stats = current_request.get()
+        if stats is not None:
+            stats.statements += 1
+            stats.sql_seconds += elapsed
+            if stats.queries is not None:
+                stats.queries[statement] += 1
+
+    def render(self) -> list[str]:
+        """Prometheus テキスト形式の行を返す"""
+        routes = sorted(self.routes.values(), key=lambda metrics: metrics.labels)
+
+        lines = render_header(
+            "http_requests_total", "counter", "HTTP requests by route and status"
+        )
+        for metrics in routes:
+            for status_code, count in sorted(metrics.status_counts.items()):
+                labels = f'{metrics.labels},status="{status_code}"'
+                lines.append(render_sample("http_requests_total", count, labels))
+
+        lines += render_header(
+            "http_requests_in_flight", "gauge", "HTTP requests currently in progress"
+        )
+        lines.append(render_sample("http_requests_in_flight", self.in_flight))
+
+        for name, attribute, metric_help in (
+            ("http_request_duration_seconds", "latency", "HTTP request latency"),
+            (
+                "http_request_sql_statements",
+                "statements",
+                "SQL statements executed per request",
+            ),
+            (
+                "http_request_sql_duration_seconds",
+                "sql_seconds",
+                "Time spent in SQL per request",
+            ),
+        ):
+            lines += render_header(name, "histogram", metric_help)
+            for metrics in routes:
+                lines += getattr(metrics, attribute).render(name, metrics.labels)
+
+        lines += render_header(
+            "db_statements_total", "counter", "SQL statements executed"
+        )
+        lines.append(render_sample("db_statements_total", self.sql_statements_total))
+        lines += render_header(
+            "db_statement_duration_seconds", "histogram", "SQL statement latency"
+        )
+        lines += self.sql_seconds.render("db_statement_duration_seconds")
+        return lines
+
+
+request_metrics = RequestMetrics()
+
+
+def instrument_engine(sync_engine) -> None:
+    """SQL実行のフックを登録（非同期エンジンは sync_engine を渡す）"""
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def _before_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        context._query_start_time = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def _after_cursor_execute(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        request_metrics.record_statement(
+            statement, time.perf_counter() - context._query_start_time
+        )
+
+
+class MetricsMiddleware:
+    """ルートごとのレイテンシ・ステータス・SQL実行数を記録するASGIミドルウェア"""
+
+    def __init__(self, app):
+        self.app = app
+        self.check_query_budget = settings.is_query_budget_check_enabled()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats(record_queries=self.check_query_budget)
+        token = current_request.set(stats)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if stats.queries is not None:
+                    self._add_query_headers(scope, message, stats)
+            await send(message)
+
+        request_metrics.in_flight += 1
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            request_metrics.in_flight -= 1
+            current_request.reset(token)
+
+            # ルーティング後に scope["route"] が設定される
+            route = scope.get("route")
+            path = route.path if route is not None else UNMATCHED_ROUTE
+            request_metrics.route(scope["method"], path).observe(
+                status_code, elapsed, stats
+            )
+
+    @staticmethod
+    def _add_query_headers(scope, message, stats: RequestStats) -> None:
+        """開発用: SQL実行数と予算超過・N+1の警告をレスポンスヘッダーに付ける
+
+        ストリーミングレスポンスではボディ送信中のSQLは含まれない。
+        """
+        headers = MutableHeaders(scope=message)
+        headers[QUERY_COUNT_HEADER] = str(stats.statements)
+        warning = check_query_budget(
+            scope["method"], scope.get("route"), stats.statements, stats.queries
+        )
+        if warning:
+            headers[QUERY_WARNING_HEADER] = warning
@@ -0,0 +1,75 @@
+from bisect import bisect_left
+from typing import Sequence
+
+# 待ち時間・レイテンシ用の既定バケット（秒）
+DEFAULT_LATENCY_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _escape_label(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def format_labels(**labels) -> str:
+    """Prometheus のラベル文字列を生成（系列の作成時に1度だけ呼ぶ）"""
+    return ",".join(f'{key}="{_escape_label(value)}"' for key, value in labels.items())
+
+
+def render_header(name: str, metric_type: str, help_text: str) -> list[str]:
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} {metric_type}"]
+
+
+def render_sample(name: str, value, labels: str = "") -> str:
+    """Prometheus テキスト形式の1系列"""
+    if labels:
+        return f"{name}{{{labels}}} {value}"
+    return f"{name} {value}"
+
+
+class Histogram:
+    """固定バケットのヒストグラム（ロックなし、observe は O(log n)）"""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        # 最後の要素は +Inf バケット
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def snapshot(self) -> dict:
+        """累積バケットを含むスナップショットを返す"""
+        cumulative = []
+        total = 0
+        for upper, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            cumulative.append({"le": upper, "count": total})
+        return {"buckets": cumulative, "count": self.count, "sum": self.sum}
+
+    def render(self, name: str, labels: str = "") -> list[str]:
+        """Prometheus テキスト形式の行を返す（ヘッダーは含まない）"""
+        prefix = f"{labels}," if labels else ""
+        lines = []
+        total = 0
+        for upper, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{prefix}le="{upper}"}} {total}')
+        lines.append(render_sample(f"{name}_sum", self.sum, labels))
+        lines.append(render_sample(f"{name}_count", self.count, labels))
+        return lines
@@ -0,0 +1,82 @@
+import logging
+from collections import Counter
+from typing import Optional
+from app.core.config import get_settings
+
+settings = get_settings()
+logger = logging.getLogger(__name__)
+
+QUERY_COUNT_HEADER = "x-query-count"
+QUERY_WARNING_HEADER = "x-query-budget-warning"
+
+
+def query_budget(max_statements: int):
+    """エンドポイントの1リクエストあたりのSQL実行数の上限を宣言するデコレーター
+
+    ルーターのデコレーターより内側に付ける:
+
+        @router.get("/mine")
+        @query_budget(2)
+        async def get_my_bookings(...):
+    """
+
+    def decorator(endpoint):
+        endpoint.query_budget = max_statements
+        return endpoint
+
+    return decorator
+
+
+def get_query_budget(route) -> Optional[int]:
+    """ルートに宣言されたクエリ予算（未宣言なら None）"""
+    return getattr(getattr(route, "endpoint", None), "query_budget", None)
+
+
+def check_query_budget(
+    method: str, route, statements: int, queries: Counter
+) -> Optional[str]:
+    """予算超過・同一SQLの繰り返しを検出し、警告メッセージを返す（問題なければ None）"""
+    problems = []
+    budget = get_query_budget(route)
+    if budget is not None and statements > budget:
+        problems.append(f"{statements} statements exceed budget of {budget}")
+
+    repeated = [
+        (statement, count)
+        for statement, count in queries.most_common()
+        if count >= settings.QUERY_REPEAT_THRESHOLD
+    ]
+    if repeated:
+        problems.append(f"{len(repeated)} statement(s) repeated (possible N+1)")
+
+    if not problems:
+        return None
+
+    path = route.path if route is not None else "?"
+    message = "; ".join(problems)
+    logger.warning(
+        "Query budget warning on %s %s: %s%s",
+        method,
+        path,
+        message,
+        "".join(
+            f"\n  {count}x {' '.join(statement.split())}"
+            for statement, count in repeated
+        ),
+    )
+    return message
+
+
+def assert_query_budget(response) -> None:
+    """テスト用: レスポンスがクエリ予算内か検査する（QUERY_BUDGET_CHECK を有効にして使う）
+
+    tests/conftest.py の client フィクスチャが全リクエストに適用する。
+    """
+    if QUERY_COUNT_HEADER not in response.headers:
+        raise AssertionError("Query recording is disabled; set QUERY_BUDGET_CHECK=true")
+    warning = response.headers.get(QUERY_WARNING_HEADER)
+    if warning:
+        raise AssertionError(
+            f"{response.request.method} {response.request.url.path}: {warning} "
+            f"({response.headers[QUERY_COUNT_HEADER]} statements)"
+        )
@@ -1,12 +1,27 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
 from typing import Optional
+from fastapi import HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import get_settings
 
 settings = get_settings()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# コストが設定値と異なるハッシュは needs_update 扱いになり、ログイン時に再ハッシュされる
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt専用のプロセスプール（初回利用時に起動）
+_password_executor: Optional[ProcessPoolExecutor] = None
+_pending_password_jobs = 0
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -14,11 +29,71 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """パスワードを検証し、コスト変更時は新しいハッシュも返す"""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
 def get_password_hash(password: str) -> str:
     """パスワードをハッシュ化"""
     return pwd_context.hash(password)
 
 
+def _get_password_executor() -> ProcessPoolExecutor:
+    global _password_executor
+    if _password_executor is None:
+        _password_executor = ProcessPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _password_executor
+
+
+async def _run_password_job(func, *args):
+    """パスワード処理をプロセスプールで実行
+
+    待ち件数が上限に達している場合は待たせずに503を返す
+    """
+    global _pending_password_jobs
+    if _pending_password_jobs >= settings.PASSWORD_HASH_MAX_PENDING:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="混雑しています。しばらくしてから再度お試しください",
+            headers={"Retry-After": "1"},
+        )
+
+    _pending_password_jobs += 1
+    try:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_get_password_executor(), func, *args)
+    finally:
+        _pending_password_jobs -= 1
+
+
+async def verify_and_update_password_async(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, Optional[str]]:
+    """verify_and_update_password をプロセスプールで実行"""
+    return await _run_password_job(
+        verify_and_update_password, plain_password, hashed_password
+    )
+
+
+async def get_password_hash_async(password: str) -> str:
+    """get_password_hash をプロセスプールで実行"""
+    return await _run_password_job(get_password_hash, password)
+
+
+def shutdown_password_executor() -> None:
+    """プロセスプールを停止"""
+    global _password_executor
+    if _password_executor is not None:
+        _password_executor.shutdown(cancel_futures=True)
+        _password_executor = None
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """アクセストークンを作成"""
     to_encode = data.copy()
@@ -55,11 +130,6 @@ def create_refresh_token(data: dict) -> str:
 def decode_token(token: str) -> dict:
     """トークンをデコード"""
     try:
-        payload = jwt.decode(
-            token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
-        )
-        print(f"[DEBUG] Token decoded successfully: {payload}")
-        return payload
-    except JWTError as e:
-        print(f"[DEBUG] JWT decode error: {e}")
+        return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except JWTError:
         return None
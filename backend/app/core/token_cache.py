@@ -0,0 +1,74 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from app.core.config import get_settings
+
+settings = get_settings()
+
+
+class TokenCache:
+    """検証済みトークンのキャッシュ（件数上限付きLRU + TTL）
+
+    キーはトークンのSHA-256ダイジェストで、トークン本体は保持しない。
+    エントリの有効期限はTTLとトークンの exp の早い方になる。
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: int):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[bytes, tuple[float, Any]] = OrderedDict()
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Any]:
+        """キャッシュ済みの値を取得（期限切れ・未登録なら None）"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, value = entry
+        if expires_at <= time.time():
+            del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, token: str, value: Any, exp: float) -> None:
+        """値を登録（exp はトークンの有効期限のUNIX時刻）"""
+        expires_at = min(time.time() + self.ttl_seconds, exp)
+        if expires_at <= time.time() or self.max_size <= 0:
+            return
+
+        key = self._key(token)
+        self._entries[key] = (expires_at, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+token_cache = TokenCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.TOKEN_CACHE_TTL_SECONDS,
+)
@@ -1,8 +1,12 @@
 from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import NullPool
+from functools import lru_cache
+from urllib.parse import urlparse
 from app.core.config import get_settings
+from app.core.instrumentation import instrument_engine
+from app.db.pool import ASYNC_POOL_CLASSES, POOL_CLASSES
 import os
 import sys
 
@@ -15,38 +19,178 @@ if sys.platform == "win32":
 
     locale.getpreferredencoding = lambda: "UTF-8"
 
-settings = get_settings()
+Base = declarative_base()
 
-# Get database URL based on environment
-database_url = settings.get_database_url()
+# エンジン・セッションは初回利用時に作成する（import 時には接続先の解析もしない）
 
-# Create engine with explicit connection parameters to avoid DSN parsing issues
-from urllib.parse import urlparse
 
-parsed_url = urlparse(database_url)
+def _connection_target(database_url: str) -> str:
+    # Create engine with explicit connection parameters to avoid DSN parsing issues
+    parsed_url = urlparse(database_url)
 
-# Build connection URL with minimal parameters
-connection_url = f"postgresql+psycopg2://{parsed_url.username}:{parsed_url.password}@{parsed_url.hostname}:{parsed_url.port}/{parsed_url.path.lstrip('/').split('?')[0]}"
+    # Build connection URL with minimal parameters
+    return f"{parsed_url.username}:{parsed_url.password}@{parsed_url.hostname}:{parsed_url.port}/{parsed_url.path.lstrip('/').split('?')[0]}"
 
-engine = create_engine(
-    connection_url,
-    pool_pre_ping=True,
-    connect_args={
-        "options": "-c search_path=yoga_reserve",
-        "client_encoding": "utf8",
-    },
-    poolclass=NullPool,  # Disable connection pooling to avoid encoding issues
-)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+@lru_cache()
+def get_connection_target() -> str:
+    """接続先（user:password@host:port/dbname）を取得"""
+    # Get database URL based on environment
+    return _connection_target(get_settings().get_database_url())
 
-Base = declarative_base()
+
+def get_listen_dsn() -> str:
+    """LISTEN/NOTIFY 用に asyncpg へ直接渡すDSN"""
+    return f"postgresql://{get_connection_target()}"
+
+
+def _pool_options() -> dict:
+    settings = get_settings()
+    if settings.DB_POOL_CLASS != "queue":
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+# 001 のマイグレーションは bookingstatus 型を public に作成している。asyncpg は
+# パラメータを型名で明示的にキャストする（$1::bookingstatus）ため、public も探索する
+SEARCH_PATH = "yoga_reserve, public"
+
+
+def set_session_defaults(dbapi_connection, connection_record):
+    """新規コネクションごとにエンコーディングとスキーマを設定
+
+    プールで再利用されても設定が維持されるよう、接続時に一度だけ実行してコミットする
+    """
+    dbapi_connection.set_client_encoding("UTF8")
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"SET search_path TO {SEARCH_PATH}")
+    cursor.close()
+    dbapi_connection.commit()
+
+
+@lru_cache()
+def get_engine():
+    """同期エンジン（Alembic・スクリプト用）"""
+    settings = get_settings()
+    engine = create_engine(
+        f"postgresql+psycopg2://{get_connection_target()}",
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        poolclass=POOL_CLASSES[settings.DB_POOL_CLASS],
+        **_pool_options(),
+    )
+    event.listen(engine, "connect", set_session_defaults)
+    return engine
+
+
+def _create_async_engine(connection_target: str, **connect_args):
+    """asyncpg は常にUTF-8で通信するため、search_path のみ接続時に設定する"""
+    settings = get_settings()
+    async_engine = create_async_engine(
+        f"postgresql+asyncpg://{connection_target}",
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+        poolclass=ASYNC_POOL_CLASSES[settings.DB_POOL_CLASS],
+        connect_args={
+            "server_settings": {"search_path": SEARCH_PATH},
+            **connect_args,
+        },
+        **_pool_options(),
+    )
+
+    # リクエストごとのSQL実行数・時間を /metrics に記録
+    instrument_engine(async_engine.sync_engine)
+    return async_engine
+
+
+@lru_cache()
+def get_async_engine():
+    """非同期エンジン（APIリクエスト用）"""
+    return _create_async_engine(get_connection_target())
+
+
+@lru_cache()
+def get_replica_async_engine():
+    """読み取り専用レプリカの非同期エンジン（レプリカ未設定なら None）
+
+    落ちているレプリカへの接続でリクエストが待たされないよう、接続タイムアウトを短くする
+    """
+    settings = get_settings()
+    if not settings.uses_replica():
+        return None
+    return _create_async_engine(
+        _connection_target(settings.get_replica_database_url()),
+        timeout=settings.REPLICA_TIMEOUT_SECONDS,
+    )
+
+
+def get_created_engines() -> dict:
+    """作成済みのエンジンだけを名前ごとに返す（状況の確認のためにエンジンを作成しない）"""
+    engines = {}
+    for name, get in (
+        ("async", get_async_engine),
+        ("sync", get_engine),
+        ("replica", get_replica_async_engine),
+    ):
+        if get.cache_info().currsize:
+            engine = get()
+            if engine is not None:
+                engines[name] = engine
+    return engines
+
+
+@lru_cache()
+def get_sessionmaker():
+    """同期セッション（Alembic・create_sample_data.py 用）"""
+    return sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
+
+
+@lru_cache()
+def get_async_sessionmaker():
+    """非同期セッション（APIリクエスト用）"""
+    return async_sessionmaker(
+        get_async_engine(), autoflush=False, expire_on_commit=False
+    )
+
+
+@lru_cache()
+def get_replica_async_sessionmaker():
+    """読み取り専用レプリカの非同期セッション（レプリカ未設定なら None）"""
+    replica_engine = get_replica_async_engine()
+    if replica_engine is None:
+        return None
+    return async_sessionmaker(replica_engine, autoflush=False, expire_on_commit=False)
+
+
+# 従来の属性名（engine, SessionLocal など）でも参照できるようにする（PEP 562）
+_LAZY_ATTRIBUTES = {
+    "engine": get_engine,
+    "async_engine": get_async_engine,
+    "SessionLocal": get_sessionmaker,
+    "AsyncSessionLocal": get_async_sessionmaker,
+    "listen_dsn": get_listen_dsn,
+}
+
+
+def __getattr__(name: str):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_db():
     """データベースセッションを取得"""
-    db = SessionLocal()
+    db = get_sessionmaker()()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    """非同期データベースセッションを取得"""
+    async with get_async_sessionmaker()() as db:
+        yield db
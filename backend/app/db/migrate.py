@@ -0,0 +1,57 @@
+"""
+Run Alembic migrations only when the database is behind
+
+Checking the current revision costs one query, so a scaled-out instance
+whose schema is already at head starts without loading the migration
+environment at all.
+
+Usage:
+    python -m app.db.migrate
+"""
+
+from pathlib import Path
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+from app.core.config import get_settings
+
+ALEMBIC_INI = Path(__file__).resolve().parents[2] / "alembic.ini"
+
+
+def get_alembic_config() -> Config:
+    config = Config(str(ALEMBIC_INI))
+    config.set_main_option(
+        "script_location",
+        str(ALEMBIC_INI.parent / config.get_main_option("script_location")),
+    )
+    return config
+
+
+def get_current_heads() -> set:
+    """データベースに記録されているリビジョン（Alembic と同じ接続設定で確認）"""
+    engine = create_engine(get_settings().get_database_url(), poolclass=NullPool)
+    try:
+        with engine.connect() as connection:
+            return set(MigrationContext.configure(connection).get_current_heads())
+    finally:
+        engine.dispose()
+
+
+def migrate() -> None:
+    config = get_alembic_config()
+    heads = set(ScriptDirectory.from_config(config).get_heads())
+    current = get_current_heads()
+
+    if current == heads:
+        print(f"Database schema is up to date ({', '.join(sorted(heads))})")
+        return
+
+    print(f"Upgrading database schema: {sorted(current) or 'empty'} -> {sorted(heads)}")
+    command.upgrade(config, "head")
+
+
+if __name__ == "__main__":
+    migrate()
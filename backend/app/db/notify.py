@@ -0,0 +1,122 @@
+import asyncio
+import json
+import logging
+from typing import Callable
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_listen_dsn
+
+logger = logging.getLogger(__name__)
+
+# スロットの予約数が変わったことを通知するチャンネル
+SLOT_CHANNEL = "slot_availability"
+# サービスの追加・変更を通知するチャンネル（ペイロードは空）
+SERVICE_CHANNEL = "service_catalog"
+
+
+async def publish(db: AsyncSession, channel: str, payload: dict) -> None:
+    """トランザクション内で通知を発行（コミット時に配信、ロールバック時は破棄）"""
+    await db.execute(
+        text("SELECT pg_notify(:channel, :payload)"),
+        {"channel": channel, "payload": json.dumps(payload, separators=(",", ":"))},
+    )
+
+
+async def publish_many(db: AsyncSession, channel: str, payloads: list[dict]) -> None:
+    """複数の通知を1文で発行（publish と同じくコミット時に配信）"""
+    await db.execute(
+        text(
+            "SELECT pg_notify(:channel, payload) "
+            "FROM unnest(CAST(:payloads AS text[])) AS payload"
+        ),
+        {
+            "channel": channel,
+            "payloads": [
+                json.dumps(payload, separators=(",", ":")) for payload in payloads
+            ],
+        },
+    )
+
+
+class NotificationListener:
+    """Postgres の LISTEN を専用コネクションで待ち受け、チャンネルごとのハンドラを呼ぶ
+
+    接続が切れた場合は再接続し、取りこぼした可能性があるため on_reconnect を呼ぶ。
+    """
+
+    def __init__(self, get_dsn: Callable[[], str], retry_seconds: float = 5.0):
+        self.get_dsn = get_dsn
+        self.retry_seconds = retry_seconds
+        self._handlers: dict[str, list[Callable[[dict], None]]] = {}
+        self._reconnect_handlers: list[Callable[[], None]] = []
+        self._task: asyncio.Task | None = None
+        self.connected = False
+
+    def subscribe(self, channel: str, handler: Callable[[dict], None]) -> None:
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def on_reconnect(self, handler: Callable[[], None]) -> None:
+        self._reconnect_handlers.append(handler)
+
+    def _dispatch(self, connection, pid, channel, payload) -> None:
+        try:
+            data = json.loads(payload)
+        except ValueError:
+            logger.warning("Invalid notification payload on %s: %r", channel, payload)
+            return
+        for handler in self._handlers.get(channel, []):
+            try:
+                handler(data)
+            except Exception:
+                logger.exception("Notification handler failed on %s", channel)
+
+    async def _run(self) -> None:
+        # asyncpg の読み込みは起動後に行う（import 時間の短縮）
+        import asyncpg
+
+        first = True
+        while True:
+            closed = asyncio.Event()
+            try:
+                conn = await asyncpg.connect(self.get_dsn())
+            except (OSError, asyncpg.PostgresError) as e:
+                logger.warning("LISTEN connection failed: %s", e)
+                await asyncio.sleep(self.retry_seconds)
+                continue
+
+            try:
+                conn.add_termination_listener(lambda _conn: closed.set())
+                for channel in self._handlers:
+                    await conn.add_listener(channel, self._dispatch)
+                self.connected = True
+
+                if not first:
+                    for handler in self._reconnect_handlers:
+                        handler()
+                first = False
+
+                await closed.wait()
+                logger.warning("LISTEN connection lost, reconnecting")
+            finally:
+                self.connected = False
+                if not conn.is_closed():
+                    await conn.close()
+            await asyncio.sleep(self.retry_seconds)
+
+    def start(self) -> None:
+        """待ち受けをバックグラウンドで開始"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """待ち受けを停止"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+listener = NotificationListener(get_listen_dsn)
@@ -0,0 +1,76 @@
+import time
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from app.core.metrics import Histogram, format_labels, render_header, render_sample
+
+# コネクション取得までの待ち時間（秒）
+pool_wait_seconds = Histogram()
+
+
+class _WaitTimingMixin:
+    """プールからのコネクション取得待ち時間を計測する"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            pool_wait_seconds.observe(time.perf_counter() - start)
+
+
+class InstrumentedQueuePool(_WaitTimingMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(_WaitTimingMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class InstrumentedNullPool(_WaitTimingMixin, NullPool):
+    pass
+
+
+# 同期エンジン（Alembic・スクリプト用）
+POOL_CLASSES = {
+    "queue": InstrumentedQueuePool,
+    "null": InstrumentedNullPool,
+}
+
+# 非同期エンジン（リクエスト処理用）
+ASYNC_POOL_CLASSES = {
+    "queue": InstrumentedAsyncAdaptedQueuePool,
+    "null": InstrumentedNullPool,
+}
+
+
+def get_pool_status(pool) -> dict:
+    """プールの利用状況を取得"""
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    return status
+
+
+def render_pool_metrics(pools: dict) -> list[str]:
+    """プールの利用状況を Prometheus テキスト形式で返す（pools は 名前 -> プール）"""
+    lines = render_header(
+        "db_pool_connections", "gauge", "Database connections by pool and state"
+    )
+    for name, pool in pools.items():
+        status = get_pool_status(pool)
+        for state in ("checked_out", "idle", "overflow"):
+            if state in status:
+                labels = format_labels(pool=name, state=state)
+                lines.append(
+                    render_sample("db_pool_connections", status[state], labels)
+                )
+
+    lines += render_header(
+        "db_pool_wait_seconds", "histogram", "Time spent waiting for a connection"
+    )
+    lines += pool_wait_seconds.render("db_pool_wait_seconds")
+    return lines
@@ -0,0 +1,35 @@
+import asyncio
+import logging
+from app.repositories.factory import open_repository
+
+logger = logging.getLogger(__name__)
+
+# 1トランザクションで削除する期限切れキーの上限（ロックと WAL を小さく保つ）
+PURGE_BATCH_SIZE = 1000
+
+
+async def purge_expired_idempotency_keys(batch_size: int = PURGE_BATCH_SIZE) -> int:
+    """期限切れの Idempotency-Key を batch_size 件ずつ削除し、削除件数を返す"""
+    total = 0
+    while True:
+        async with open_repository() as repo:
+            deleted = await repo.purge_expired_responses(batch_size)
+            await repo.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
+
+
+async def run_idempotency_purge(interval_seconds: int) -> None:
+    """interval_seconds ごとに期限切れのキーを削除（lifespan のバックグラウンドタスク）
+
+    複数ワーカーで同時に動いても、削除済みの行は対象にならないだけで問題ない
+    """
+    while True:
+        try:
+            deleted = await purge_expired_idempotency_keys()
+            if deleted:
+                logger.info("Purged %d expired idempotency keys", deleted)
+        except Exception as e:
+            logger.warning("Idempotency key purge failed: %s", e)
+        await asyncio.sleep(interval_seconds)
@@ -0,0 +1,185 @@
+import asyncio
+import logging
+import time
+from typing import Callable, Optional
+from fastapi import Response
+from sqlalchemy import text
+from app.core.config import get_settings
+from app.core.instrumentation import current_request
+from app.db.database import get_replica_async_engine
+
+settings = get_settings()
+
+logger = logging.getLogger(__name__)
+
+# 最後に適用したトランザクション（プライマリでのコミット時刻）からの経過秒
+# WALの受信自体が止まっていても遅延として現れる。プライマリに書き込みがない間も増えるが、
+# その間はプライマリから読むだけなので安全側に倒れる
+# スタンバイでなければ0、まだ何も適用していなければ遅延が不明なので無限大として扱う
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN NOT pg_is_in_recovery() THEN 0 "
+    "ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), "
+    "'Infinity'::float8) END"
+)
+
+# 書き込んだ時刻をクライアントに持たせ、次のリクエストで送り返してもらうヘッダー
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+class ReplicaRouter:
+    """読み取りをレプリカへ振り分けてよいかの判定（ワーカーごと）
+
+    - 予約・キャンセルしたユーザーは sticky_seconds の間プライマリから読む（read-your-writes）
+      書き込み時刻は X-Last-Write ヘッダーでクライアントに渡し、送り返されれば
+      どのワーカーでも判定できる。ヘッダーを送らないクライアントのため、ワーカー内でも記録する
+    - 接続できなかった場合は retry_seconds の間プライマリのみ使う
+    - 遅延を lag_check_seconds ごとに計測し、max_lag_seconds 以上ならプライマリから読む
+    """
+
+    def __init__(
+        self,
+        get_engine: Callable,
+        max_lag_seconds: float,
+        lag_check_seconds: float,
+        retry_seconds: float,
+        sticky_seconds: float,
+        timeout_seconds: float,
+        max_sticky_users: int = 10000,
+    ):
+        self.get_engine = get_engine
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self.retry_seconds = retry_seconds
+        self.sticky_seconds = sticky_seconds
+        self.timeout_seconds = timeout_seconds
+        self.max_sticky_users = max_sticky_users
+        self.lag_seconds: Optional[float] = None
+        self.replica_reads = 0
+        self.primary_reads = 0
+        self.failures = 0
+        self._lag_checked_at = float("-inf")
+        self._unavailable_until = 0.0
+        self._lock = asyncio.Lock()
+        self._sticky: dict[int, float] = {}
+
+    def mark_write(self, user_id: int, response: Optional[Response] = None) -> None:
+        """ユーザーの書き込みをコミットした後に呼ぶ（response があれば書き込み時刻を渡す）"""
+        if response is not None:
+            response.headers[LAST_WRITE_HEADER] = f"{time.time():.3f}"
+        now = time.monotonic()
+        self._sticky.pop(user_id, None)
+        self._sticky[user_id] = now + self.sticky_seconds
+        if len(self._sticky) > self.max_sticky_users:
+            # 期限切れを捨て、それでも多ければ古く登録されたものから捨てる
+            self._sticky = {
+                key: until for key, until in self._sticky.items() if until > now
+            }
+            while len(self._sticky) > self.max_sticky_users:
+                del self._sticky[next(iter(self._sticky))]
+
+    def wrote_recently(self, last_write: Optional[str]) -> bool:
+        """クライアントが送り返した書き込み時刻が sticky_seconds 以内か
+
+        ワーカー間の時計のずれを考え、未来の時刻も同じ幅まで受け付ける
+        """
+        if not last_write:
+            return False
+        try:
+            written_at = float(last_write)
+        except ValueError:
+            return False
+        return abs(time.time() - written_at) < self.sticky_seconds
+
+    def is_sticky(self, user_id: int) -> bool:
+        until = self._sticky.get(user_id)
+        if until is None:
+            return False
+        if until <= time.monotonic():
+            del self._sticky[user_id]
+            return False
+        return True
+
+    def mark_unavailable(self, error: BaseException) -> None:
+        """レプリカに接続できなかった（retry_seconds の間使わない）"""
+        self.failures += 1
+        self._unavailable_until = time.monotonic() + self.retry_seconds
+        logger.warning(
+            "Read replica unavailable, using primary for %ss: %s",
+            self.retry_seconds,
+            error,
+        )
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._unavailable_until
+
+    async def use_replica(
+        self, user_id: Optional[int] = None, last_write: Optional[str] = None
+    ) -> bool:
+        """この読み取りをレプリカで行うか"""
+        use = (
+            self.get_engine() is not None
+            and not self.wrote_recently(last_write)
+            and (user_id is None or not self.is_sticky(user_id))
+            and self.available
+            and await self._lag_within_limit()
+        )
+        if use:
+            self.replica_reads += 1
+        else:
+            self.primary_reads += 1
+        return use
+
+    async def _lag_within_limit(self) -> bool:
+        if time.monotonic() - self._lag_checked_at >= self.lag_check_seconds:
+            async with self._lock:
+                # 待っている間に他のリクエストが計測済みなら何もしない
+                if time.monotonic() - self._lag_checked_at >= self.lag_check_seconds:
+                    await self._check_lag()
+        return (
+            self.available
+            and self.lag_seconds is not None
+            and self.lag_seconds < self.max_lag_seconds
+        )
+
+    async def _check_lag(self) -> None:
+        self._lag_checked_at = time.monotonic()
+        # 計測の問い合わせは、たまたま居合わせたリクエストのSQL実行数に含めない
+        token = current_request.set(None)
+        try:
+            lag = await asyncio.wait_for(self._query_lag(), self.timeout_seconds)
+        except Exception as e:
+            self.lag_seconds = None
+            self.mark_unavailable(e)
+            return
+        finally:
+            current_request.reset(token)
+        self.lag_seconds = float(lag)
+        if self.lag_seconds >= self.max_lag_seconds:
+            logger.warning("Read replica lagging by %.1fs", self.lag_seconds)
+
+    async def _query_lag(self) -> float:
+        async with self.get_engine().connect() as conn:
+            return await conn.scalar(REPLICA_LAG_SQL)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.get_engine() is not None,
+            "available": self.available,
+            "lag_seconds": self.lag_seconds,
+            "max_lag_seconds": self.max_lag_seconds,
+            "sticky_users": len(self._sticky),
+            "replica_reads": self.replica_reads,
+            "primary_reads": self.primary_reads,
+            "failures": self.failures,
+        }
+
+
+replica_router = ReplicaRouter(
+    get_replica_async_engine,
+    max_lag_seconds=settings.REPLICA_MAX_LAG_SECONDS,
+    lag_check_seconds=settings.REPLICA_LAG_CHECK_SECONDS,
+    retry_seconds=settings.REPLICA_RETRY_SECONDS,
+    sticky_seconds=settings.REPLICA_STICKY_SECONDS,
+    timeout_seconds=settings.REPLICA_TIMEOUT_SECONDS,
+)
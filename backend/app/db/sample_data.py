@@ -0,0 +1,104 @@
+import logging
+from datetime import date, time, timedelta
+from app.queries.schedules import expand_template
+from app.repositories.base import Repository
+from app.repositories.factory import open_repository
+
+logger = logging.getLogger(__name__)
+
+# 複数ワーカーが同時に起動しても投入が1回になるよう使うアドバイザリロックのキー
+SAMPLE_DATA_LOCK_KEY = 0x796F6761
+
+
+async def create_sample_data(repo: Repository) -> dict:
+    """サンプルデータを作成（呼び出し側でコミットする）"""
+    # Create services
+    services = [
+        await repo.add_service(
+            name="ヨガ基礎",
+            description="初心者向けの基本的なヨガクラス。呼吸法と基本ポーズを学びます。",
+            duration=60,
+        ),
+        await repo.add_service(
+            name="パワーヨガ",
+            description="体力向上とシェイプアップを目指す活動的なヨガクラス。",
+            duration=75,
+        ),
+        await repo.add_service(
+            name="リラックスヨガ",
+            description="ストレス解消と心身のリラクゼーションを目的としたクラス。",
+            duration=60,
+        ),
+        await repo.add_service(
+            name="モーニングヨガ",
+            description="朝の目覚めをサポートする爽やかなヨガクラス。",
+            duration=45,
+        ),
+    ]
+
+    # Create schedule templates for the next 7 days
+    today = date.today()
+    every_day = list(range(7))
+
+    # Time slots: 9:00, 11:00, 14:00, 16:00, 18:00
+    time_slots = [
+        time(9, 0),
+        time(11, 0),
+        time(14, 0),
+        time(16, 0),
+        time(18, 0),
+    ]
+
+    templates = []
+    for service in services:
+        # Morning Yoga only in the morning
+        if service.name == "モーニングヨガ":
+            start_times, capacity = [time(7, 0)], 15
+        else:
+            start_times = time_slots
+            capacity = 10 if service.name == "パワーヨガ" else 12
+
+        templates.append(
+            await repo.add_schedule_template(
+                service_id=service.id,
+                weekdays=every_day,
+                start_times=start_times,
+                capacity=capacity,
+                valid_from=today,
+                valid_to=today + timedelta(days=6),
+            )
+        )
+
+    # Expand templates into slots with bulk inserts
+    rows = []
+    for template in templates:
+        rows.extend(
+            expand_template(
+                template.service_id,
+                template.weekdays,
+                template.start_times,
+                template.capacity,
+                template.valid_from,
+                template.valid_to,
+            )
+        )
+    slots = len(await repo.insert_slots(rows))
+
+    return {"services": len(services), "templates": len(templates), "slots": slots}
+
+
+async def ensure_sample_data() -> None:
+    """サービスが1件もなければサンプルデータを投入（起動時に lifespan から呼ぶ）"""
+    async with open_repository() as repo:
+        # ロックはトランザクション終了時に解放される
+        await repo.advisory_lock(SAMPLE_DATA_LOCK_KEY)
+        existing_services = len(await repo.list_services())
+        if existing_services:
+            logger.info(
+                "Found %d services, skipping sample data insertion", existing_services
+            )
+            return
+
+        created = await create_sample_data(repo)
+        await repo.commit()
+        logger.info("Inserted sample data: %s", created)
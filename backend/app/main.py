@@ -1,12 +1,83 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import text
 from app.core.config import get_settings
+from app.core.security import shutdown_password_executor
+from app.cache.availability import availability_cache
+from app.cache.service_catalog import service_catalog
+from app.core.availability_hub import availability_hub
+from app.core.instrumentation import MetricsMiddleware, request_metrics
+from app.db.database import get_async_engine, get_replica_async_engine
+from app.db.pool import render_pool_metrics
+from app.db.sample_data import ensure_sample_data
+from app.db.notify import SERVICE_CHANNEL, SLOT_CHANNEL, listener
+from app.db.purge import run_idempotency_purge
+from app.db.replica import replica_router
 from app.api.router import api_router
 
 settings = get_settings()
 
+logger = logging.getLogger(__name__)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# /ready でのDB疎通確認・起動時のサンプルデータ確認のタイムアウト（秒）
+READINESS_TIMEOUT_SECONDS = 2.0
+SAMPLE_DATA_TIMEOUT_SECONDS = 30.0
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 以前は startup.sh が別プロセスで確認していたサンプルデータの投入
+    if settings.SEED_SAMPLE_DATA:
+        try:
+            await asyncio.wait_for(
+                ensure_sample_data(), timeout=SAMPLE_DATA_TIMEOUT_SECONDS
+            )
+        except Exception as e:
+            # DBに繋がらなくても起動は続け、/ready で未準備として扱う
+            logger.warning("Sample data check failed: %s", e)
+
+    # 他ワーカーでの予約変更を受け取り、空き状況キャッシュの無効化とSSE配信を行う
+    # サービスの変更はサービス一覧キャッシュを無効化する
+    if settings.DB_NOTIFY_ENABLED and not settings.uses_memory_backend():
+        listener.subscribe(SLOT_CHANNEL, availability_cache.handle_notification)
+        listener.subscribe(SLOT_CHANNEL, availability_hub.publish)
+        listener.subscribe(SERVICE_CHANNEL, service_catalog.handle_notification)
+        listener.on_reconnect(availability_cache.clear)
+        listener.on_reconnect(service_catalog.invalidate)
+        listener.start()
+
+    # 期限切れの Idempotency-Key を定期的に削除（メモリ上のリポジトリでは不要）
+    purge_task = None
+    if (
+        settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS > 0
+        and not settings.uses_memory_backend()
+    ):
+        purge_task = asyncio.create_task(
+            run_idempotency_purge(settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS)
+        )
+
+    yield
+
+    if purge_task is not None:
+        purge_task.cancel()
+        try:
+            await purge_task
+        except asyncio.CancelledError:
+            pass
+    await listener.stop()
+    shutdown_password_executor()
+
+
 app = FastAPI(
-    title=settings.PROJECT_NAME, openapi_url=f"{settings.API_V1_PREFIX}/openapi.json"
+    title=settings.PROJECT_NAME,
+    openapi_url=f"{settings.API_V1_PREFIX}/openapi.json",
+    lifespan=lifespan,
 )
 
 # CORS設定(ルーター登録より前に追加)
@@ -20,17 +91,20 @@ app.add_middleware(
     max_age=3600,
 )
 
+# ルートごとのレイテンシ・SQL実行数を計測（最後に追加して最外側で計測する）
+app.add_middleware(MetricsMiddleware)
+
 # ルーター登録
 app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
 
 @app.get("/")
-def root():
+async def root():
     return {"message": "Yoga Reservation API", "status": "running"}
 
 
 @app.get("/debug/config")
-def debug_config():
+async def debug_config():
     return {
         "cors_origins": settings.CORS_ORIGINS,
         "cors_type": type(settings.CORS_ORIGINS).__name__,
@@ -38,5 +112,46 @@ def debug_config():
 
 
 @app.get("/health")
-def health_check():
+async def health_check():
     return {"status": "healthy"}
+
+
+async def _ping_database() -> None:
+    async with get_async_engine().connect() as conn:
+        await conn.execute(text("SELECT 1"))
+
+
+@app.get("/ready")
+async def readiness_check():
+    """レディネスチェック（/health と異なりDBへの疎通も確認する）"""
+    if settings.uses_memory_backend():
+        return {"status": "ready", "database": None, "backend": "memory"}
+
+    try:
+        await asyncio.wait_for(_ping_database(), timeout=READINESS_TIMEOUT_SECONDS)
+    except Exception:
+        return JSONResponse(
+            status_code=503, content={"status": "unavailable", "database": False}
+        )
+
+    # レプリカが使えなくてもプライマリで処理できるため、準備状態には影響させない
+    return {
+        "status": "ready",
+        "database": True,
+        "listener": listener.connected,
+        "replica": replica_router.available if settings.uses_replica() else None,
+    }
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 形式のメトリクス"""
+    lines = request_metrics.render()
+    if not settings.uses_memory_backend():
+        pools = {"async": get_async_engine().pool}
+        if settings.uses_replica():
+            pools["replica"] = get_replica_async_engine().pool
+        lines += render_pool_metrics(pools)
+    return PlainTextResponse(
+        "\n".join(lines) + "\n", media_type=PROMETHEUS_CONTENT_TYPE
+    )
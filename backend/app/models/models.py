@@ -1,4 +1,18 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Date, Time, Enum
+from sqlalchemy import (
+    Column,
+    Integer,
+    String,
+    DateTime,
+    ForeignKey,
+    Date,
+    Time,
+    Enum,
+    Index,
+    PrimaryKeyConstraint,
+    UniqueConstraint,
+    text,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -35,17 +49,28 @@ class Service(Base):
 
     bookings = relationship("Booking", back_populates="service")
     slots = relationship("Slot", back_populates="service")
+    schedule_templates = relationship("ScheduleTemplate", back_populates="service")
 
 
 class Slot(Base):
     __tablename__ = "slots"
-    __table_args__ = {"schema": "yoga_reserve"}
+    __table_args__ = (
+        UniqueConstraint(
+            "service_id",
+            "date",
+            "start_time",
+            name="uq_yoga_reserve_slots_service_id_date_start_time",
+        ),
+        {"schema": "yoga_reserve"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     service_id = Column(Integer, ForeignKey("yoga_reserve.services.id"), nullable=False)
     date = Column(Date, nullable=False)
     start_time = Column(Time, nullable=False)
     capacity = Column(Integer, nullable=False, default=2)
+    # 確定予約数（予約作成・キャンセル時に同一トランザクションで更新）
+    reserved = Column(Integer, nullable=False, default=0, server_default="0")
     created_at = Column(DateTime, default=datetime.utcnow)
 
     service = relationship("Service", back_populates="slots")
@@ -54,7 +79,32 @@ class Slot(Base):
 
 class Booking(Base):
     __tablename__ = "bookings"
-    __table_args__ = {"schema": "yoga_reserve"}
+    __table_args__ = (
+        Index(
+            "ix_yoga_reserve_bookings_slot_id_confirmed",
+            "slot_id",
+            postgresql_where=text("status = 'confirmed'"),
+        ),
+        Index(
+            "ix_yoga_reserve_bookings_user_id_date_start_time_id",
+            "user_id",
+            "date",
+            "start_time",
+            "id",
+        ),
+        Index(
+            "ix_yoga_reserve_bookings_date_start_time_id", "date", "start_time", "id"
+        ),
+        # 同じユーザーが同じスロットを二重に確定予約できないようにする
+        Index(
+            "uq_yoga_reserve_bookings_user_id_slot_id_confirmed",
+            "user_id",
+            "slot_id",
+            unique=True,
+            postgresql_where=text("status = 'confirmed'"),
+        ),
+        {"schema": "yoga_reserve"},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("yoga_reserve.users.id"), nullable=False)
@@ -71,3 +121,61 @@ class Booking(Base):
     user = relationship("User", back_populates="bookings")
     service = relationship("Service", back_populates="bookings")
     slot = relationship("Slot", back_populates="bookings")
+
+
+class ScheduleTemplate(Base):
+    """定期開催スケジュール（曜日・開始時刻・定員・期間からスロットを一括生成）"""
+
+    __tablename__ = "schedule_templates"
+    __table_args__ = {"schema": "yoga_reserve"}
+
+    id = Column(Integer, primary_key=True, index=True)
+    service_id = Column(Integer, ForeignKey("yoga_reserve.services.id"), nullable=False)
+    weekdays = Column(ARRAY(Integer), nullable=False)  # 0=月曜 〜 6=日曜
+    start_times = Column(ARRAY(Time), nullable=False)
+    capacity = Column(Integer, nullable=False)
+    valid_from = Column(Date, nullable=False)
+    valid_to = Column(Date, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    service = relationship("Service", back_populates="schedule_templates")
+
+
+class IdempotencyKey(Base):
+    """Idempotency-Key ごとの保存済みレスポンス（再送時はこれを返す）"""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        PrimaryKeyConstraint("user_id", "key"),
+        # 期限切れのキーの削除
+        Index("ix_yoga_reserve_idempotency_keys_created_at", "created_at"),
+        {"schema": "yoga_reserve"},
+    )
+
+    user_id = Column(Integer, ForeignKey("yoga_reserve.users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)  # リクエスト本文の sha256
+    status_code = Column(Integer, nullable=False)
+    response = Column(JSONB, nullable=False)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+
+class WaitlistEntry(Base):
+    """満席スロットのキャンセル待ち（スロットごとに id 順のFIFO）"""
+
+    __tablename__ = "waitlist_entries"
+    __table_args__ = (
+        UniqueConstraint(
+            "slot_id",
+            "user_id",
+            name="uq_yoga_reserve_waitlist_entries_slot_id_user_id",
+        ),
+        # キャンセル時に先頭を取り出す
+        Index("ix_yoga_reserve_waitlist_entries_slot_id_id", "slot_id", "id"),
+        {"schema": "yoga_reserve"},
+    )
+
+    id = Column(Integer, primary_key=True)
+    slot_id = Column(Integer, ForeignKey("yoga_reserve.slots.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("yoga_reserve.users.id"), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow)
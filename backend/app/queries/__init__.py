@@ -0,0 +1 @@
+# Query modules
@@ -0,0 +1,138 @@
+from datetime import date, time
+from typing import Optional
+from sqlalchemy import Row, and_, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import aggregate_order_by
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Booking, BookingStatus, Service, Slot
+
+
+async def get_slot_availability(db: AsyncSession, service_id: int, target_date: date):
+    """指定サービス・日付の全スロットを予約数カウンタ付きで取得（開始時刻順）
+
+    行は SlotInfo と同じ (id, start_time, capacity, reserved, available) で、
+    start_time はSQLで 'HH:MM' に整形済み。
+    """
+    result = await db.execute(
+        select(
+            Slot.id,
+            func.to_char(Slot.start_time, "HH24:MI").label("start_time"),
+            Slot.capacity,
+            Slot.reserved,
+            (Slot.capacity - Slot.reserved).label("available"),
+        )
+        .where(Slot.service_id == service_id, Slot.date == target_date)
+        .order_by(Slot.start_time)
+    )
+    return result.all()
+
+
+async def admit_slot(
+    db: AsyncSession, service_id: int, target_date: date, start_time: time
+) -> Optional[Row]:
+    """空きがあれば予約数を1増やし、更新後の (id, reserved, capacity) を返す
+
+    条件付きUPDATE 1文で判定と確保を行うため、同時リクエストでも定員を超えない。
+    スロットが存在しないか満席の場合は None を返す。
+    """
+    stmt = (
+        update(Slot)
+        .where(
+            Slot.service_id == service_id,
+            Slot.date == target_date,
+            Slot.start_time == start_time,
+            Slot.reserved < Slot.capacity,
+        )
+        .values(reserved=Slot.reserved + 1)
+        .returning(Slot.id, Slot.reserved, Slot.capacity)
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(stmt)).first()
+
+
+async def resolve_slots(db: AsyncSession, user_id: int, keys: list[tuple]) -> list[Row]:
+    """(service_id, date, start_time) の組から複数スロットを1クエリで取得し行ロックする
+
+    行は (id, service_id, date, start_time, booked)。booked はそのユーザーが確定予約済みか。
+    同時に実行される一括予約同士でデッドロックしないよう、id 順にロックする。
+    """
+    stmt = (
+        select(
+            Slot.id,
+            Slot.service_id,
+            Slot.date,
+            Slot.start_time,
+            Booking.id.is_not(None).label("booked"),
+        )
+        .outerjoin(
+            Booking,
+            and_(
+                Booking.slot_id == Slot.id,
+                Booking.user_id == user_id,
+                Booking.status == BookingStatus.confirmed,
+            ),
+        )
+        .where(tuple_(Slot.service_id, Slot.date, Slot.start_time).in_(keys))
+        .order_by(Slot.id)
+        .with_for_update(of=Slot)
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def admit_slots(db: AsyncSession, slot_ids: list[int]) -> list[Row]:
+    """空きのあるスロットの予約数をまとめて1ずつ増やし、確保できた (id, reserved, capacity) を返す"""
+    stmt = (
+        update(Slot)
+        .where(Slot.id.in_(slot_ids), Slot.reserved < Slot.capacity)
+        .values(reserved=Slot.reserved + 1)
+        .returning(Slot.id, Slot.reserved, Slot.capacity)
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(stmt)).all()
+
+
+async def release_slot(db: AsyncSession, slot_id: int) -> Optional[Row]:
+    """スロットの予約数を1減らし、更新後の (id, reserved, capacity) を返す"""
+    stmt = (
+        update(Slot)
+        .where(Slot.id == slot_id, Slot.reserved > 0)
+        .values(reserved=Slot.reserved - 1)
+        .returning(Slot.id, Slot.reserved, Slot.capacity)
+        .execution_options(synchronize_session=False)
+    )
+    return (await db.execute(stmt)).first()
+
+
+async def get_availability_calendar(
+    db: AsyncSession, service_id: int, date_from: date, date_to: date
+):
+    """期間内のスロット空き状況を日付ごとに集約して1クエリで取得
+
+    サービスに LEFT JOIN するため、サービスが存在しなければ空リストを返す。
+    スロットのない期間では date が None の行が1件だけ返る。
+    行は (date, slot_ids, start_times, capacities, reserved) で各列は開始時刻順の配列。
+    """
+    order = Slot.start_time
+    stmt = (
+        select(
+            Slot.date,
+            func.array_agg(aggregate_order_by(Slot.id, order)),
+            func.array_agg(
+                aggregate_order_by(func.to_char(Slot.start_time, "HH24:MI"), order)
+            ),
+            func.array_agg(aggregate_order_by(Slot.capacity, order)),
+            func.array_agg(aggregate_order_by(Slot.reserved, order)),
+        )
+        .select_from(Service)
+        .outerjoin(
+            Slot,
+            and_(
+                Slot.service_id == Service.id,
+                Slot.date >= date_from,
+                Slot.date <= date_to,
+            ),
+        )
+        .where(Service.id == service_id)
+        .group_by(Slot.date)
+        .order_by(Slot.date)
+    )
+    return (await db.execute(stmt)).all()
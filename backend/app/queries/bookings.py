@@ -0,0 +1,141 @@
+import base64
+from datetime import date, time
+from typing import Optional
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from app.db.database import get_async_engine
+from app.models.models import Booking, BookingStatus, Service, User
+
+
+def encode_cursor(booking_date: date, start_time: time, booking_id: int) -> str:
+    """(date, start_time, id) を不透明なカーソル文字列に変換"""
+    raw = f"{booking_date.isoformat()}|{start_time.isoformat()}|{booking_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[date, time, int]:
+    """カーソル文字列を (date, start_time, id) に戻す（不正なら ValueError）"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_part, time_part, id_part = raw.split("|")
+        return (
+            date.fromisoformat(date_part),
+            time.fromisoformat(time_part),
+            int(id_part),
+        )
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def _apply_filters(stmt, user_id, date_from, date_to, service_id, status):
+    if user_id is not None:
+        stmt = stmt.where(Booking.user_id == user_id)
+    if date_from is not None:
+        stmt = stmt.where(Booking.date >= date_from)
+    if date_to is not None:
+        stmt = stmt.where(Booking.date <= date_to)
+    if service_id is not None:
+        stmt = stmt.where(Booking.service_id == service_id)
+    if status is not None:
+        stmt = stmt.where(Booking.status == status)
+    return stmt
+
+
+async def list_bookings(
+    db: AsyncSession,
+    *,
+    limit: int,
+    cursor: Optional[tuple[date, time, int]] = None,
+    user_id: Optional[int] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    service_id: Optional[int] = None,
+    status: Optional[BookingStatus] = None,
+    with_user_name: bool = False,
+):
+    """予約一覧をキーセットページングで取得（date, start_time, id の降順）
+
+    戻り値は (行のリスト, 次ページのカーソル)。
+    行は (id, service_id, service_name, date, start_time, status[, user_name]) で、
+    date / start_time はSQLで 'YYYY-MM-DD' / 'HH:MM' に整形済み（レスポンスにそのまま使える）。
+    カーソル位置からインデックスを範囲走査するため、何ページ目でもコストは一定。
+    """
+    columns = [
+        Booking.id,
+        Booking.service_id,
+        Service.name.label("service_name"),
+        func.to_char(Booking.date, "YYYY-MM-DD").label("date"),
+        func.to_char(Booking.start_time, "HH24:MI").label("start_time"),
+        Booking.status,
+    ]
+    if with_user_name:
+        columns.append(User.name.label("user_name"))
+
+    stmt = select(*columns).join(Service, Booking.service_id == Service.id)
+    if with_user_name:
+        stmt = stmt.join(User, Booking.user_id == User.id)
+
+    stmt = _apply_filters(stmt, user_id, date_from, date_to, service_id, status)
+    if cursor is not None:
+        stmt = stmt.where(
+            tuple_(Booking.date, Booking.start_time, Booking.id) < tuple_(*cursor)
+        )
+
+    stmt = stmt.order_by(
+        Booking.date.desc(), Booking.start_time.desc(), Booking.id.desc()
+    ).limit(limit + 1)
+
+    rows = (await db.execute(stmt)).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        # 開始時刻は分単位で登録されるため、整形済みの値からカーソルを復元できる
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            date.fromisoformat(last.date), time.fromisoformat(last.start_time), last.id
+        )
+
+    return rows, next_cursor
+
+
+async def stream_booking_export(
+    *,
+    engine: Optional[AsyncEngine] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    service_id: Optional[int] = None,
+    status: Optional[BookingStatus] = None,
+    batch_size: int = 1000,
+):
+    """エクスポート用に予約をサービス名・ユーザー名付きで逐次取得
+
+    読み取り専用の REPEATABLE READ トランザクション内でサーバーサイドカーソルを使い、
+    batch_size 行ずつのリストを yield する。件数に関わらずクエリ1回・メモリ一定。
+    engine を省略するとプライマリから読む。
+    """
+    stmt = (
+        select(
+            Booking.id,
+            Booking.service_id,
+            Service.name.label("service_name"),
+            User.name.label("user_name"),
+            Booking.date,
+            Booking.start_time,
+            Booking.status,
+        )
+        .join(Service, Booking.service_id == Service.id)
+        .join(User, Booking.user_id == User.id)
+    )
+    stmt = _apply_filters(stmt, None, date_from, date_to, service_id, status)
+    stmt = stmt.order_by(Booking.date, Booking.start_time, Booking.id)
+
+    async with (engine or get_async_engine()).connect() as conn:
+        conn = await conn.execution_options(
+            isolation_level="REPEATABLE READ", postgresql_readonly=True
+        )
+        async with conn.begin():
+            result = await conn.stream(stmt.execution_options(yield_per=batch_size))
+            async for partition in result.partitions():
+                yield partition
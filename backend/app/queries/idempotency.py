@@ -0,0 +1,81 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import Row, delete, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.core.config import get_settings
+from app.models.models import IdempotencyKey
+
+settings = get_settings()
+
+
+def _expired_before() -> datetime:
+    return datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+
+async def get_stored_response(
+    db: AsyncSession, user_id: int, key: str
+) -> Optional[Row]:
+    """有効期限内の保存済みレスポンスを主キーで1件取得"""
+    result = await db.execute(
+        select(
+            IdempotencyKey.request_hash,
+            IdempotencyKey.status_code,
+            IdempotencyKey.response,
+        ).where(
+            IdempotencyKey.user_id == user_id,
+            IdempotencyKey.key == key,
+            IdempotencyKey.created_at >= _expired_before(),
+        )
+    )
+    return result.first()
+
+
+async def store_response(
+    db: AsyncSession,
+    user_id: int,
+    key: str,
+    request_hash: str,
+    status_code: int,
+    response: dict,
+) -> bool:
+    """レスポンスを保存（呼び出し側のトランザクション内）
+
+    期限切れのキーは上書きする。同じキーが処理中・保存済みなら False を返す。
+    """
+    values = {
+        "request_hash": request_hash,
+        "status_code": status_code,
+        "response": response,
+        "created_at": datetime.utcnow(),
+    }
+    stmt = (
+        insert(IdempotencyKey)
+        .values(user_id=user_id, key=key, **values)
+        .on_conflict_do_update(
+            index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+            set_=values,
+            where=IdempotencyKey.created_at < _expired_before(),
+        )
+        .returning(IdempotencyKey.user_id)
+    )
+    return (await db.execute(stmt)).first() is not None
+
+
+async def purge_expired_responses(db: AsyncSession, limit: int) -> int:
+    """期限切れのキーを最大 limit 件削除し、削除件数を返す（created_at のインデックスを使う）
+
+    他ワーカーが同時に削除中の行は SKIP LOCKED で飛ばす
+    """
+    expired = (
+        select(IdempotencyKey.user_id, IdempotencyKey.key)
+        .where(IdempotencyKey.created_at < _expired_before())
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        delete(IdempotencyKey)
+        .where(tuple_(IdempotencyKey.user_id, IdempotencyKey.key).in_(expired))
+        .returning(IdempotencyKey.user_id)
+    )
+    return len(result.all())
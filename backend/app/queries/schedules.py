@@ -0,0 +1,57 @@
+from datetime import date, time, timedelta
+from typing import Iterable, Iterator
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.models.models import Slot
+
+# 1文あたりの行数（asyncpg のバインド変数上限 32767 を超えないように）
+SLOT_INSERT_CHUNK_SIZE = 5000
+
+
+def expand_template(
+    service_id: int,
+    weekdays: Iterable[int],
+    start_times: Iterable[time],
+    capacity: int,
+    date_from: date,
+    date_to: date,
+) -> list[dict]:
+    """テンプレートを期間内のスロット行に展開（weekdays は 0=月曜 〜 6=日曜）"""
+    weekday_set = set(weekdays)
+    times = sorted(set(start_times))
+    rows = []
+    day = date_from
+    while day <= date_to:
+        if day.weekday() in weekday_set:
+            for start_time in times:
+                rows.append(
+                    {
+                        "service_id": service_id,
+                        "date": day,
+                        "start_time": start_time,
+                        "capacity": capacity,
+                    }
+                )
+        day += timedelta(days=1)
+    return rows
+
+
+def build_slot_inserts(rows: list[dict]) -> Iterator:
+    """スロット行の一括INSERT文を生成（既存の (service_id, date, start_time) は無視）"""
+    for start in range(0, len(rows), SLOT_INSERT_CHUNK_SIZE):
+        yield (
+            insert(Slot)
+            .values(rows[start : start + SLOT_INSERT_CHUNK_SIZE])
+            .on_conflict_do_nothing(
+                constraint="uq_yoga_reserve_slots_service_id_date_start_time"
+            )
+            .returning(Slot.service_id, Slot.date)
+        )
+
+
+async def insert_slots(db: AsyncSession, rows: list[dict]) -> list[tuple[int, date]]:
+    """スロット行を一括登録し、新規に作成したスロットの (service_id, date) を返す"""
+    created = []
+    for stmt in build_slot_inserts(rows):
+        created.extend(tuple(row) for row in (await db.execute(stmt)).all())
+    return created
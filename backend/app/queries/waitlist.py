@@ -0,0 +1,179 @@
+from datetime import date, datetime, time
+from typing import Optional
+from sqlalchemy import Row, delete, exists, func, insert, literal, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+from app.models.models import Booking, BookingStatus, Service, Slot, WaitlistEntry
+
+
+def _has_confirmed_booking(slot_id_column, user_id_column):
+    return exists().where(
+        Booking.slot_id == slot_id_column,
+        Booking.user_id == user_id_column,
+        Booking.status == BookingStatus.confirmed,
+    )
+
+
+def _position():
+    """キャンセル待ちの順番（同じスロットで自分より前のエントリ数 + 1）"""
+    ahead = aliased(WaitlistEntry)
+    return (
+        select(func.count(ahead.id))
+        .where(ahead.slot_id == WaitlistEntry.slot_id, ahead.id <= WaitlistEntry.id)
+        .scalar_subquery()
+    )
+
+
+async def lock_slot_for_waitlist(
+    db: AsyncSession, user_id: int, service_id: int, target_date: date, start_time: time
+) -> Optional[Row]:
+    """キャンセル待ち登録のためにスロットを共有ロックして取得
+
+    キャンセル処理（スロットを排他ロックしてから先頭を繰り上げる）と直列化され、
+    空席ができた直後に誰もいないキャンセル待ちへ登録されることがない。
+    行は (id, reserved, capacity, booked)。
+    """
+    stmt = (
+        select(
+            Slot.id,
+            Slot.reserved,
+            Slot.capacity,
+            _has_confirmed_booking(Slot.id, user_id).label("booked"),
+        )
+        .where(
+            Slot.service_id == service_id,
+            Slot.date == target_date,
+            Slot.start_time == start_time,
+        )
+        .with_for_update(read=True, of=Slot)
+    )
+    return (await db.execute(stmt)).first()
+
+
+async def join_waitlist(db: AsyncSession, slot_id: int, user_id: int) -> Optional[Row]:
+    """キャンセル待ちの末尾に登録し (id, position) を返す（登録済みなら None）"""
+    result = await db.execute(
+        pg_insert(WaitlistEntry)
+        .values(slot_id=slot_id, user_id=user_id)
+        .on_conflict_do_nothing(
+            constraint="uq_yoga_reserve_waitlist_entries_slot_id_user_id"
+        )
+        .returning(WaitlistEntry.id)
+    )
+    entry_id = result.scalar_one_or_none()
+    if entry_id is None:
+        return None
+
+    result = await db.execute(
+        select(WaitlistEntry.id, _position().label("position")).where(
+            WaitlistEntry.id == entry_id
+        )
+    )
+    return result.first()
+
+
+async def list_waitlist_entries(db: AsyncSession, user_id: int):
+    """ユーザーのキャンセル待ち一覧を順番付きで取得"""
+    result = await db.execute(
+        select(
+            WaitlistEntry.id,
+            Slot.service_id,
+            Service.name.label("service_name"),
+            Slot.date,
+            Slot.start_time,
+            _position().label("position"),
+        )
+        .join(Slot, Slot.id == WaitlistEntry.slot_id)
+        .join(Service, Service.id == Slot.service_id)
+        .where(WaitlistEntry.user_id == user_id)
+        .order_by(Slot.date, Slot.start_time, WaitlistEntry.id)
+    )
+    return result.all()
+
+
+async def leave_waitlist(db: AsyncSession, entry_id: int, user_id: int) -> bool:
+    """自分のキャンセル待ちを取り消す"""
+    result = await db.execute(
+        delete(WaitlistEntry)
+        .where(WaitlistEntry.id == entry_id, WaitlistEntry.user_id == user_id)
+        .returning(WaitlistEntry.id)
+    )
+    return result.first() is not None
+
+
+async def lock_slot(db: AsyncSession, slot_id: int) -> None:
+    """スロットを排他ロック（予約作成・キャンセル待ち登録との競合を防ぐ）"""
+    await db.execute(select(Slot.id).where(Slot.id == slot_id).with_for_update())
+
+
+async def promote_waitlist_head(
+    db: AsyncSession,
+    slot_id: int,
+    service_id: int,
+    target_date: date,
+    start_time: time,
+) -> Optional[Row]:
+    """キャンセル待ちの先頭を取り出して確定予約にし、(id, user_id) を返す
+
+    1文で先頭の削除と予約作成を行うため、空いた席はそのまま繰り上げ予約に使われ
+    slots.reserved は変わらない。並行するキャンセルは SKIP LOCKED で別のエントリを取る。
+    キャンセル待ちがいなければ None を返す。
+    登録後に別の経路でこのスロットを予約済みになったユーザーのエントリは、
+    繰り上げ対象にせず同じ文で削除する。
+    """
+    stale = (
+        delete(WaitlistEntry)
+        .where(
+            WaitlistEntry.slot_id == slot_id,
+            _has_confirmed_booking(WaitlistEntry.slot_id, WaitlistEntry.user_id),
+        )
+        .cte("stale")
+    )
+    head_id = (
+        select(WaitlistEntry.id)
+        .where(
+            WaitlistEntry.slot_id == slot_id,
+            ~_has_confirmed_booking(WaitlistEntry.slot_id, WaitlistEntry.user_id),
+        )
+        .order_by(WaitlistEntry.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    head = (
+        delete(WaitlistEntry)
+        .where(WaitlistEntry.id == head_id)
+        .returning(WaitlistEntry.user_id)
+        .cte("head")
+    )
+    now = datetime.utcnow()
+    stmt = (
+        insert(Booking)
+        .from_select(
+            [
+                Booking.user_id,
+                Booking.service_id,
+                Booking.slot_id,
+                Booking.date,
+                Booking.start_time,
+                Booking.status,
+                Booking.created_at,
+                Booking.updated_at,
+            ],
+            select(
+                head.c.user_id,
+                literal(service_id),
+                literal(slot_id),
+                literal(target_date, Booking.date.type),
+                literal(start_time, Booking.start_time.type),
+                literal(BookingStatus.confirmed, Booking.status.type),
+                literal(now, Booking.created_at.type),
+                literal(now, Booking.updated_at.type),
+            ),
+        )
+        .returning(Booking.id, Booking.user_id)
+        # 参照されなくても WITH 内の DELETE は実行される
+        .add_cte(stale)
+    )
+    return (await db.execute(stmt)).first()
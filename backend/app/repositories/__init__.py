@@ -0,0 +1 @@
+# Repository modules
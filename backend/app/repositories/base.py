@@ -0,0 +1,239 @@
+from abc import ABC, abstractmethod
+from datetime import date, time
+from typing import Any, AsyncIterator, Optional
+from app.models.models import BookingStatus
+
+
+class DuplicateBookingError(Exception):
+    """同じスロットの確定予約が既にある"""
+
+
+class Repository(ABC):
+    """エンドポイントから使うデータアクセスの抽象
+
+    1リクエストにつき1インスタンスで、1つのトランザクションに対応する。
+    書き込みは commit() まで確定せず、rollback() で取り消される。
+    行は属性アクセスできるオブジェクト（SQL実装では Row / ORMオブジェクト）で返す。
+    """
+
+    # トランザクション
+
+    @abstractmethod
+    async def commit(self) -> None: ...
+
+    @abstractmethod
+    async def rollback(self) -> None: ...
+
+    @abstractmethod
+    async def advisory_lock(self, key: int) -> None:
+        """トランザクション終了まで保持する排他ロック（ワーカー間の直列化用）"""
+
+    @abstractmethod
+    async def publish(self, channel: str, payloads: list[dict]) -> None:
+        """変更通知を他ワーカーへ送る（コミット時に配信される）"""
+
+    # ユーザー
+
+    @abstractmethod
+    async def get_user(self, user_id: int) -> Optional[Any]: ...
+
+    @abstractmethod
+    async def get_user_by_email(self, email: str) -> Optional[Any]: ...
+
+    @abstractmethod
+    async def add_user(self, name: str, email: str, hashed_password: str) -> Any:
+        """ユーザーを作成し、id 採番済みのオブジェクトを返す"""
+
+    @abstractmethod
+    async def set_password_hash(self, user: Any, hashed_password: str) -> None: ...
+
+    # サービス
+
+    @abstractmethod
+    async def list_services(self) -> list:
+        """全サービスを id 順に取得"""
+
+    @abstractmethod
+    async def get_service(self, service_id: int) -> Optional[Any]: ...
+
+    @abstractmethod
+    async def add_service(self, name: str, description: str, duration: int) -> Any: ...
+
+    # スロット
+
+    @abstractmethod
+    async def get_slot_availability(self, service_id: int, target_date: date) -> list:
+        """指定サービス・日付のスロットを開始時刻順に取得
+
+        行は (id, start_time, capacity, reserved, available)、start_time は 'HH:MM'。
+        """
+
+    @abstractmethod
+    async def get_availability_calendar(
+        self, service_id: int, date_from: date, date_to: date
+    ) -> list:
+        """期間内の空き状況を日付ごとに集約（app.queries.availability と同じ行形式）"""
+
+    @abstractmethod
+    async def find_slot_id(
+        self, service_id: int, target_date: date, start_time: time
+    ) -> Optional[int]: ...
+
+    @abstractmethod
+    async def admit_slot(
+        self, service_id: int, target_date: date, start_time: time
+    ) -> Optional[Any]:
+        """空きがあれば予約数を1増やし (id, reserved, capacity) を返す（満席・なしは None）"""
+
+    @abstractmethod
+    async def resolve_slots(self, user_id: int, keys: list[tuple]) -> list:
+        """(service_id, date, start_time) の組から複数スロットをロックして取得
+
+        行は (id, service_id, date, start_time, booked)。
+        """
+
+    @abstractmethod
+    async def admit_slots(self, slot_ids: list[int]) -> list:
+        """空きのあるスロットの予約数を1ずつ増やし、確保できた (id, reserved, capacity) を返す"""
+
+    @abstractmethod
+    async def release_slot(self, slot_id: int) -> Optional[Any]:
+        """予約数を1減らし (id, reserved, capacity) を返す"""
+
+    @abstractmethod
+    async def lock_slot(self, slot_id: int) -> None:
+        """スロットを排他ロック（予約作成・キャンセル待ち登録との競合を防ぐ）"""
+
+    @abstractmethod
+    async def insert_slots(self, rows: list[dict]) -> list[tuple[int, date]]:
+        """スロット行を一括登録し、新規に作成したスロットの (service_id, date) を返す
+
+        既存の (service_id, date, start_time) は無視する
+        """
+
+    # 予約
+
+    @abstractmethod
+    async def get_booking(self, booking_id: int) -> Optional[Any]: ...
+
+    @abstractmethod
+    async def add_booking(
+        self,
+        user_id: int,
+        service_id: int,
+        slot_id: int,
+        target_date: date,
+        start_time: time,
+    ) -> int:
+        """確定予約を作成して id を返す（確定予約済みなら DuplicateBookingError）"""
+
+    @abstractmethod
+    async def add_bookings(self, user_id: int, slots: list) -> dict[int, int]:
+        """resolve_slots() の行ごとに確定予約を作成し {slot_id: booking_id} を返す"""
+
+    @abstractmethod
+    async def cancel_booking(self, booking_id: int) -> bool:
+        """確定予約をキャンセル（既にキャンセル済みなら False）"""
+
+    @abstractmethod
+    async def list_bookings(
+        self,
+        *,
+        limit: int,
+        cursor: Optional[tuple[date, time, int]] = None,
+        user_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        service_id: Optional[int] = None,
+        status: Optional[BookingStatus] = None,
+        with_user_name: bool = False,
+    ) -> tuple[list, Optional[str]]:
+        """予約一覧をキーセットページングで取得（app.queries.bookings と同じ形式）
+
+        行は (id, service_id, service_name, date, start_time, status[, user_name]) で、
+        date / start_time は 'YYYY-MM-DD' / 'HH:MM' の文字列。
+        """
+
+    @abstractmethod
+    def stream_booking_export(
+        self,
+        *,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        service_id: Optional[int] = None,
+        status: Optional[BookingStatus] = None,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[list]:
+        """エクスポート用に予約を batch_size 行ずつ yield（date, start_time, id の昇順）"""
+
+    # Idempotency-Key
+
+    @abstractmethod
+    async def get_stored_response(self, user_id: int, key: str) -> Optional[Any]:
+        """有効期限内の保存済みレスポンス (request_hash, status_code, response)"""
+
+    @abstractmethod
+    async def store_response(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        response: dict,
+    ) -> bool:
+        """レスポンスを保存（同じキーが有効期限内に保存済みなら False）"""
+
+    @abstractmethod
+    async def purge_expired_responses(self, limit: int) -> int:
+        """期限切れのキーを最大 limit 件削除し、削除件数を返す"""
+
+    # キャンセル待ち
+
+    @abstractmethod
+    async def lock_slot_for_waitlist(
+        self, user_id: int, service_id: int, target_date: date, start_time: time
+    ) -> Optional[Any]:
+        """スロットをロックして (id, reserved, capacity, booked) を取得"""
+
+    @abstractmethod
+    async def join_waitlist(self, slot_id: int, user_id: int) -> Optional[Any]:
+        """末尾に登録し (id, position) を返す（登録済みなら None）"""
+
+    @abstractmethod
+    async def list_waitlist_entries(self, user_id: int) -> list:
+        """(id, service_id, service_name, date, start_time, position) を日時順に取得"""
+
+    @abstractmethod
+    async def leave_waitlist(self, entry_id: int, user_id: int) -> bool: ...
+
+    @abstractmethod
+    async def promote_waitlist_head(
+        self, slot_id: int, service_id: int, target_date: date, start_time: time
+    ) -> Optional[Any]:
+        """先頭を取り出して確定予約にし (id, user_id) を返す（いなければ None）
+
+        予約済みになったユーザーのエントリは繰り上げずに削除する
+        """
+
+    # 定期スケジュール
+
+    @abstractmethod
+    async def list_schedule_templates(
+        self, period_from: Optional[date] = None, period_to: Optional[date] = None
+    ) -> list:
+        """定期スケジュールを (service_id, id) 順に取得（期間指定時は重なるもののみ）"""
+
+    @abstractmethod
+    async def get_schedule_template(self, template_id: int) -> Optional[Any]: ...
+
+    @abstractmethod
+    async def add_schedule_template(
+        self,
+        service_id: int,
+        weekdays: list[int],
+        start_times: list[time],
+        capacity: int,
+        valid_from: date,
+        valid_to: date,
+    ) -> Any:
+        """定期スケジュールを作成し、id 採番済みのオブジェクトを返す"""
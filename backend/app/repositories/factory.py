@@ -0,0 +1,70 @@
+import asyncio
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Optional
+from sqlalchemy.exc import DBAPIError
+from app.core.config import get_settings
+from app.db.database import get_async_sessionmaker, get_replica_async_sessionmaker
+from app.db.replica import replica_router
+from app.repositories.base import Repository
+from app.repositories.memory import MemoryRepository, memory_store
+from app.repositories.sql import SqlRepository
+
+settings = get_settings()
+
+
+@asynccontextmanager
+async def open_repository() -> AsyncIterator[Repository]:
+    """環境に応じたリポジトリを開く（抜けるときに未コミットの変更は破棄される）"""
+    if settings.uses_memory_backend():
+        repository = MemoryRepository(memory_store)
+        try:
+            yield repository
+        finally:
+            await repository.rollback()
+        return
+
+    async with get_async_sessionmaker()() as db:
+        yield SqlRepository(db)
+
+
+async def get_repository():
+    """リクエストごとのリポジトリを取得"""
+    async with open_repository() as repository:
+        yield repository
+
+
+@asynccontextmanager
+async def open_read_repository(
+    user_id: Optional[int] = None, last_write: Optional[str] = None
+) -> AsyncIterator[Repository]:
+    """読み取り専用の処理用のリポジトリを開く
+
+    レプリカが使えればレプリカ、直前に書き込んだユーザー・遅延中・接続失敗時はプライマリ。
+    last_write はクライアントが送り返した X-Last-Write ヘッダーの値。
+    """
+    if await replica_router.use_replica(user_id, last_write):
+        db = get_replica_async_sessionmaker()()
+        try:
+            # 接続できなければこのリクエストからプライマリに切り替える
+            await db.connection()
+        except (OSError, DBAPIError, asyncio.TimeoutError) as e:
+            await db.close()
+            replica_router.mark_unavailable(e)
+        else:
+            async with db:
+                try:
+                    yield SqlRepository(db)
+                except DBAPIError as e:
+                    if e.connection_invalidated:
+                        replica_router.mark_unavailable(e)
+                    raise
+            return
+
+    async with open_repository() as repository:
+        yield repository
+
+
+async def get_read_repository():
+    """読み取り専用のリクエストのリポジトリを取得（ユーザーごとの read-your-writes なし）"""
+    async with open_read_repository() as repository:
+        yield repository
@@ -0,0 +1,849 @@
+import asyncio
+import itertools
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from typing import Callable, NamedTuple, Optional
+from app.core.config import get_settings
+from app.models.models import BookingStatus
+from app.queries.bookings import encode_cursor
+from app.repositories.base import DuplicateBookingError, Repository
+
+settings = get_settings()
+
+# (date, start_time, id) の範囲検索で、その日の最後の予約より大きいキーを作るための id
+_LAST_ID = float("inf")
+
+
+@dataclass
+class UserRecord:
+    id: int
+    name: str
+    email: str
+    hashed_password: str
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class ServiceRecord:
+    id: int
+    name: str
+    description: Optional[str]
+    duration: int
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class SlotRecord:
+    id: int
+    service_id: int
+    date: date
+    start_time: time
+    capacity: int
+    reserved: int = 0
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class BookingRecord:
+    id: int
+    user_id: int
+    service_id: int
+    slot_id: int
+    date: date
+    start_time: time
+    status: BookingStatus
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    updated_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class WaitlistRecord:
+    id: int
+    slot_id: int
+    user_id: int
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+@dataclass
+class ScheduleTemplateRecord:
+    id: int
+    service_id: int
+    weekdays: list[int]
+    start_times: list[time]
+    capacity: int
+    valid_from: date
+    valid_to: date
+    created_at: datetime = field(default_factory=datetime.utcnow)
+
+
+class SlotCounter(NamedTuple):
+    id: int
+    reserved: int
+    capacity: int
+
+
+class SlotAvailabilityRow(NamedTuple):
+    id: int
+    start_time: str
+    capacity: int
+    reserved: int
+    available: int
+
+
+class BookingRow(NamedTuple):
+    id: int
+    service_id: int
+    service_name: str
+    date: str
+    start_time: str
+    status: BookingStatus
+
+
+class AdminBookingRow(NamedTuple):
+    id: int
+    service_id: int
+    service_name: str
+    date: str
+    start_time: str
+    status: BookingStatus
+    user_name: str
+
+
+class ResolvedSlot(NamedTuple):
+    id: int
+    service_id: int
+    date: date
+    start_time: time
+    booked: bool
+
+
+class WaitlistSlot(NamedTuple):
+    id: int
+    reserved: int
+    capacity: int
+    booked: bool
+
+
+class WaitlistPosition(NamedTuple):
+    id: int
+    position: int
+
+
+class WaitlistEntryRow(NamedTuple):
+    id: int
+    service_id: int
+    service_name: str
+    date: date
+    start_time: time
+    position: int
+
+
+class PromotedBooking(NamedTuple):
+    id: int
+    user_id: int
+
+
+class ExportRow(NamedTuple):
+    id: int
+    service_id: int
+    service_name: str
+    user_name: str
+    date: date
+    start_time: time
+    status: BookingStatus
+
+
+class StoredResponse(NamedTuple):
+    request_hash: str
+    status_code: int
+    response: dict
+    created_at: datetime
+
+
+class _SlotLock:
+    """待っているリクエストがいなくなったら破棄するスロット単位のロック"""
+
+    __slots__ = ("lock", "users")
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+def _booking_key(booking: BookingRecord) -> tuple:
+    return (booking.date, booking.start_time, booking.id)
+
+
+def _add_reserved(slot: SlotRecord, delta: int) -> None:
+    slot.reserved += delta
+
+
+class MemoryStore:
+    """プロセス内に保持する全データとインデックス
+
+    - スロット: (service_id, date, start_time) の dict と、(service_id, date) ごとの
+      開始時刻順リスト、サービスごとの日付のソート済みリスト
+    - 予約: (date, start_time, id) のソート済みリスト（全体・ユーザーごと）と、
+      スロットごとの確定予約 {user_id: booking_id}
+    - キャンセル待ち: スロットごとの id 昇順リストとユーザーごとの集合
+    """
+
+    def __init__(self):
+        self._ids = defaultdict(lambda: itertools.count(1))
+        self._slot_locks: dict[int, _SlotLock] = {}
+
+        self.users: dict[int, UserRecord] = {}
+        self.user_ids_by_email: dict[str, int] = {}
+        self.services: dict[int, ServiceRecord] = {}
+        self.templates: dict[int, ScheduleTemplateRecord] = {}
+
+        self.slots: dict[int, SlotRecord] = {}
+        self.slot_ids: dict[tuple, int] = {}
+        self.slot_days: dict[tuple, list[tuple]] = defaultdict(list)
+        self.service_dates: dict[int, list[date]] = defaultdict(list)
+
+        self.bookings: dict[int, BookingRecord] = {}
+        self.booking_order: list[tuple] = []
+        self.bookings_by_user: dict[int, list[tuple]] = defaultdict(list)
+        self.confirmed: dict[int, dict[int, int]] = defaultdict(dict)
+
+        self.waitlist: dict[int, WaitlistRecord] = {}
+        self.waitlist_by_slot: dict[int, list[int]] = defaultdict(list)
+        self.waitlist_by_user: dict[int, set[int]] = defaultdict(set)
+        self.waitlist_ids: dict[tuple, int] = {}
+
+        self.idempotency: dict[tuple, StoredResponse] = {}
+
+    def next_id(self, table: str) -> int:
+        """テーブルごとの連番（ロールバックしても戻さない）"""
+        return next(self._ids[table])
+
+    async def acquire_slot(self, slot_id: int) -> None:
+        entry = self._slot_locks.get(slot_id)
+        if entry is None:
+            entry = self._slot_locks[slot_id] = _SlotLock()
+        entry.users += 1
+        try:
+            await entry.lock.acquire()
+        except BaseException:
+            self._leave_slot(slot_id, entry)
+            raise
+
+    def release_slot(self, slot_id: int) -> None:
+        entry = self._slot_locks[slot_id]
+        entry.lock.release()
+        self._leave_slot(slot_id, entry)
+
+    def _leave_slot(self, slot_id: int, entry: _SlotLock) -> None:
+        entry.users -= 1
+        if not entry.users:
+            del self._slot_locks[slot_id]
+
+    def index_slot(self, slot: SlotRecord) -> None:
+        self.slots[slot.id] = slot
+        self.slot_ids[(slot.service_id, slot.date, slot.start_time)] = slot.id
+        day = self.slot_days[(slot.service_id, slot.date)]
+        if not day:
+            insort(self.service_dates[slot.service_id], slot.date)
+        insort(day, (slot.start_time, slot.id))
+
+    def unindex_slot(self, slot: SlotRecord) -> None:
+        del self.slots[slot.id]
+        del self.slot_ids[(slot.service_id, slot.date, slot.start_time)]
+        day = self.slot_days[(slot.service_id, slot.date)]
+        day.remove((slot.start_time, slot.id))
+        if not day:
+            del self.slot_days[(slot.service_id, slot.date)]
+            self.service_dates[slot.service_id].remove(slot.date)
+
+    def index_booking(self, booking: BookingRecord) -> None:
+        self.bookings[booking.id] = booking
+        insort(self.booking_order, _booking_key(booking))
+        insort(self.bookings_by_user[booking.user_id], _booking_key(booking))
+        if booking.status == BookingStatus.confirmed:
+            self.confirmed[booking.slot_id][booking.user_id] = booking.id
+
+    def unindex_booking(self, booking: BookingRecord) -> None:
+        del self.bookings[booking.id]
+        self.booking_order.remove(_booking_key(booking))
+        self.bookings_by_user[booking.user_id].remove(_booking_key(booking))
+        if booking.status == BookingStatus.confirmed:
+            del self.confirmed[booking.slot_id][booking.user_id]
+
+    def set_booking_status(
+        self, booking: BookingRecord, status: BookingStatus, updated_at: datetime
+    ) -> None:
+        if booking.status == BookingStatus.confirmed:
+            del self.confirmed[booking.slot_id][booking.user_id]
+        if status == BookingStatus.confirmed:
+            self.confirmed[booking.slot_id][booking.user_id] = booking.id
+        booking.status = status
+        booking.updated_at = updated_at
+
+    def index_waitlist_entry(self, entry: WaitlistRecord) -> None:
+        self.waitlist[entry.id] = entry
+        insort(self.waitlist_by_slot[entry.slot_id], entry.id)
+        self.waitlist_by_user[entry.user_id].add(entry.id)
+        self.waitlist_ids[(entry.slot_id, entry.user_id)] = entry.id
+
+    def unindex_waitlist_entry(self, entry: WaitlistRecord) -> None:
+        del self.waitlist[entry.id]
+        self.waitlist_by_slot[entry.slot_id].remove(entry.id)
+        self.waitlist_by_user[entry.user_id].discard(entry.id)
+        del self.waitlist_ids[(entry.slot_id, entry.user_id)]
+
+    def bulk_load(self, users=(), services=(), slots=(), bookings=()) -> None:
+        """大量のレコードを登録（ソート済みインデックスは最後に1回だけ並べ替える）"""
+        for user in users:
+            self.users[user.id] = user
+            self.user_ids_by_email[user.email] = user.id
+        for service in services:
+            self.services[service.id] = service
+        for slot in slots:
+            self.slots[slot.id] = slot
+            self.slot_ids[(slot.service_id, slot.date, slot.start_time)] = slot.id
+            self.slot_days[(slot.service_id, slot.date)].append(
+                (slot.start_time, slot.id)
+            )
+        for booking in bookings:
+            self.bookings[booking.id] = booking
+            self.booking_order.append(_booking_key(booking))
+            self.bookings_by_user[booking.user_id].append(_booking_key(booking))
+            if booking.status == BookingStatus.confirmed:
+                self.confirmed[booking.slot_id][booking.user_id] = booking.id
+
+        self.service_dates.clear()
+        for (service_id, slot_date), day in self.slot_days.items():
+            day.sort()
+            self.service_dates[service_id].append(slot_date)
+        for dates in self.service_dates.values():
+            dates.sort()
+        self.booking_order.sort()
+        for keys in self.bookings_by_user.values():
+            keys.sort()
+
+        # 連番を登録済みの id の後ろから再開する
+        for table, records in (
+            ("users", self.users),
+            ("services", self.services),
+            ("slots", self.slots),
+            ("bookings", self.bookings),
+        ):
+            self._ids[table] = itertools.count(max(records, default=0) + 1)
+
+    def clear(self) -> None:
+        """全データを破棄（ベンチマークの初期化用）"""
+        self.__init__()
+
+
+class MemoryRepository(Repository):
+    """メモリ実装（ENVIRONMENT=mock 用、DBなしでAPI全体を動かす）
+
+    書き込みは即座にストアへ反映し、取り消し用の操作を記録して rollback() で戻す。
+    予約数を変える操作はスロット単位のロックを取り commit() / rollback() まで保持するため、
+    同じスロットへの確保は直列化され、別スロットの操作は並行して進む。
+    読み取りはロックせず、コミット前の変更も見える。
+    """
+
+    def __init__(self, store: "MemoryStore"):
+        self.store = store
+        self._undo: list[Callable[[], None]] = []
+        self._locked: list[int] = []
+
+    async def _lock(self, slot_ids) -> None:
+        # 複数スロットは id 順にロックしてデッドロックを避ける
+        for slot_id in sorted(set(slot_ids)):
+            if slot_id not in self._locked:
+                await self.store.acquire_slot(slot_id)
+                self._locked.append(slot_id)
+
+    def _release(self) -> None:
+        while self._locked:
+            self.store.release_slot(self._locked.pop())
+
+    async def commit(self) -> None:
+        self._undo.clear()
+        self._release()
+
+    async def rollback(self) -> None:
+        while self._undo:
+            self._undo.pop()()
+        self._release()
+
+    async def advisory_lock(self, key: int) -> None:
+        # 単一プロセスで動くため不要
+        pass
+
+    async def publish(self, channel: str, payloads: list[dict]) -> None:
+        # 他ワーカーはいない（このワーカーへの反映は slot_changed() が行う）
+        pass
+
+    async def get_user(self, user_id: int) -> Optional[UserRecord]:
+        return self.store.users.get(user_id)
+
+    async def get_user_by_email(self, email: str) -> Optional[UserRecord]:
+        user_id = self.store.user_ids_by_email.get(email)
+        return None if user_id is None else self.store.users[user_id]
+
+    async def add_user(self, name: str, email: str, hashed_password: str):
+        user = UserRecord(self.store.next_id("users"), name, email, hashed_password)
+        self.store.users[user.id] = user
+        self.store.user_ids_by_email[email] = user.id
+        self._undo.append(partial(self.store.users.pop, user.id))
+        self._undo.append(partial(self.store.user_ids_by_email.pop, email))
+        return user
+
+    async def set_password_hash(self, user: UserRecord, hashed_password: str) -> None:
+        self._undo.append(
+            partial(setattr, user, "hashed_password", user.hashed_password)
+        )
+        user.hashed_password = hashed_password
+
+    async def list_services(self) -> list:
+        return [self.store.services[key] for key in sorted(self.store.services)]
+
+    async def get_service(self, service_id: int) -> Optional[ServiceRecord]:
+        return self.store.services.get(service_id)
+
+    async def add_service(self, name: str, description: str, duration: int):
+        service = ServiceRecord(
+            self.store.next_id("services"), name, description, duration
+        )
+        self.store.services[service.id] = service
+        self._undo.append(partial(self.store.services.pop, service.id))
+        return service
+
+    def _day_slots(self, service_id: int, target_date: date) -> list[SlotRecord]:
+        day = self.store.slot_days.get((service_id, target_date), ())
+        return [self.store.slots[slot_id] for _, slot_id in day]
+
+    async def get_slot_availability(self, service_id: int, target_date: date) -> list:
+        return [
+            SlotAvailabilityRow(
+                slot.id,
+                slot.start_time.strftime("%H:%M"),
+                slot.capacity,
+                slot.reserved,
+                slot.capacity - slot.reserved,
+            )
+            for slot in self._day_slots(service_id, target_date)
+        ]
+
+    async def get_availability_calendar(
+        self, service_id: int, date_from: date, date_to: date
+    ) -> list:
+        if service_id not in self.store.services:
+            return []
+
+        dates = self.store.service_dates.get(service_id, [])
+        rows = []
+        for day in dates[bisect_left(dates, date_from) : bisect_right(dates, date_to)]:
+            slots = self._day_slots(service_id, day)
+            rows.append(
+                (
+                    day,
+                    [slot.id for slot in slots],
+                    [slot.start_time.strftime("%H:%M") for slot in slots],
+                    [slot.capacity for slot in slots],
+                    [slot.reserved for slot in slots],
+                )
+            )
+        # SQL実装の LEFT JOIN と同じく、スロットがなければ date が None の1行を返す
+        return rows or [(None, None, None, None, None)]
+
+    async def find_slot_id(
+        self, service_id: int, target_date: date, start_time: time
+    ) -> Optional[int]:
+        return self.store.slot_ids.get((service_id, target_date, start_time))
+
+    def _admit(self, slot: SlotRecord) -> Optional[SlotCounter]:
+        if slot.reserved >= slot.capacity:
+            return None
+        _add_reserved(slot, 1)
+        self._undo.append(partial(_add_reserved, slot, -1))
+        return SlotCounter(slot.id, slot.reserved, slot.capacity)
+
+    async def admit_slot(self, service_id: int, target_date: date, start_time: time):
+        slot_id = self.store.slot_ids.get((service_id, target_date, start_time))
+        if slot_id is None:
+            return None
+        await self._lock([slot_id])
+        return self._admit(self.store.slots[slot_id])
+
+    async def resolve_slots(self, user_id: int, keys: list[tuple]) -> list:
+        slot_ids = {
+            self.store.slot_ids[key] for key in keys if key in self.store.slot_ids
+        }
+        await self._lock(slot_ids)
+
+        rows = []
+        for slot_id in sorted(slot_ids):
+            slot = self.store.slots[slot_id]
+            booked = user_id in self.store.confirmed.get(slot_id, {})
+            rows.append(
+                ResolvedSlot(
+                    slot.id, slot.service_id, slot.date, slot.start_time, booked
+                )
+            )
+        return rows
+
+    async def admit_slots(self, slot_ids: list[int]) -> list:
+        await self._lock(slot_ids)
+        rows = []
+        for slot_id in slot_ids:
+            admitted = self._admit(self.store.slots[slot_id])
+            if admitted is not None:
+                rows.append(admitted)
+        return rows
+
+    async def release_slot(self, slot_id: int):
+        await self._lock([slot_id])
+        slot = self.store.slots.get(slot_id)
+        if slot is None or slot.reserved <= 0:
+            return None
+        _add_reserved(slot, -1)
+        self._undo.append(partial(_add_reserved, slot, 1))
+        return SlotCounter(slot.id, slot.reserved, slot.capacity)
+
+    async def lock_slot(self, slot_id: int) -> None:
+        await self._lock([slot_id])
+
+    async def insert_slots(self, rows: list[dict]) -> list[tuple[int, date]]:
+        created = []
+        for row in rows:
+            key = (row["service_id"], row["date"], row["start_time"])
+            if key in self.store.slot_ids:
+                continue
+            slot = SlotRecord(self.store.next_id("slots"), *key, row["capacity"])
+            self.store.index_slot(slot)
+            self._undo.append(partial(self.store.unindex_slot, slot))
+            created.append((slot.service_id, slot.date))
+        return created
+
+    async def get_booking(self, booking_id: int) -> Optional[BookingRecord]:
+        return self.store.bookings.get(booking_id)
+
+    async def add_booking(
+        self,
+        user_id: int,
+        service_id: int,
+        slot_id: int,
+        target_date: date,
+        start_time: time,
+    ) -> int:
+        # 部分ユニークインデックス (user_id, slot_id) WHERE status = 'confirmed' に相当
+        if user_id in self.store.confirmed.get(slot_id, {}):
+            raise DuplicateBookingError()
+
+        booking = BookingRecord(
+            self.store.next_id("bookings"),
+            user_id,
+            service_id,
+            slot_id,
+            target_date,
+            start_time,
+            BookingStatus.confirmed,
+        )
+        self.store.index_booking(booking)
+        self._undo.append(partial(self.store.unindex_booking, booking))
+        return booking.id
+
+    async def add_bookings(self, user_id: int, slots: list) -> dict[int, int]:
+        booking_ids = {}
+        for slot in slots:
+            booking_ids[slot.id] = await self.add_booking(
+                user_id, slot.service_id, slot.id, slot.date, slot.start_time
+            )
+        return booking_ids
+
+    async def cancel_booking(self, booking_id: int) -> bool:
+        booking = self.store.bookings.get(booking_id)
+        if booking is None or booking.status != BookingStatus.confirmed:
+            return False
+
+        self._undo.append(
+            partial(
+                self.store.set_booking_status,
+                booking,
+                booking.status,
+                booking.updated_at,
+            )
+        )
+        self.store.set_booking_status(
+            booking, BookingStatus.cancelled, datetime.utcnow()
+        )
+        return True
+
+    def _booking_range(
+        self,
+        order: list[tuple],
+        date_from: Optional[date],
+        date_to: Optional[date],
+    ) -> tuple[int, int]:
+        """ソート済みの (date, start_time, id) から期間内の添字範囲を二分探索"""
+        lo = bisect_left(order, (date_from,)) if date_from is not None else 0
+        hi = len(order)
+        if date_to is not None:
+            hi = bisect_right(order, (date_to, time.max, _LAST_ID))
+        return lo, hi
+
+    def _matches(
+        self,
+        booking: BookingRecord,
+        service_id: Optional[int],
+        status: Optional[BookingStatus],
+    ) -> bool:
+        return (service_id is None or booking.service_id == service_id) and (
+            status is None or booking.status == status
+        )
+
+    async def list_bookings(
+        self,
+        *,
+        limit: int,
+        cursor: Optional[tuple[date, time, int]] = None,
+        user_id: Optional[int] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        service_id: Optional[int] = None,
+        status: Optional[BookingStatus] = None,
+        with_user_name: bool = False,
+    ) -> tuple[list, Optional[str]]:
+        if user_id is not None:
+            order = self.store.bookings_by_user.get(user_id, [])
+        else:
+            order = self.store.booking_order
+
+        lo, hi = self._booking_range(order, date_from, date_to)
+        if cursor is not None:
+            hi = min(hi, bisect_left(order, cursor))
+
+        bookings = []
+        for index in range(hi - 1, lo - 1, -1):
+            booking = self.store.bookings[order[index][2]]
+            if self._matches(booking, service_id, status):
+                bookings.append(booking)
+                if len(bookings) > limit:
+                    break
+
+        next_cursor = None
+        if len(bookings) > limit:
+            bookings = bookings[:limit]
+            last = bookings[-1]
+            next_cursor = encode_cursor(last.date, last.start_time, last.id)
+
+        rows = []
+        for booking in bookings:
+            row = (
+                booking.id,
+                booking.service_id,
+                self.store.services[booking.service_id].name,
+                booking.date.isoformat(),
+                booking.start_time.strftime("%H:%M"),
+                booking.status,
+            )
+            if with_user_name:
+                rows.append(
+                    AdminBookingRow(*row, self.store.users[booking.user_id].name)
+                )
+            else:
+                rows.append(BookingRow(*row))
+        return rows, next_cursor
+
+    async def stream_booking_export(
+        self,
+        *,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        service_id: Optional[int] = None,
+        status: Optional[BookingStatus] = None,
+        batch_size: int = 1000,
+    ):
+        # 開始時点の範囲を複製し、ストリーム中の追加・取消の影響を受けないようにする
+        order = self.store.booking_order
+        lo, hi = self._booking_range(order, date_from, date_to)
+        keys = order[lo:hi]
+
+        batch = []
+        for _, _, booking_id in keys:
+            booking = self.store.bookings.get(booking_id)
+            if booking is None or not self._matches(booking, service_id, status):
+                continue
+            batch.append(
+                ExportRow(
+                    booking.id,
+                    booking.service_id,
+                    self.store.services[booking.service_id].name,
+                    self.store.users[booking.user_id].name,
+                    booking.date,
+                    booking.start_time,
+                    booking.status,
+                )
+            )
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def _expired_before(self) -> datetime:
+        return datetime.utcnow() - timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS)
+
+    async def get_stored_response(self, user_id: int, key: str):
+        stored = self.store.idempotency.get((user_id, key))
+        if stored is None or stored.created_at < self._expired_before():
+            return None
+        return stored
+
+    async def store_response(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        response: dict,
+    ) -> bool:
+        if await self.get_stored_response(user_id, key) is not None:
+            return False
+
+        previous = self.store.idempotency.get((user_id, key))
+        self.store.idempotency[(user_id, key)] = StoredResponse(
+            request_hash, status_code, response, datetime.utcnow()
+        )
+        if previous is None:
+            self._undo.append(partial(self.store.idempotency.pop, (user_id, key)))
+        else:
+            self._undo.append(
+                partial(self.store.idempotency.__setitem__, (user_id, key), previous)
+            )
+        return True
+
+    async def purge_expired_responses(self, limit: int) -> int:
+        expired_before = self._expired_before()
+        expired = [
+            item
+            for item, stored in self.store.idempotency.items()
+            if stored.created_at < expired_before
+        ][:limit]
+        for item in expired:
+            previous = self.store.idempotency.pop(item)
+            self._undo.append(
+                partial(self.store.idempotency.__setitem__, item, previous)
+            )
+        return len(expired)
+
+    async def lock_slot_for_waitlist(
+        self, user_id: int, service_id: int, target_date: date, start_time: time
+    ):
+        slot_id = self.store.slot_ids.get((service_id, target_date, start_time))
+        if slot_id is None:
+            return None
+        await self._lock([slot_id])
+        slot = self.store.slots[slot_id]
+        booked = user_id in self.store.confirmed.get(slot_id, {})
+        return WaitlistSlot(slot.id, slot.reserved, slot.capacity, booked)
+
+    def _position(self, entry: WaitlistRecord) -> int:
+        return bisect_left(self.store.waitlist_by_slot[entry.slot_id], entry.id) + 1
+
+    async def join_waitlist(self, slot_id: int, user_id: int):
+        if (slot_id, user_id) in self.store.waitlist_ids:
+            return None
+
+        entry = WaitlistRecord(self.store.next_id("waitlist_entries"), slot_id, user_id)
+        self.store.index_waitlist_entry(entry)
+        self._undo.append(partial(self.store.unindex_waitlist_entry, entry))
+        return WaitlistPosition(entry.id, self._position(entry))
+
+    async def list_waitlist_entries(self, user_id: int) -> list:
+        rows = []
+        for entry_id in self.store.waitlist_by_user.get(user_id, ()):
+            entry = self.store.waitlist[entry_id]
+            slot = self.store.slots[entry.slot_id]
+            rows.append(
+                WaitlistEntryRow(
+                    entry.id,
+                    slot.service_id,
+                    self.store.services[slot.service_id].name,
+                    slot.date,
+                    slot.start_time,
+                    self._position(entry),
+                )
+            )
+        rows.sort(key=lambda row: (row.date, row.start_time, row.id))
+        return rows
+
+    async def leave_waitlist(self, entry_id: int, user_id: int) -> bool:
+        entry = self.store.waitlist.get(entry_id)
+        if entry is None or entry.user_id != user_id:
+            return False
+        self.store.unindex_waitlist_entry(entry)
+        self._undo.append(partial(self.store.index_waitlist_entry, entry))
+        return True
+
+    async def promote_waitlist_head(
+        self, slot_id: int, service_id: int, target_date: date, start_time: time
+    ):
+        holders = self.store.confirmed.get(slot_id, {})
+        head = None
+        for entry_id in list(self.store.waitlist_by_slot.get(slot_id, ())):
+            entry = self.store.waitlist[entry_id]
+            if entry.user_id in holders:
+                # 予約済みになったユーザーのエントリは削除する
+                self.store.unindex_waitlist_entry(entry)
+                self._undo.append(partial(self.store.index_waitlist_entry, entry))
+            elif head is None:
+                head = entry
+        if head is None:
+            return None
+
+        entry = head
+        self.store.unindex_waitlist_entry(entry)
+        self._undo.append(partial(self.store.index_waitlist_entry, entry))
+        booking_id = await self.add_booking(
+            entry.user_id, service_id, slot_id, target_date, start_time
+        )
+        return PromotedBooking(booking_id, entry.user_id)
+
+    async def list_schedule_templates(
+        self, period_from: Optional[date] = None, period_to: Optional[date] = None
+    ) -> list:
+        templates = [
+            template
+            for template in self.store.templates.values()
+            if (period_from is None or template.valid_to >= period_from)
+            and (period_to is None or template.valid_from <= period_to)
+        ]
+        templates.sort(key=lambda template: (template.service_id, template.id))
+        return templates
+
+    async def get_schedule_template(self, template_id: int):
+        return self.store.templates.get(template_id)
+
+    async def add_schedule_template(
+        self,
+        service_id: int,
+        weekdays: list[int],
+        start_times: list[time],
+        capacity: int,
+        valid_from: date,
+        valid_to: date,
+    ):
+        template = ScheduleTemplateRecord(
+            self.store.next_id("schedule_templates"),
+            service_id,
+            list(weekdays),
+            list(start_times),
+            capacity,
+            valid_from,
+            valid_to,
+        )
+        self.store.templates[template.id] = template
+        self._undo.append(partial(self.store.templates.pop, template.id))
+        return template
+
+
+memory_store = MemoryStore()
@@ -0,0 +1,254 @@
+from datetime import date, time
+from typing import Optional
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.notify import publish, publish_many
+from app.models.models import (
+    Booking,
+    BookingStatus,
+    ScheduleTemplate,
+    Service,
+    Slot,
+    User,
+)
+from app.queries import availability, bookings, idempotency, schedules, waitlist
+from app.repositories.base import DuplicateBookingError, Repository
+
+
+class SqlRepository(Repository):
+    """PostgreSQL 実装（AsyncSession 1つをリクエストの間使う）"""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def commit(self) -> None:
+        await self.db.commit()
+
+    async def rollback(self) -> None:
+        await self.db.rollback()
+
+    async def advisory_lock(self, key: int) -> None:
+        await self.db.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": key})
+
+    async def publish(self, channel: str, payloads: list[dict]) -> None:
+        if len(payloads) == 1:
+            await publish(self.db, channel, payloads[0])
+        elif payloads:
+            await publish_many(self.db, channel, payloads)
+
+    async def get_user(self, user_id: int):
+        return await self.db.get(User, user_id)
+
+    async def get_user_by_email(self, email: str):
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalar_one_or_none()
+
+    async def add_user(self, name: str, email: str, hashed_password: str):
+        user = User(name=name, email=email, hashed_password=hashed_password)
+        self.db.add(user)
+        await self.db.flush()
+        return user
+
+    async def set_password_hash(self, user, hashed_password: str) -> None:
+        user.hashed_password = hashed_password
+
+    async def list_services(self) -> list:
+        result = await self.db.execute(select(Service).order_by(Service.id))
+        return list(result.scalars())
+
+    async def get_service(self, service_id: int):
+        return await self.db.get(Service, service_id)
+
+    async def add_service(self, name: str, description: str, duration: int):
+        service = Service(name=name, description=description, duration=duration)
+        self.db.add(service)
+        await self.db.flush()
+        return service
+
+    async def get_slot_availability(self, service_id: int, target_date: date) -> list:
+        return await availability.get_slot_availability(
+            self.db, service_id, target_date
+        )
+
+    async def get_availability_calendar(
+        self, service_id: int, date_from: date, date_to: date
+    ) -> list:
+        return await availability.get_availability_calendar(
+            self.db, service_id, date_from, date_to
+        )
+
+    async def find_slot_id(
+        self, service_id: int, target_date: date, start_time: time
+    ) -> Optional[int]:
+        return await self.db.scalar(
+            select(Slot.id).where(
+                Slot.service_id == service_id,
+                Slot.date == target_date,
+                Slot.start_time == start_time,
+            )
+        )
+
+    async def admit_slot(self, service_id: int, target_date: date, start_time: time):
+        return await availability.admit_slot(
+            self.db, service_id, target_date, start_time
+        )
+
+    async def resolve_slots(self, user_id: int, keys: list[tuple]) -> list:
+        return await availability.resolve_slots(self.db, user_id, keys)
+
+    async def admit_slots(self, slot_ids: list[int]) -> list:
+        return await availability.admit_slots(self.db, slot_ids)
+
+    async def release_slot(self, slot_id: int):
+        return await availability.release_slot(self.db, slot_id)
+
+    async def lock_slot(self, slot_id: int) -> None:
+        await waitlist.lock_slot(self.db, slot_id)
+
+    async def insert_slots(self, rows: list[dict]) -> list[tuple[int, date]]:
+        return await schedules.insert_slots(self.db, rows)
+
+    async def get_booking(self, booking_id: int):
+        return await self.db.get(Booking, booking_id)
+
+    async def add_booking(
+        self,
+        user_id: int,
+        service_id: int,
+        slot_id: int,
+        target_date: date,
+        start_time: time,
+    ) -> int:
+        booking = Booking(
+            user_id=user_id,
+            service_id=service_id,
+            slot_id=slot_id,
+            date=target_date,
+            start_time=start_time,
+            status=BookingStatus.confirmed,
+        )
+        self.db.add(booking)
+        try:
+            await self.db.flush()
+        except IntegrityError as e:
+            raise DuplicateBookingError() from e
+        return booking.id
+
+    async def add_bookings(self, user_id: int, slots: list) -> dict[int, int]:
+        stmt = (
+            insert(Booking)
+            .values(
+                [
+                    {
+                        "user_id": user_id,
+                        "service_id": slot.service_id,
+                        "slot_id": slot.id,
+                        "date": slot.date,
+                        "start_time": slot.start_time,
+                        "status": BookingStatus.confirmed,
+                    }
+                    for slot in slots
+                ]
+            )
+            .returning(Booking.id, Booking.slot_id)
+        )
+        try:
+            result = await self.db.execute(stmt)
+        except IntegrityError as e:
+            raise DuplicateBookingError() from e
+        return {row.slot_id: row.id for row in result}
+
+    async def cancel_booking(self, booking_id: int) -> bool:
+        result = await self.db.execute(
+            update(Booking)
+            .where(Booking.id == booking_id, Booking.status == BookingStatus.confirmed)
+            .values(status=BookingStatus.cancelled)
+            .execution_options(synchronize_session=False)
+        )
+        return bool(result.rowcount)
+
+    async def list_bookings(self, **filters):
+        return await bookings.list_bookings(self.db, **filters)
+
+    def stream_booking_export(self, **filters):
+        # セッションとは別のコネクションで読み取り専用トランザクションを張る
+        # （レプリカのセッションならレプリカから読む）
+        return bookings.stream_booking_export(engine=self.db.bind, **filters)
+
+    async def get_stored_response(self, user_id: int, key: str):
+        return await idempotency.get_stored_response(self.db, user_id, key)
+
+    async def store_response(
+        self,
+        user_id: int,
+        key: str,
+        request_hash: str,
+        status_code: int,
+        response: dict,
+    ) -> bool:
+        return await idempotency.store_response(
+            self.db, user_id, key, request_hash, status_code, response
+        )
+
+    async def purge_expired_responses(self, limit: int) -> int:
+        return await idempotency.purge_expired_responses(self.db, limit)
+
+    async def lock_slot_for_waitlist(
+        self, user_id: int, service_id: int, target_date: date, start_time: time
+    ):
+        return await waitlist.lock_slot_for_waitlist(
+            self.db, user_id, service_id, target_date, start_time
+        )
+
+    async def join_waitlist(self, slot_id: int, user_id: int):
+        return await waitlist.join_waitlist(self.db, slot_id, user_id)
+
+    async def list_waitlist_entries(self, user_id: int) -> list:
+        return await waitlist.list_waitlist_entries(self.db, user_id)
+
+    async def leave_waitlist(self, entry_id: int, user_id: int) -> bool:
+        return await waitlist.leave_waitlist(self.db, entry_id, user_id)
+
+    async def promote_waitlist_head(
+        self, slot_id: int, service_id: int, target_date: date, start_time: time
+    ):
+        return await waitlist.promote_waitlist_head(
+            self.db, slot_id, service_id, target_date, start_time
+        )
+
+    async def list_schedule_templates(
+        self, period_from: Optional[date] = None, period_to: Optional[date] = None
+    ) -> list:
+        stmt = select(ScheduleTemplate).order_by(
+            ScheduleTemplate.service_id, ScheduleTemplate.id
+        )
+        if period_from is not None:
+            stmt = stmt.where(ScheduleTemplate.valid_to >= period_from)
+        if period_to is not None:
+            stmt = stmt.where(ScheduleTemplate.valid_from <= period_to)
+        return list((await self.db.execute(stmt)).scalars())
+
+    async def get_schedule_template(self, template_id: int):
+        return await self.db.get(ScheduleTemplate, template_id)
+
+    async def add_schedule_template(
+        self,
+        service_id: int,
+        weekdays: list[int],
+        start_times: list[time],
+        capacity: int,
+        valid_from: date,
+        valid_to: date,
+    ):
+        template = ScheduleTemplate(
+            service_id=service_id,
+            weekdays=weekdays,
+            start_times=start_times,
+            capacity=capacity,
+            valid_from=valid_from,
+            valid_to=valid_to,
+        )
+        self.db.add(template)
+        await self.db.flush()
+        return template
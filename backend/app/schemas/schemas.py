@@ -1,6 +1,6 @@
 from pydantic import BaseModel, EmailStr
 from datetime import date, time
-from typing import Optional
+from typing import Literal, Optional
 
 
 # User Schemas
@@ -73,6 +73,24 @@ class SlotsResponse(BaseModel):
     slots: list[SlotInfo]
 
 
+class DayAvailability(BaseModel):
+    """1日分の空き状況（スロットごとの値を列ごとの配列で保持）"""
+
+    date: str
+    slot_ids: list[int]
+    start_times: list[str]
+    capacity: list[int]
+    reserved: list[int]
+    available: list[int]
+
+
+class AvailabilityCalendarResponse(BaseModel):
+    service_id: int
+    date_from: str
+    date_to: str
+    days: list[DayAvailability]
+
+
 # Booking Schemas
 class BookingCreate(BaseModel):
     service_id: int
@@ -81,6 +99,30 @@ class BookingCreate(BaseModel):
     start_time: str
 
 
+class BookingBatchItem(BaseModel):
+    service_id: int
+    date: str
+    start_time: str
+
+
+class BookingBatchCreate(BaseModel):
+    items: list[BookingBatchItem]
+    # all_or_nothing: 1件でも失敗したら全件取り消し / best_effort: 確保できた分だけ予約
+    mode: Literal["all_or_nothing", "best_effort"] = "all_or_nothing"
+
+
+class BookingBatchItemResult(BookingBatchItem):
+    status: str  # confirmed / failed
+    booking_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BookingBatchResponse(BaseModel):
+    mode: str
+    confirmed: int
+    results: list[BookingBatchItemResult]
+
+
 class BookingResponse(BaseModel):
     booking_id: int
     status: str
@@ -105,6 +147,59 @@ class AdminBookingDetail(BookingDetail):
     user_name: str
 
 
+class BookingPage(BaseModel):
+    items: list[BookingDetail]
+    next_cursor: Optional[str] = None
+
+
+class AdminBookingPage(BaseModel):
+    items: list[AdminBookingDetail]
+    next_cursor: Optional[str] = None
+
+
+class WaitlistCreate(BaseModel):
+    service_id: int
+    date: str
+    start_time: str
+
+
+class WaitlistEntryResponse(BaseModel):
+    id: int
+    service_id: int
+    date: str
+    start_time: str
+    position: int  # 1 が先頭
+
+
+class WaitlistEntryDetail(WaitlistEntryResponse):
+    service_name: str
+
+
 class BookingCancelResponse(BaseModel):
     id: int
     status: str
+
+
+# Schedule Template Schemas
+class ScheduleTemplateCreate(BaseModel):
+    service_id: int
+    weekdays: list[int]  # 0=月曜 〜 6=日曜
+    start_times: list[str]  # "HH:MM"
+    capacity: int
+    valid_from: str
+    valid_to: str
+
+
+class ScheduleTemplateResponse(BaseModel):
+    id: int
+    service_id: int
+    weekdays: list[int]
+    start_times: list[str]
+    capacity: int
+    valid_from: str
+    valid_to: str
+
+
+class SlotGenerationResponse(BaseModel):
+    requested: int
+    created: int
@@ -0,0 +1,134 @@
+"""
+In-process API benchmark
+
+Drives the app through httpx's ASGI transport against the configured
+database (load it with generate_dataset.py first) and writes JSON results
+that can be diffed between commits with ``python -m benchmarks.compare``.
+With ENVIRONMENT=mock the same dataset is generated into the in-memory
+repository instead, which measures application overhead without Postgres.
+
+Usage:
+    python -m benchmarks --scenario browse --requests 2000 --concurrency 20
+    ENVIRONMENT=mock python -m benchmarks --mock-dataset "--bookings 100000"
+"""
+
+import argparse
+import asyncio
+import random
+import shlex
+import sys
+from pathlib import Path
+import httpx
+from app.core.config import settings
+from app.main import app
+from benchmarks.results import write_results
+from benchmarks.runner import BenchClient, run_operations
+from benchmarks.scenarios import SCENARIOS
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="In-process API benchmark")
+    parser.add_argument(
+        "--scenario",
+        action="append",
+        choices=sorted(SCENARIOS),
+        help="scenario to run (repeatable, default: all)",
+    )
+    parser.add_argument("--requests", type=int, default=1000, help="iterations")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="JSON result path")
+    parser.add_argument(
+        "--mock-dataset",
+        default="--bookings 200000",
+        help="generate_dataset.py options for the in-memory store (mock only)",
+    )
+    return parser.parse_args()
+
+
+async def run_scenario(name: str, args) -> dict:
+    scenario = SCENARIOS[name]
+    operation = await scenario.setup(random.Random(args.seed))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark"
+    ) as client:
+        bench = BenchClient(client)
+        duration = await run_operations(
+            bench, operation, args.requests, args.concurrency, args.warmup
+        )
+
+    endpoints = {label: stats.summary() for label, stats in bench.stats.items()}
+    total_requests = sum(endpoint["count"] for endpoint in endpoints.values())
+    return {
+        "description": scenario.description,
+        "iterations": args.requests,
+        "duration_seconds": round(duration, 3),
+        "throughput_rps": round(total_requests / duration, 2) if duration else 0.0,
+        "endpoints": endpoints,
+    }
+
+
+def print_summary(name: str, result: dict) -> None:
+    print(
+        f"\n{name}: {result['throughput_rps']} req/s "
+        f"in {result['duration_seconds']}s"
+    )
+    print(f"  {'endpoint':<26}{'p50':>9}{'p95':>9}{'p99':>9}{'sql':>7}{'err':>6}")
+    for label, stats in sorted(result["endpoints"].items()):
+        latency = stats["latency_ms"]
+        print(
+            f"  {label:<26}{latency['p50']:>9.2f}{latency['p95']:>9.2f}"
+            f"{latency['p99']:>9.2f}{stats['sql_per_request']['mean']:>7.2f}"
+            f"{stats['errors']:>6}"
+        )
+
+
+async def main(args) -> dict:
+    if settings.uses_memory_backend():
+        from benchmarks.memory_dataset import load_memory_dataset
+
+        loaded = load_memory_dataset(shlex.split(args.mock_dataset))
+        print(f"Loaded in-memory dataset: {loaded}")
+
+    results = {}
+    # Run the app lifespan (notification listener, executors) once for all scenarios
+    async with app.router.lifespan_context(app):
+        for name in args.scenario or list(SCENARIOS):
+            results[name] = await run_scenario(name, args)
+            print_summary(name, results[name])
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = asyncio.run(main(args))
+
+    output = write_results(
+        {"scenarios": results},
+        {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "warmup": args.warmup,
+            "seed": args.seed,
+            "environment": settings.ENVIRONMENT,
+            "mock_dataset": (
+                args.mock_dataset if settings.uses_memory_backend() else None
+            ),
+        },
+        args.output,
+    )
+    print(f"\nResults written to {output}")
+
+    # A scenario whose requests are rejected measures nothing useful
+    failed = [
+        f"{name}/{label}"
+        for name, result in results.items()
+        for label, stats in result["endpoints"].items()
+        if stats["errors"]
+    ]
+    if failed:
+        print(f"Unexpected error responses in: {', '.join(failed)}")
+        sys.exit(1)
@@ -0,0 +1,52 @@
+"""
+Compare two benchmark result files
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/before.json benchmarks/results/after.json
+"""
+
+import argparse
+import json
+from pathlib import Path
+
+
+def change(before: float, after: float) -> str:
+    if not before:
+        return "    n/a"
+    return f"{(after - before) / before * 100:+6.1f}%"
+
+
+def compare(before: dict, after: dict) -> None:
+    print(f"{before['meta']['commit']} -> {after['meta']['commit']}")
+    for name, new in after["scenarios"].items():
+        old = before["scenarios"].get(name)
+        if old is None:
+            print(f"\n{name}: only in {after['meta']['commit']}")
+            continue
+
+        print(
+            f"\n{name}: {old['throughput_rps']} -> {new['throughput_rps']} req/s "
+            f"({change(old['throughput_rps'], new['throughput_rps'])})"
+        )
+        for label, stats in sorted(new["endpoints"].items()):
+            old_stats = old["endpoints"].get(label)
+            if old_stats is None:
+                continue
+            cells = []
+            for pct in ("p50", "p95", "p99"):
+                cells.append(
+                    f"{pct} {stats['latency_ms'][pct]:.2f}ms "
+                    f"({change(old_stats['latency_ms'][pct], stats['latency_ms'][pct])})"
+                )
+            sql_before = old_stats["sql_per_request"]["mean"]
+            sql_after = stats["sql_per_request"]["mean"]
+            cells.append(f"sql {sql_before} -> {sql_after}")
+            print(f"  {label:<26}" + "  ".join(cells))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare benchmark results")
+    parser.add_argument("before", type=Path)
+    parser.add_argument("after", type=Path)
+    args = parser.parse_args()
+    compare(json.loads(args.before.read_text()), json.loads(args.after.read_text()))
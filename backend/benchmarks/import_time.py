@@ -0,0 +1,107 @@
+"""
+Cold-start import benchmark
+
+Imports the app in fresh interpreters with ``-X importtime`` and reports
+how long ``import app.main`` takes, plus the slowest modules. Importing
+must not create engines or touch the database, so this runs without one.
+
+Usage:
+    python -m benchmarks.import_time --runs 10 --max-ms 1500
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+from benchmarks.results import write_results
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Cold-start import benchmark")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--top", type=int, default=15, help="slowest modules shown")
+    parser.add_argument(
+        "--max-ms",
+        type=float,
+        help="exit with status 1 when the median exceeds this",
+    )
+    parser.add_argument("--output", type=Path, help="JSON result path")
+    return parser.parse_args()
+
+
+def measure(module: str) -> dict:
+    """Import once in a fresh interpreter; returns cumulative/self µs per module"""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = {}
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        modules[name.strip()] = (int(self_us), int(cumulative_us))
+    return modules
+
+
+def main(args) -> dict:
+    totals = []
+    self_times: dict[str, list] = {}
+    app_modules: set = set()
+    for _ in range(args.runs):
+        modules = measure(args.module)
+        totals.append(modules[args.module][1] / 1000)
+        for name, (self_us, _) in modules.items():
+            self_times.setdefault(name, []).append(self_us / 1000)
+            if name.split(".")[0] == args.module.split(".")[0]:
+                app_modules.add(name)
+
+    slowest = sorted(
+        ((name, statistics.median(times)) for name, times in self_times.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )[: args.top]
+
+    return {
+        "module": args.module,
+        "runs": args.runs,
+        "import_ms": {
+            "median": round(statistics.median(totals), 2),
+            "min": round(min(totals), 2),
+            "max": round(max(totals), 2),
+        },
+        "app_self_ms": round(
+            sum(statistics.median(self_times[name]) for name in app_modules), 2
+        ),
+        "slowest_modules_ms": {name: round(ms, 2) for name, ms in slowest},
+    }
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    result = main(args)
+
+    print(
+        f"import {result['module']}: median {result['import_ms']['median']}ms "
+        f"(min {result['import_ms']['min']}ms, max {result['import_ms']['max']}ms, "
+        f"{result['runs']} runs)"
+    )
+    print(f"  time spent in the app's own modules: {result['app_self_ms']}ms")
+    for name, ms in result["slowest_modules_ms"].items():
+        print(f"  {ms:>9.2f}ms  {name}")
+
+    output = write_results({"import_time": result}, {}, args.output, "import-")
+    print(f"\nResults written to {output}")
+
+    if args.max_ms is not None and result["import_ms"]["median"] > args.max_ms:
+        print(f"Import time exceeds {args.max_ms}ms")
+        sys.exit(1)
@@ -0,0 +1,107 @@
+"""
+Load the generate_dataset.py dataset into the in-memory repository
+
+Used when the benchmarks run with ENVIRONMENT=mock. The same generator
+arguments produce the same users, slots and bookings as the COPY loader, so
+mock results isolate application overhead from database time on equal data.
+"""
+
+import random
+import time as timer
+from datetime import date, datetime, time
+from app.models.models import BookingStatus
+from app.repositories.memory import (
+    BookingRecord,
+    ServiceRecord,
+    SlotRecord,
+    UserRecord,
+    memory_store,
+)
+from generate_dataset import (
+    build_slots,
+    dataset_created_at,
+    generate_bookings,
+    generate_services,
+    generate_users,
+    parse_args,
+    password_hash,
+)
+
+
+def load_memory_dataset(argv: list[str]) -> dict:
+    """Replace the memory store contents; argv takes generate_dataset.py options"""
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    created_at = dataset_created_at(args)
+    started = timer.perf_counter()
+
+    # Draw from the generator in the same order as generate_dataset()
+    users = [
+        UserRecord(int(user_id), name, email, hashed, datetime.fromisoformat(at))
+        for user_id, name, email, hashed, at in generate_users(
+            args, created_at, password_hash(rng)
+        )
+    ]
+    services = [
+        ServiceRecord(
+            int(service_id),
+            name,
+            description,
+            int(duration),
+            datetime.fromisoformat(at),
+        )
+        for service_id, name, description, duration, at in generate_services(
+            args, rng, created_at
+        )
+    ]
+
+    planned = build_slots(args, rng)
+    reserved = [0] * len(planned)
+    bookings = [
+        BookingRecord(
+            int(booking_id),
+            int(user_id),
+            int(service_id),
+            int(slot_id),
+            date.fromisoformat(slot_date),
+            time.fromisoformat(start_time),
+            BookingStatus(status),
+            datetime.fromisoformat(booked_at),
+            datetime.fromisoformat(updated_at),
+        )
+        for (
+            booking_id,
+            user_id,
+            service_id,
+            slot_id,
+            slot_date,
+            start_time,
+            status,
+            booked_at,
+            updated_at,
+        ) in generate_bookings(args, rng, planned, reserved)
+    ]
+    slots = [
+        SlotRecord(
+            slot_id,
+            service_id,
+            slot_date,
+            start_time,
+            capacity,
+            reserved[slot_id - 1],
+            datetime.fromisoformat(created_at),
+        )
+        for slot_id, (service_id, slot_date, start_time, capacity, _) in enumerate(
+            planned, start=1
+        )
+    ]
+
+    memory_store.clear()
+    memory_store.bulk_load(users, services, slots, bookings)
+    return {
+        "users": len(users),
+        "services": len(services),
+        "slots": len(slots),
+        "bookings": len(bookings),
+        "seconds": round(timer.perf_counter() - started, 1),
+    }
@@ -0,0 +1,52 @@
+"""
+Helpers for writing benchmark results that can be diffed between commits
+"""
+
+import json
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def write_results(
+    data: dict, meta: dict, output: Optional[Path] = None, prefix: str = ""
+) -> Path:
+    """Write results with commit metadata; returns the file path"""
+    commit = git_commit()
+    output = output or RESULTS_DIR / (
+        f"{prefix}{datetime.now():%Y%m%d-%H%M%S}-{commit}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(
+        json.dumps(
+            {
+                "meta": {
+                    "commit": commit,
+                    "created_at": datetime.now().isoformat(timespec="seconds"),
+                    "python": platform.python_version(),
+                    **meta,
+                },
+                **data,
+            },
+            indent=2,
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+    )
+    return output
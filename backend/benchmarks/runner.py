@@ -0,0 +1,151 @@
+"""
+Benchmark runner: drives the FastAPI app in-process through an ASGI client
+and records latency, status codes and SQL statements for every request
+"""
+
+import asyncio
+import contextvars
+import math
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+import httpx
+from sqlalchemy import event
+from app.core.config import settings
+from app.core.security import create_access_token
+from app.db.database import get_async_engine, get_replica_async_engine
+
+# Per-request SQL statement counter (one list per in-flight request)
+_statements: contextvars.ContextVar[Optional[list]] = contextvars.ContextVar(
+    "benchmark_statements", default=None
+)
+
+
+def _count_statement(conn, cursor, statement, parameters, context, executemany):
+    counter = _statements.get()
+    if counter is not None:
+        counter[0] += 1
+
+
+# Reads routed to the replica count too
+for _engine in (get_async_engine(), get_replica_async_engine()):
+    if _engine is not None:
+        event.listen(_engine.sync_engine, "before_cursor_execute", _count_statement)
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+@dataclass
+class EndpointStats:
+    latencies: list = field(default_factory=list)
+    statements: list = field(default_factory=list)
+    status: Counter = field(default_factory=Counter)
+    errors: int = 0
+
+    def summary(self) -> dict:
+        latencies = sorted(self.latencies)
+        count = len(latencies)
+        return {
+            "count": count,
+            "errors": self.errors,
+            "status": {str(code): n for code, n in sorted(self.status.items())},
+            "latency_ms": {
+                "p50": round(percentile(latencies, 50) * 1000, 3),
+                "p95": round(percentile(latencies, 95) * 1000, 3),
+                "p99": round(percentile(latencies, 99) * 1000, 3),
+                "mean": round(sum(latencies) / count * 1000, 3) if count else 0.0,
+                "max": round(latencies[-1] * 1000, 3) if count else 0.0,
+            },
+            "sql_per_request": {
+                "mean": (round(sum(self.statements) / count, 2) if count else 0.0),
+                "max": max(self.statements, default=0),
+            },
+        }
+
+
+class BenchClient:
+    """ASGI client that records every call under an endpoint label"""
+
+    def __init__(self, client: httpx.AsyncClient):
+        self.client = client
+        self.recording = True
+        self.stats: dict[str, EndpointStats] = defaultdict(EndpointStats)
+        self._tokens: dict[int, str] = {}
+
+    def auth(self, user_id: int) -> dict:
+        # Minted directly so setup does not pay for bcrypt
+        if user_id not in self._tokens:
+            self._tokens[user_id] = create_access_token({"sub": user_id})
+        return {"Authorization": f"Bearer {self._tokens[user_id]}"}
+
+    async def call(
+        self,
+        label: str,
+        method: str,
+        url: str,
+        expected: tuple[int, ...] = (),
+        **kwargs,
+    ) -> Optional[httpx.Response]:
+        """Issue one request; 4xx/5xx count as errors unless listed in ``expected``"""
+        counter = [0]
+        token = _statements.set(counter)
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(
+                method, settings.API_V1_PREFIX + url, **kwargs
+            )
+        except Exception:
+            response = None
+        finally:
+            elapsed = time.perf_counter() - started
+            _statements.reset(token)
+
+        if self.recording:
+            stats = self.stats[label]
+            stats.latencies.append(elapsed)
+            stats.statements.append(counter[0])
+            if response is None:
+                stats.errors += 1
+            else:
+                stats.status[response.status_code] += 1
+                if response.status_code >= 400 and response.status_code not in expected:
+                    stats.errors += 1
+        return response
+
+
+Operation = Callable[[BenchClient, int], Awaitable[None]]
+
+
+async def run_operations(
+    bench: BenchClient,
+    operation: Operation,
+    total: int,
+    concurrency: int,
+    warmup: int = 0,
+) -> float:
+    """Run ``total`` operations on ``concurrency`` workers; returns wall seconds"""
+
+    async def drive(count: int, offset: int) -> None:
+        next_index = iter(range(offset, offset + count))
+
+        async def worker() -> None:
+            for index in next_index:
+                await operation(bench, index)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    if warmup:
+        bench.recording = False
+        await drive(warmup, total)
+        bench.recording = True
+
+    started = time.perf_counter()
+    await drive(total, 0)
+    return time.perf_counter() - started
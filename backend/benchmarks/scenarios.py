@@ -0,0 +1,247 @@
+"""
+Named benchmark scenarios
+
+Each scenario prepares its inputs straight from the database, or from the
+memory store under ENVIRONMENT=mock (not measured), and returns an operation
+that issues one or more API calls per iteration.
+"""
+
+import random
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Awaitable, Callable
+from sqlalchemy import func, select
+from app.core.config import settings
+from app.db.database import get_async_sessionmaker
+from app.models.models import Slot, User
+from app.repositories.memory import memory_store
+from benchmarks.runner import BenchClient, Operation
+
+# Password of users created by generate_dataset.py
+DATASET_PASSWORD = "password123"
+
+
+@dataclass
+class Scenario:
+    description: str
+    setup: Callable[[random.Random], Awaitable[Operation]]
+
+
+async def _user_ids(limit: int) -> list[int]:
+    if settings.uses_memory_backend():
+        return sorted(memory_store.users)[:limit]
+
+    async with get_async_sessionmaker()() as db:
+        result = await db.execute(select(User.id).order_by(User.id).limit(limit))
+        return list(result.scalars())
+
+
+async def _user_emails(limit: int) -> list[str]:
+    if settings.uses_memory_backend():
+        return [memory_store.users[user_id].email for user_id in await _user_ids(limit)]
+
+    async with get_async_sessionmaker()() as db:
+        result = await db.execute(select(User.email).order_by(User.id).limit(limit))
+        return list(result.scalars())
+
+
+async def _open_slots(limit: int) -> list:
+    """Slots with the most free seats, as (id, service_id, date, start_time) rows"""
+    if settings.uses_memory_backend():
+        slots = [
+            slot
+            for slot in memory_store.slots.values()
+            if slot.reserved < slot.capacity
+        ]
+        slots.sort(key=lambda slot: (slot.reserved - slot.capacity, slot.id))
+        return slots[:limit]
+
+    async with get_async_sessionmaker()() as db:
+        result = await db.execute(
+            select(Slot.id, Slot.service_id, Slot.date, Slot.start_time)
+            .where(Slot.reserved < Slot.capacity)
+            .order_by((Slot.capacity - Slot.reserved).desc(), Slot.id)
+            .limit(limit)
+        )
+        return list(result.all())
+
+
+async def _sample_slots(rng: random.Random, limit: int) -> list:
+    if settings.uses_memory_backend():
+        slot_ids = sorted(memory_store.slots)
+        start = rng.randrange(max(len(slot_ids) - limit, 1))
+        return [
+            memory_store.slots[slot_id] for slot_id in slot_ids[start : start + limit]
+        ]
+
+    async with get_async_sessionmaker()() as db:
+        total = await db.scalar(select(func.count(Slot.id)))
+        result = await db.execute(
+            select(Slot.service_id, Slot.date)
+            .order_by(Slot.id)
+            .offset(rng.randrange(max(total - limit, 1)))
+            .limit(limit)
+        )
+        return list(result.all())
+
+
+# Losing the race for a seat is part of the scenario, not a failure
+BOOKING_RACE_STATUSES = (400, 409)  # slot full / already booked by this user
+
+
+def _booking_body(slot) -> dict:
+    return {
+        "service_id": slot.service_id,
+        "slot_id": slot.id,
+        "date": slot.date.isoformat(),
+        "start_time": slot.start_time.strftime("%H:%M"),
+    }
+
+
+async def setup_browse(rng: random.Random) -> Operation:
+    users = await _user_ids(1000)
+    slots = await _sample_slots(rng, 500)
+    rng.shuffle(slots)
+
+    async def browse(bench: BenchClient, index: int) -> None:
+        user = bench.auth(users[index % len(users)])
+        slot = slots[index % len(slots)]
+        date_from = slot.date.isoformat()
+        date_to = (slot.date + timedelta(days=6)).isoformat()
+
+        await bench.call("get_services", "GET", "/services", headers=user)
+        await bench.call(
+            "get_service", "GET", f"/services/{slot.service_id}", headers=user
+        )
+        await bench.call(
+            "get_service_slots",
+            "GET",
+            f"/services/{slot.service_id}/slots",
+            params={"date": date_from},
+            headers=user,
+        )
+        await bench.call(
+            "get_service_availability",
+            "GET",
+            f"/services/{slot.service_id}/availability",
+            params={"from": date_from, "to": date_to},
+            headers=user,
+        )
+        await bench.call("get_my_bookings", "GET", "/bookings/mine", headers=user)
+
+    return browse
+
+
+async def setup_login(rng: random.Random) -> Operation:
+    emails = await _user_emails(1000)
+
+    async def login(bench: BenchClient, index: int) -> None:
+        await bench.call(
+            "login",
+            "POST",
+            "/auth/login",
+            json={"email": emails[index % len(emails)], "password": DATASET_PASSWORD},
+        )
+
+    return login
+
+
+async def setup_flash_sale(rng: random.Random) -> Operation:
+    # Many distinct users racing for a handful of slots
+    users = await _user_ids(20000)
+    slots = await _open_slots(3)
+
+    async def flash_sale(bench: BenchClient, index: int) -> None:
+        await bench.call(
+            "create_booking",
+            "POST",
+            "/bookings",
+            json=_booking_body(slots[index % len(slots)]),
+            headers=bench.auth(users[index % len(users)]),
+            expected=BOOKING_RACE_STATUSES,
+        )
+
+    return flash_sale
+
+
+async def setup_cancellation_churn(rng: random.Random) -> Operation:
+    users = await _user_ids(1000)
+    slots = await _open_slots(200)
+    rng.shuffle(slots)
+
+    async def churn(bench: BenchClient, index: int) -> None:
+        user = bench.auth(users[index % len(users)])
+        response = await bench.call(
+            "create_booking",
+            "POST",
+            "/bookings",
+            json=_booking_body(slots[index % len(slots)]),
+            headers=user,
+            expected=BOOKING_RACE_STATUSES,
+        )
+        if response is not None and response.status_code == 201:
+            booking_id = response.json()["booking_id"]
+            await bench.call(
+                "cancel_booking", "DELETE", f"/bookings/{booking_id}", headers=user
+            )
+
+    return churn
+
+
+async def setup_admin_export(rng: random.Random) -> Operation:
+    # Any user is an admin unless ADMIN_EMAILS is set (local / mock)
+    (admin_id,) = await _user_ids(1)
+    slots = await _sample_slots(rng, 100)
+    rng.shuffle(slots)
+
+    async def admin_export(bench: BenchClient, index: int) -> None:
+        admin = bench.auth(admin_id)
+        # Follow a few pages of the admin listing
+        cursor = None
+        for _ in range(3):
+            params = {"limit": 50}
+            if cursor:
+                params["cursor"] = cursor
+            response = await bench.call(
+                "get_all_bookings",
+                "GET",
+                "/admin/bookings",
+                params=params,
+                headers=admin,
+            )
+            if response is None or response.status_code != 200:
+                break
+            cursor = response.json()["next_cursor"]
+            if not cursor:
+                break
+
+        # Export a week of bookings and read the whole stream
+        day = slots[index % len(slots)].date
+        await bench.call(
+            "export_bookings",
+            "GET",
+            "/admin/bookings/export",
+            params={
+                "format": "ndjson",
+                "date_from": day.isoformat(),
+                "date_to": (day + timedelta(days=6)).isoformat(),
+            },
+            headers=admin,
+        )
+
+    return admin_export
+
+
+SCENARIOS = {
+    "browse": Scenario("services, slots, availability and my bookings", setup_browse),
+    "login": Scenario("password login (bcrypt)", setup_login),
+    "flash-sale": Scenario(
+        "concurrent bookings racing for three slots", setup_flash_sale
+    ),
+    "cancellation-churn": Scenario(
+        "book and immediately cancel", setup_cancellation_churn
+    ),
+    "admin-export": Scenario(
+        "admin listing pages and a week of NDJSON export", setup_admin_export
+    ),
+}
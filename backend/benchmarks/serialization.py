@@ -0,0 +1,179 @@
+"""
+List response serialization benchmark
+
+Measures the per-row cost of turning booking list rows into a response body,
+without a database or HTTP round trip:
+
+- ``pydantic``: the previous path. Rows carry date/time objects, each one is
+  formatted with strftime into a BookingDetail, and FastAPI validates the
+  page against the response_model again before JSONResponse renders it.
+- ``orjson``: the current path. Rows arrive with date/time already formatted
+  by the query (to_char), are converted with ``_asdict()`` and rendered by
+  ORJSONResponse without validation.
+
+Usage:
+    python -m benchmarks.serialization --rows 50 --rows 200 --rows 1000
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time as timer
+from datetime import date, time, timedelta
+from pathlib import Path
+from typing import NamedTuple
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_model_field
+from app.models.models import BookingStatus
+from app.schemas.schemas import BookingDetail, BookingPage
+from benchmarks.results import write_results
+
+
+class RawBookingRow(NamedTuple):
+    id: int
+    service_id: int
+    service_name: str
+    date: date
+    start_time: time
+    status: BookingStatus
+
+
+class BookingRow(NamedTuple):
+    id: int
+    service_id: int
+    service_name: str
+    date: str
+    start_time: str
+    status: BookingStatus
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="List serialization benchmark")
+    parser.add_argument(
+        "--rows",
+        type=int,
+        action="append",
+        help="rows per page (repeatable, default: 50, 200, 1000)",
+    )
+    parser.add_argument("--repeat", type=int, default=200, help="pages per size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="JSON result path")
+    return parser.parse_args()
+
+
+def make_rows(count: int, rng: random.Random) -> list[RawBookingRow]:
+    start = date(2025, 1, 1)
+    return [
+        RawBookingRow(
+            index + 1,
+            rng.randint(1, 20),
+            f"Service {rng.randint(1, 20)}",
+            start + timedelta(days=rng.randint(0, 89)),
+            time(rng.randint(7, 20), rng.choice((0, 30))),
+            rng.choice(list(BookingStatus)),
+        )
+        for index in range(count)
+    ]
+
+
+def preformat(rows: list[RawBookingRow]) -> list[BookingRow]:
+    """What the query now returns (formatting happens in Postgres)"""
+    return [
+        BookingRow(
+            row.id,
+            row.service_id,
+            row.service_name,
+            row.date.strftime("%Y-%m-%d"),
+            row.start_time.strftime("%H:%M"),
+            row.status,
+        )
+        for row in rows
+    ]
+
+
+PAGE_FIELD = create_model_field("response", BookingPage, mode="serialization")
+
+
+async def render_pydantic(rows: list[RawBookingRow]) -> bytes:
+    items = [
+        BookingDetail(
+            id=row.id,
+            service_id=row.service_id,
+            service_name=row.service_name,
+            date=row.date.strftime("%Y-%m-%d"),
+            start_time=row.start_time.strftime("%H:%M"),
+            status=row.status.value,
+        )
+        for row in rows
+    ]
+    page = BookingPage(items=items, next_cursor=None)
+    content = await serialize_response(field=PAGE_FIELD, response_content=page)
+    return JSONResponse(content).body
+
+
+async def render_orjson(rows: list[BookingRow]) -> bytes:
+    return ORJSONResponse(
+        {"items": [row._asdict() for row in rows], "next_cursor": None}
+    ).body
+
+
+async def measure(render, rows: list, repeat: int) -> dict:
+    """Median/min µs per row over `repeat` renders of the same page"""
+    await render(rows)  # warm up validators and caches
+    samples = []
+    for _ in range(repeat):
+        started = timer.perf_counter()
+        await render(rows)
+        samples.append((timer.perf_counter() - started) * 1_000_000 / len(rows))
+    return {
+        "us_per_row_median": round(statistics.median(samples), 3),
+        "us_per_row_min": round(min(samples), 3),
+    }
+
+
+async def main(args) -> dict:
+    rng = random.Random(args.seed)
+    results = {}
+    for count in args.rows or [50, 200, 1000]:
+        raw = make_rows(count, rng)
+        formatted = preformat(raw)
+
+        old_body = await render_pydantic(raw)
+        new_body = await render_orjson(formatted)
+        # Both paths must produce the same document
+        assert json.loads(old_body) == json.loads(new_body)
+
+        before = await measure(render_pydantic, raw, args.repeat)
+        after = await measure(render_orjson, formatted, args.repeat)
+        results[str(count)] = {
+            "pydantic": before,
+            "orjson": after,
+            "speedup": round(
+                before["us_per_row_median"] / after["us_per_row_median"], 2
+            ),
+        }
+    return results
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    results = asyncio.run(main(args))
+
+    print(f"  {'rows':>6}{'pydantic µs/row':>18}{'orjson µs/row':>16}{'speedup':>10}")
+    for count, result in results.items():
+        print(
+            f"  {count:>6}{result['pydantic']['us_per_row_median']:>18.3f}"
+            f"{result['orjson']['us_per_row_median']:>16.3f}"
+            f"{result['speedup']:>9.2f}x"
+        )
+
+    output = write_results(
+        {"serialization": results},
+        {"repeat": args.repeat, "seed": args.seed},
+        args.output,
+        "serialization-",
+    )
+    print(f"\nResults written to {output}")
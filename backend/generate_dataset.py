@@ -0,0 +1,342 @@
+"""
+Synthetic dataset generator for benchmarking the yoga reservation system
+
+Builds users, services, months of slots and bookings from a seed and loads
+them with COPY FROM STDIN in streamed chunks. The same arguments always
+produce the same rows, so benchmark runs are comparable across commits.
+
+Usage:
+    python generate_dataset.py --users 50000 --bookings 2000000 --truncate
+"""
+
+import argparse
+import io
+import random
+import time as timer
+from datetime import date, datetime, time, timedelta
+from passlib.hash import bcrypt
+from app.core.config import settings
+from app.db.database import get_engine
+
+TABLES = ["bookings", "slots", "schedule_templates", "services", "users"]
+
+SERVICE_STYLES = [
+    ("ヨガ基礎", 60),
+    ("パワーヨガ", 75),
+    ("リラックスヨガ", 60),
+    ("モーニングヨガ", 45),
+    ("ホットヨガ", 60),
+    ("陰ヨガ", 75),
+    ("アシュタンガ", 90),
+    ("マタニティヨガ", 45),
+]
+
+START_TIMES = [time(hour, 0) for hour in (7, 9, 11, 14, 16, 18, 20)]
+CAPACITIES = [5, 8, 10, 12, 15, 20]
+
+# All generated users share this password
+DEFAULT_PASSWORD = "password123"
+BCRYPT_SALT_CHARS = "./ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--services", type=int, default=20)
+    parser.add_argument("--days", type=int, default=90, help="days of slots")
+    parser.add_argument(
+        "--start-date",
+        type=date.fromisoformat,
+        default=date(2025, 1, 6),
+        help="first slot date (fixed by default for reproducibility)",
+    )
+    parser.add_argument("--bookings", type=int, default=1000000)
+    parser.add_argument(
+        "--cancel-rate",
+        type=float,
+        default=0.15,
+        help="share of bookings that end up cancelled",
+    )
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument(
+        "--truncate",
+        action="store_true",
+        help="empty existing tables before loading",
+    )
+    return parser.parse_args(argv)
+
+
+def copy_rows(cursor, table, columns, rows, chunk_size):
+    """Stream rows into a table with COPY FROM STDIN, one buffer per chunk"""
+    sql = f"COPY yoga_reserve.{table} ({', '.join(columns)}) FROM STDIN"
+    buffer = io.StringIO()
+    total = 0
+    pending = 0
+
+    for row in rows:
+        buffer.write("\t".join(row))
+        buffer.write("\n")
+        pending += 1
+        if pending >= chunk_size:
+            buffer.seek(0)
+            cursor.copy_expert(sql, buffer)
+            total += pending
+            pending = 0
+            buffer.seek(0)
+            buffer.truncate()
+
+    if pending:
+        buffer.seek(0)
+        cursor.copy_expert(sql, buffer)
+        total += pending
+
+    return total
+
+
+def password_hash(rng):
+    salt = "".join(rng.choice(BCRYPT_SALT_CHARS) for _ in range(21)) + "e"
+    return bcrypt.using(rounds=settings.BCRYPT_ROUNDS, salt=salt).hash(DEFAULT_PASSWORD)
+
+
+def generate_users(args, created_at, hashed_password):
+    for user_id in range(1, args.users + 1):
+        yield (
+            str(user_id),
+            f"ユーザー{user_id}",
+            f"user{user_id}@example.com",
+            hashed_password,
+            created_at,
+        )
+
+
+def generate_services(args, rng, created_at):
+    for service_id in range(1, args.services + 1):
+        name, duration = SERVICE_STYLES[(service_id - 1) % len(SERVICE_STYLES)]
+        if service_id > len(SERVICE_STYLES):
+            name = f"{name} {(service_id - 1) // len(SERVICE_STYLES) + 1}"
+        yield (
+            str(service_id),
+            name,
+            f"{name}のクラス",
+            str(duration + rng.choice((0, 0, 15))),
+            created_at,
+        )
+
+
+def build_slots(args, rng):
+    """Plan slots as (service_id, date, start_time, capacity, weight) tuples"""
+    # Each service keeps a fixed weekly timetable, like a real studio
+    timetables = []
+    for _ in range(args.services):
+        times = sorted(rng.sample(START_TIMES, rng.randint(2, 5)))
+        weekdays = sorted(rng.sample(range(7), rng.randint(4, 7)))
+        timetables.append((times, weekdays, rng.choice(CAPACITIES)))
+
+    slots = []
+    for day_offset in range(args.days):
+        slot_date = args.start_date + timedelta(days=day_offset)
+        for service_index, (times, weekdays, capacity) in enumerate(timetables):
+            if slot_date.weekday() not in weekdays:
+                continue
+            for start_time in times:
+                # Evening and weekend classes are the popular ones
+                weight = 1.0
+                if start_time.hour >= 18:
+                    weight += 1.5
+                if slot_date.weekday() >= 5:
+                    weight += 1.0
+                slots.append(
+                    (service_index + 1, slot_date, start_time, capacity, weight)
+                )
+    return slots
+
+
+def generate_bookings(args, rng, slots, reserved):
+    """Yield booking rows and count confirmed bookings per slot in ``reserved``
+
+    A booking is confirmed only while the slot has room and the user does not
+    already hold a confirmed booking for it, so slots.reserved never exceeds
+    capacity and matches the confirmed rows exactly.
+    """
+    weights = []
+    cumulative = 0.0
+    for slot in slots:
+        cumulative += slot[4]
+        weights.append(cumulative)
+
+    slot_ids = range(len(slots))
+    holders = [set() for _ in slots]
+
+    for booking_id in range(1, args.bookings + 1):
+        slot_index = rng.choices(slot_ids, cum_weights=weights)[0]
+        service_id, slot_date, start_time, capacity, _ = slots[slot_index]
+        user_id = rng.randint(1, args.users)
+
+        status = "confirmed"
+        if (
+            rng.random() < args.cancel_rate
+            or reserved[slot_index] >= capacity
+            or user_id in holders[slot_index]
+        ):
+            status = "cancelled"
+        else:
+            reserved[slot_index] += 1
+            holders[slot_index].add(user_id)
+
+        booked_at = datetime.combine(slot_date, start_time) - timedelta(
+            minutes=rng.randint(30, 60 * 24 * 30)
+        )
+        updated_at = booked_at
+        if status == "cancelled":
+            updated_at += timedelta(minutes=rng.randint(1, 60 * 24))
+
+        yield (
+            str(booking_id),
+            str(user_id),
+            str(service_id),
+            str(slot_index + 1),
+            slot_date.isoformat(),
+            start_time.isoformat(),
+            status,
+            booked_at.isoformat(sep=" "),
+            updated_at.isoformat(sep=" "),
+        )
+
+
+def dataset_created_at(args) -> str:
+    """created_at of users, services and slots: a year before the first slot"""
+    return datetime.combine(
+        args.start_date - timedelta(days=365), time(0, 0)
+    ).isoformat(sep=" ")
+
+
+def generate_dataset(args):
+    rng = random.Random(args.seed)
+    created_at = dataset_created_at(args)
+
+    connection = get_engine().raw_connection()
+    try:
+        cursor = connection.cursor()
+
+        # Check if data already exists
+        cursor.execute("SELECT count(*) FROM yoga_reserve.users")
+        existing_users = cursor.fetchone()[0]
+        if existing_users and not args.truncate:
+            print(f"Data already exists ({existing_users} users found)")
+            print("Re-run with --truncate to replace it")
+            return
+
+        if args.truncate:
+            tables = ", ".join(f"yoga_reserve.{table}" for table in TABLES)
+            cursor.execute(f"TRUNCATE {tables} RESTART IDENTITY CASCADE")
+
+        started = timer.perf_counter()
+
+        count = copy_rows(
+            cursor,
+            "users",
+            ["id", "name", "email", "hashed_password", "created_at"],
+            generate_users(args, created_at, password_hash(rng)),
+            args.chunk_size,
+        )
+        print(f"Created {count} users (password: {DEFAULT_PASSWORD})")
+
+        count = copy_rows(
+            cursor,
+            "services",
+            ["id", "name", "description", "duration", "created_at"],
+            generate_services(args, rng, created_at),
+            args.chunk_size,
+        )
+        print(f"Created {count} services")
+
+        slots = build_slots(args, rng)
+        count = copy_rows(
+            cursor,
+            "slots",
+            [
+                "id",
+                "service_id",
+                "date",
+                "start_time",
+                "capacity",
+                "reserved",
+                "created_at",
+            ],
+            (
+                (
+                    str(slot_id),
+                    str(service_id),
+                    slot_date.isoformat(),
+                    start_time.isoformat(),
+                    str(capacity),
+                    "0",
+                    created_at,
+                )
+                for slot_id, (service_id, slot_date, start_time, capacity, _) in (
+                    enumerate(slots, start=1)
+                )
+            ),
+            args.chunk_size,
+        )
+        print(f"Created {count} time slots")
+
+        reserved = [0] * len(slots)
+        count = copy_rows(
+            cursor,
+            "bookings",
+            [
+                "id",
+                "user_id",
+                "service_id",
+                "slot_id",
+                "date",
+                "start_time",
+                "status",
+                "created_at",
+                "updated_at",
+            ],
+            generate_bookings(args, rng, slots, reserved),
+            args.chunk_size,
+        )
+        print(f"Created {count} bookings ({sum(reserved)} confirmed)")
+
+        # Write the confirmed counts back in one statement
+        cursor.execute(
+            """
+            UPDATE yoga_reserve.slots AS s
+            SET reserved = c.reserved
+            FROM unnest(%s::int[], %s::int[]) AS c(id, reserved)
+            WHERE s.id = c.id AND c.reserved > 0
+            """,
+            (list(range(1, len(slots) + 1)), reserved),
+        )
+
+        # Explicit ids bypass the sequences, so move them past the loaded rows
+        for table in ["users", "services", "slots", "bookings"]:
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('yoga_reserve.{table}', 'id'), "
+                f"(SELECT coalesce(max(id), 0) + 1 FROM yoga_reserve.{table}), false)"
+            )
+
+        connection.commit()
+
+        # Refresh planner statistics so benchmarks see realistic plans
+        connection.set_session(autocommit=True)
+        for table in ["users", "services", "slots", "bookings"]:
+            cursor.execute(f"ANALYZE yoga_reserve.{table}")
+
+        elapsed = timer.perf_counter() - started
+        print(f"Dataset generation completed in {elapsed:.1f}s (seed={args.seed})")
+
+    except Exception as e:
+        print(f"Error generating dataset: {e}")
+        connection.rollback()
+        raise
+    finally:
+        connection.close()
+
+
+if __name__ == "__main__":
+    generate_dataset(parse_args())
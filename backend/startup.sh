@@ -2,33 +2,17 @@
 
 # Azure Web Apps startup script for FastAPI application
 # This script runs database migrations and starts the uvicorn server
-# Version: 1.0
+# Version: 1.1
 
 echo "Starting application startup script..."
 
-# Run database migrations
-echo "Running database migrations..."
-alembic upgrade head
+# Run database migrations (skipped when the schema is already at head)
+echo "Checking database migrations..."
+python -m app.db.migrate
 
-# Check if sample data needs to be inserted
-echo "Checking for sample data..."
-python -c "
-from app.db.database import SessionLocal
-from app.models.models import Service
-
-db = SessionLocal()
-try:
-    count = db.query(Service).count()
-    if count == 0:
-        print('No data found, inserting sample data...')
-        import subprocess
-        subprocess.run(['python', 'create_sample_data.py'])
-    else:
-        print(f'Found {count} services, skipping sample data insertion')
-finally:
-    db.close()
-"
+# Sample data is inserted by the application on startup when no services exist
+# (SEED_SAMPLE_DATA), so no separate interpreter is needed here.
 
 # Start the application
 echo "Starting uvicorn server..."
-uvicorn app.main:app --host 0.0.0.0 --port 8000
+exec uvicorn app.main:app --host 0.0.0.0 --port 8000
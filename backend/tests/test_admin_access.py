@@ -0,0 +1,47 @@
+"""/admin/* requires a logged-in user listed in ADMIN_EMAILS (any user locally)"""
+
+import pytest
+from app.core.config import get_settings
+
+settings = get_settings()
+
+ADMIN_REQUESTS = [
+    ("GET", "/admin/bookings"),
+    ("GET", "/admin/bookings/export"),
+    ("GET", "/admin/schedule-templates"),
+    ("POST", "/admin/schedule-templates"),
+    ("POST", "/admin/schedule-templates/1/generate"),
+    ("POST", "/admin/schedule-templates/generate?from=2030-01-01&to=2030-01-31"),
+]
+
+
+@pytest.mark.parametrize("method,url", ADMIN_REQUESTS)
+def test_admin_requires_login(app_client, method, url):
+    assert app_client.request(method, url).status_code in (401, 403)
+
+
+@pytest.mark.parametrize("method,url", ADMIN_REQUESTS)
+def test_admin_rejects_users_not_in_admin_emails(
+    client, seed, monkeypatch, method, url
+):
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", ["admin@example.com"])
+    headers = seed.headers(seed.user())
+    response = client.request(method, url, headers=headers)
+    assert response.status_code == 403
+
+
+def test_admin_allows_listed_users(client, seed, monkeypatch):
+    admin = seed.user("admin")
+    monkeypatch.setattr(settings, "ADMIN_EMAILS", [admin.email])
+    response = client.get("/admin/bookings", headers=seed.headers(admin))
+    assert response.status_code == 200
+
+
+# azure always uses the database backend
+@pytest.mark.postgres
+def test_admin_hidden_from_everyone_in_azure_without_admin_emails(
+    client, seed, monkeypatch
+):
+    monkeypatch.setattr(settings, "ENVIRONMENT", "azure")
+    response = client.get("/admin/bookings", headers=seed.headers(seed.user()))
+    assert response.status_code == 403
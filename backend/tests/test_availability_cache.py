@@ -0,0 +1,101 @@
+"""The slot availability cache loads each key once and drops it on NOTIFY"""
+
+import asyncio
+from datetime import date
+import pytest
+from app.cache.availability import AvailabilityCache
+from app.db.database import get_listen_dsn
+from app.db.notify import SLOT_CHANNEL, NotificationListener
+
+DAY = date(2030, 1, 7)
+REQUESTS = 10
+
+
+def test_concurrent_misses_load_once():
+    cache = AvailabilityCache(ttl_seconds=60, max_entries=10)
+    loads = 0
+
+    async def loader():
+        nonlocal loads
+        loads += 1
+        # Stay in flight until every request has asked for the key
+        await asyncio.sleep(0.05)
+        return ["slot"]
+
+    async def scenario():
+        return await asyncio.gather(
+            *(cache.get_or_load((1, DAY), loader) for _ in range(REQUESTS))
+        )
+
+    assert asyncio.run(scenario()) == [["slot"]] * REQUESTS
+    assert loads == 1
+    assert cache.misses == 1
+    assert cache.coalesced == REQUESTS - 1
+
+
+def test_invalidation_during_load_is_not_cached():
+    cache = AvailabilityCache(ttl_seconds=60, max_entries=10)
+
+    async def scenario():
+        async def loader():
+            cache.invalidate((1, DAY))
+            return "stale"
+
+        assert await cache.get_or_load((1, DAY), loader) == "stale"
+
+        async def reload():
+            return "fresh"
+
+        return await cache.get_or_load((1, DAY), reload)
+
+    assert asyncio.run(scenario()) == "fresh"
+
+
+async def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+@pytest.mark.postgres
+def test_booking_on_one_worker_invalidates_another_workers_cache(client, seed):
+    """A second cache with its own LISTEN connection stands in for another worker"""
+    service = seed.service()
+    (slot,) = seed.slots(service, DAY, 1)
+    headers = seed.headers(seed.user())
+    key = (service.id, DAY)
+
+    other_worker = AvailabilityCache(ttl_seconds=60, max_entries=10)
+    other_listener = NotificationListener(get_listen_dsn, retry_seconds=0.1)
+    other_listener.subscribe(SLOT_CHANNEL, other_worker.handle_notification)
+
+    async def cached():
+        return "cached"
+
+    async def scenario():
+        other_listener.start()
+        try:
+            await _wait_for(lambda: other_listener.connected)
+            await other_worker.get_or_load(key, cached)
+            assert other_worker.stats()["size"] == 1
+
+            response = await asyncio.to_thread(
+                client.post,
+                "/bookings",
+                json={
+                    "service_id": service.id,
+                    "slot_id": slot.id,
+                    "date": DAY.isoformat(),
+                    "start_time": "06:00",
+                },
+                headers=headers,
+            )
+            assert response.status_code == 201
+
+            await _wait_for(lambda: other_worker.stats()["size"] == 0)
+        finally:
+            await other_listener.stop()
+
+    asyncio.run(scenario())
+    assert other_worker.invalidations == 1
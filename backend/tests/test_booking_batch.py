@@ -0,0 +1,88 @@
+"""POST /bookings/batch: all_or_nothing rolls everything back, best_effort books what it can"""
+
+from datetime import date
+
+DAY = date(2030, 1, 7)
+
+
+def _seed_day_with_a_full_slot(seed):
+    """Three 1-seat slots; the middle one is already taken"""
+    service = seed.service()
+    slots = seed.slots(service, DAY, 3, capacity=1)
+    seed.booking(seed.user("holder"), slots[1])
+    return service, slots
+
+
+def _batch(service, slots, mode: str) -> dict:
+    return {
+        "mode": mode,
+        "items": [
+            {
+                "service_id": service.id,
+                "date": DAY.isoformat(),
+                "start_time": slot.start_time.strftime("%H:%M"),
+            }
+            for slot in slots
+        ],
+    }
+
+
+def _reserved(client, seed, service, user) -> list[int]:
+    response = client.get(
+        f"/services/{service.id}/slots",
+        params={"date": DAY.isoformat()},
+        headers=seed.headers(user),
+    )
+    return [slot["reserved"] for slot in response.json()["slots"]]
+
+
+def test_all_or_nothing_fails_whole_batch_on_one_full_slot(client, seed):
+    service, slots = _seed_day_with_a_full_slot(seed)
+    user = seed.user()
+
+    response = client.post(
+        "/bookings/batch",
+        json=_batch(service, slots, "all_or_nothing"),
+        headers=seed.headers(user),
+    )
+    assert response.status_code == 200
+    body = response.json()
+    assert body["confirmed"] == 0
+    assert [item["status"] for item in body["results"]] == ["failed"] * 3
+    assert body["results"][1]["error"] == "Slot is full"
+
+    assert _reserved(client, seed, service, user) == [0, 1, 0]
+    assert (
+        client.get("/bookings/mine", headers=seed.headers(user)).json()["items"] == []
+    )
+
+
+def test_best_effort_reports_each_item(client, seed):
+    service, slots = _seed_day_with_a_full_slot(seed)
+    user = seed.user()
+    batch = _batch(service, slots, "best_effort")
+    batch["items"].append({**batch["items"][0], "start_time": "23:00"})
+
+    response = client.post("/bookings/batch", json=batch, headers=seed.headers(user))
+    assert response.status_code == 200
+    body = response.json()
+    assert body["confirmed"] == 2
+    results = body["results"]
+    assert [item["status"] for item in results] == [
+        "confirmed",
+        "failed",
+        "confirmed",
+        "failed",
+    ]
+    assert [item["error"] for item in results] == [
+        None,
+        "Slot is full",
+        None,
+        "Slot not found",
+    ]
+
+    assert _reserved(client, seed, service, user) == [1, 1, 1]
+    mine = client.get("/bookings/mine", headers=seed.headers(user)).json()["items"]
+    assert sorted(item["id"] for item in mine) == sorted(
+        item["booking_id"] for item in results if item["booking_id"] is not None
+    )
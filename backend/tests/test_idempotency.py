@@ -0,0 +1,63 @@
+"""A retried POST /bookings with the same Idempotency-Key must not book twice"""
+
+from datetime import date
+
+DAY = date(2030, 1, 7)
+
+
+def _booking_request(service, slot) -> dict:
+    return {
+        "service_id": service.id,
+        "slot_id": slot.id,
+        "date": DAY.isoformat(),
+        "start_time": slot.start_time.strftime("%H:%M"),
+    }
+
+
+def test_replay_returns_stored_response_without_booking_again(client, seed):
+    user = seed.user()
+    service = seed.service()
+    (slot,) = seed.slots(service, DAY, 1)
+    headers = {**seed.headers(user), "Idempotency-Key": "retry-1"}
+
+    first = client.post(
+        "/bookings", json=_booking_request(service, slot), headers=headers
+    )
+    assert first.status_code == 201
+    assert "Idempotent-Replayed" not in first.headers
+
+    replay = client.post(
+        "/bookings", json=_booking_request(service, slot), headers=headers
+    )
+    assert replay.status_code == 201
+    assert replay.headers["Idempotent-Replayed"] == "true"
+    assert replay.json() == first.json()
+
+    page = client.get("/bookings/mine", headers=seed.headers(user)).json()
+    assert [item["id"] for item in page["items"]] == [first.json()["booking_id"]]
+    slots = client.get(
+        f"/services/{service.id}/slots",
+        params={"date": DAY.isoformat()},
+        headers=seed.headers(user),
+    ).json()["slots"]
+    assert slots[0]["reserved"] == 1
+
+
+def test_reusing_a_key_for_a_different_request_is_rejected(client, seed):
+    user = seed.user()
+    service = seed.service()
+    first_slot, second_slot = seed.slots(service, DAY, 2)
+    headers = {**seed.headers(user), "Idempotency-Key": "retry-2"}
+
+    response = client.post(
+        "/bookings", json=_booking_request(service, first_slot), headers=headers
+    )
+    assert response.status_code == 201
+
+    response = client.post(
+        "/bookings", json=_booking_request(service, second_slot), headers=headers
+    )
+    assert response.status_code == 422
+
+    page = client.get("/bookings/mine", headers=seed.headers(user)).json()
+    assert len(page["items"]) == 1
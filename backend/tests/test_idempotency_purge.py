@@ -0,0 +1,49 @@
+"""Expired Idempotency-Key rows are purged in batches; live ones are kept"""
+
+import asyncio
+from datetime import datetime, timedelta
+import pytest
+from app.core.config import get_settings
+from app.db.purge import purge_expired_idempotency_keys
+from app.models.models import IdempotencyKey
+
+pytestmark = pytest.mark.postgres
+
+settings = get_settings()
+
+
+def _keys(user, ages: dict[str, timedelta]) -> list[IdempotencyKey]:
+    now = datetime.utcnow()
+    return [
+        IdempotencyKey(
+            user_id=user.id,
+            key=key,
+            request_hash="0" * 64,
+            status_code=201,
+            response={},
+            created_at=now - age,
+        )
+        for key, age in ages.items()
+    ]
+
+
+def test_purge_removes_only_expired_keys(db, seed):
+    user = seed.user()
+    expired = timedelta(hours=settings.IDEMPOTENCY_KEY_TTL_HOURS, minutes=1)
+    db.add_all(
+        _keys(
+            user,
+            {
+                "old-1": expired,
+                "old-2": expired,
+                "old-3": expired * 2,
+                "fresh": timedelta(minutes=5),
+            },
+        )
+    )
+    db.commit()
+
+    # A batch smaller than the backlog must still purge everything
+    assert asyncio.run(purge_expired_idempotency_keys(batch_size=2)) == 3
+    assert [key for (key,) in db.query(IdempotencyKey.key)] == ["fresh"]
+    assert asyncio.run(purge_expired_idempotency_keys()) == 0
@@ -0,0 +1,140 @@
+"""Every statement issued by the booking hot paths must be able to use an index
+
+Statements are captured while the endpoints run against the migrated schema,
+then replayed through EXPLAIN with sequential scans disabled: the planner
+still picks a Seq Scan only when no index can serve the statement. Paginated
+listings must also read rows in index order instead of sorting them.
+"""
+
+import asyncio
+from datetime import date, datetime
+import pytest
+from sqlalchemy import event
+from app.db.database import get_async_engine
+from app.db.purge import purge_expired_idempotency_keys
+from app.models.models import IdempotencyKey
+
+pytestmark = pytest.mark.postgres
+
+DAY = date(2030, 1, 7)
+STATEMENT_PREFIXES = ("SELECT", "INSERT", "UPDATE", "DELETE", "WITH")
+
+
+@pytest.fixture
+def statements(database):
+    """(statement, parameters) of every query the app runs during the test"""
+    captured = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(STATEMENT_PREFIXES):
+            captured.append((statement, parameters))
+
+    sync_engine = get_async_engine().sync_engine
+    event.listen(sync_engine, "before_cursor_execute", record)
+    yield captured
+    event.remove(sync_engine, "before_cursor_execute", record)
+
+
+async def _explain(statements) -> list[tuple[str, str]]:
+    async with get_async_engine().connect() as conn:
+        await conn.exec_driver_sql("SET enable_seqscan = off")
+        plans = []
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+            plans.append((statement, "\n".join(row[0] for row in result)))
+        return plans
+
+
+def assert_index_scans(
+    statements, tables: tuple[str, ...], ordered: bool = False
+) -> None:
+    checked = [
+        (statement, parameters)
+        for statement, parameters in statements
+        if any(f"yoga_reserve.{table}" in statement for table in tables)
+    ]
+    assert checked, "no statements touched " + ", ".join(tables)
+    for statement, plan in asyncio.run(_explain(checked)):
+        assert "Seq Scan" not in plan, f"{statement}\n{plan}"
+        if ordered:
+            assert "Sort Key" not in plan, f"{statement}\n{plan}"
+
+
+def test_slot_listing_uses_indexes(client, seed, statements):
+    service = seed.service()
+    seed.slots(service, DAY, 4)
+    headers = seed.headers(seed.user())
+    client.get("/services", headers=headers)
+    statements.clear()
+
+    response = client.get(
+        f"/services/{service.id}/slots",
+        params={"date": DAY.isoformat()},
+        headers=headers,
+    )
+    assert response.status_code == 200
+    assert_index_scans(statements, ("slots",), ordered=True)
+
+
+def test_booking_lifecycle_uses_indexes(client, seed, statements):
+    user = seed.user()
+    service = seed.service()
+    (slot,) = seed.slots(service, DAY, 1)
+    headers = seed.headers(user)
+    client.get("/services", headers=headers)
+    statements.clear()
+
+    response = client.post(
+        "/bookings",
+        json={
+            "service_id": service.id,
+            "slot_id": slot.id,
+            "date": DAY.isoformat(),
+            "start_time": "06:00",
+        },
+        headers={**headers, "Idempotency-Key": "index-usage"},
+    )
+    assert response.status_code == 201
+    booking_id = response.json()["booking_id"]
+    assert client.delete(f"/bookings/{booking_id}", headers=headers).status_code == 200
+    assert_index_scans(
+        statements, ("slots", "bookings", "idempotency_keys", "waitlist_entries")
+    )
+
+
+def test_booking_listings_use_indexes(client, seed, statements):
+    user = seed.user()
+    service = seed.service()
+    for slot in seed.slots(service, DAY, 3):
+        seed.booking(user, slot)
+    headers = seed.headers(user)
+
+    page = client.get("/bookings/mine", params={"limit": 2}, headers=headers).json()
+    client.get(
+        "/bookings/mine",
+        params={"cursor": page["next_cursor"], "date_from": DAY.isoformat()},
+        headers=headers,
+    )
+    page = client.get("/admin/bookings", params={"limit": 2}, headers=headers).json()
+    client.get(
+        "/admin/bookings", params={"cursor": page["next_cursor"]}, headers=headers
+    )
+    assert_index_scans(statements, ("bookings",), ordered=True)
+
+
+def test_idempotency_purge_uses_indexes(db, seed, statements):
+    user = seed.user()
+    db.add(
+        IdempotencyKey(
+            user_id=user.id,
+            key="expired",
+            request_hash="0" * 64,
+            status_code=201,
+            response={},
+            created_at=datetime(2000, 1, 1),
+        )
+    )
+    db.commit()
+
+    assert asyncio.run(purge_expired_idempotency_keys()) == 1
+    assert_index_scans(statements, ("idempotency_keys",))
@@ -0,0 +1,49 @@
+"""/internal/* is only reachable locally or with the internal token"""
+
+import pytest
+from app.core.config import get_settings
+from app.db.database import get_engine
+
+settings = get_settings()
+
+
+@pytest.fixture
+def internal_settings(monkeypatch):
+    def configure(environment: str, token: str = ""):
+        monkeypatch.setattr(settings, "ENVIRONMENT", environment)
+        monkeypatch.setattr(settings, "INTERNAL_API_TOKEN", token)
+
+    return configure
+
+
+def test_open_locally_without_token(app_client, internal_settings):
+    internal_settings("local")
+    assert app_client.get("/internal/token-cache").status_code == 200
+
+
+def test_hidden_in_azure_without_token(app_client, internal_settings):
+    internal_settings("azure")
+    assert app_client.get("/internal/token-cache").status_code == 404
+    assert app_client.post("/internal/service-catalog/invalidate").status_code == 404
+
+
+def test_token_required_when_configured(app_client, internal_settings):
+    internal_settings("local", token="s3cret")
+    assert app_client.get("/internal/token-cache").status_code == 403
+    response = app_client.get(
+        "/internal/token-cache", headers={"X-Internal-Token": "wrong"}
+    )
+    assert response.status_code == 403
+    response = app_client.get(
+        "/internal/token-cache", headers={"X-Internal-Token": "s3cret"}
+    )
+    assert response.status_code == 200
+
+
+def test_pool_stats_do_not_create_engines(app_client, internal_settings):
+    internal_settings("local")
+    created = get_engine.cache_info().currsize
+    response = app_client.get("/internal/pool")
+    assert response.status_code == 200
+    assert get_engine.cache_info().currsize == created
+    assert ("sync" in response.json()["pools"]) == bool(created)
@@ -0,0 +1,162 @@
+"""Exercise each budgeted route; the client fixture asserts its @query_budget
+
+Requests use fresh tokens and an unloaded service catalog, so the counts
+include the user lookup and catalog load a cold worker pays for. Lists are
+seeded with more rows than QUERY_REPEAT_THRESHOLD so per-row queries (N+1)
+show up as warnings. Against the in-memory backend only the responses are checked.
+"""
+
+from datetime import date
+
+DAY = date(2030, 1, 7)
+ROWS = 5
+
+
+def test_get_services(client, seed):
+    seed.service()
+    headers = seed.headers(seed.user())
+    services = client.get("/services", headers=headers).json()
+    assert (
+        client.get(f"/services/{services[0]['id']}", headers=headers).status_code == 200
+    )
+
+
+def test_get_service_slots(client, seed):
+    service = seed.service()
+    seed.slots(service, DAY, ROWS)
+    response = client.get(
+        f"/services/{service.id}/slots",
+        params={"date": DAY.isoformat()},
+        headers=seed.headers(seed.user()),
+    )
+    assert response.status_code == 200
+    assert len(response.json()["slots"]) == ROWS
+
+
+def test_get_service_availability(client, seed):
+    service = seed.service()
+    for offset in range(ROWS):
+        seed.slots(service, date(2030, 1, 7 + offset), 2)
+    response = client.get(
+        f"/services/{service.id}/availability",
+        params={"from": "2030-01-07", "to": "2030-01-13"},
+        headers=seed.headers(seed.user()),
+    )
+    assert response.status_code == 200
+    assert len(response.json()["days"]) == 7
+
+
+def test_get_my_bookings(client, seed):
+    user = seed.user()
+    service = seed.service()
+    for slot in seed.slots(service, DAY, ROWS):
+        seed.booking(user, slot)
+    response = client.get("/bookings/mine", headers=seed.headers(user))
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == ROWS
+
+
+def test_get_all_bookings(client, seed):
+    service = seed.service()
+    for slot in seed.slots(service, DAY, ROWS):
+        seed.booking(seed.user(), slot)
+    headers = seed.headers(seed.user("admin"))
+    response = client.get(
+        "/admin/bookings", params={"limit": ROWS - 1}, headers=headers
+    )
+    assert response.status_code == 200
+    page = response.json()
+    assert len(page["items"]) == ROWS - 1
+
+    response = client.get(
+        "/admin/bookings", params={"cursor": page["next_cursor"]}, headers=headers
+    )
+    assert len(response.json()["items"]) == 1
+
+
+def test_create_booking(client, seed):
+    service = seed.service()
+    (slot,) = seed.slots(service, DAY, 1)
+    response = client.post(
+        "/bookings",
+        json={
+            "service_id": service.id,
+            "slot_id": slot.id,
+            "date": DAY.isoformat(),
+            "start_time": "06:00",
+        },
+        headers={**seed.headers(seed.user()), "Idempotency-Key": "create-1"},
+    )
+    assert response.status_code == 201
+
+
+def test_create_booking_batch(client, seed):
+    service = seed.service()
+    slots = seed.slots(service, DAY, ROWS)
+    response = client.post(
+        "/bookings/batch",
+        json={
+            "items": [
+                {
+                    "service_id": service.id,
+                    "date": DAY.isoformat(),
+                    "start_time": slot.start_time.strftime("%H:%M"),
+                }
+                for slot in slots
+            ]
+        },
+        headers=seed.headers(seed.user()),
+    )
+    assert response.status_code == 200
+    assert response.json()["confirmed"] == ROWS
+
+
+def test_cancel_booking(client, seed):
+    user = seed.user()
+    (slot,) = seed.slots(seed.service(), DAY, 1)
+    booking = seed.booking(user, slot)
+    response = client.delete(f"/bookings/{booking.id}", headers=seed.headers(user))
+    assert response.status_code == 200
+
+
+def test_cancel_booking_promotes_waitlist(client, seed):
+    user, waiting = seed.user(), seed.user()
+    service = seed.service()
+    (slot,) = seed.slots(service, DAY, 1, capacity=1)
+    booking = seed.booking(user, slot)
+
+    response = client.post(
+        "/waitlist",
+        json={"service_id": service.id, "date": DAY.isoformat(), "start_time": "06:00"},
+        headers=seed.headers(waiting),
+    )
+    assert response.status_code == 201
+
+    response = client.delete(f"/bookings/{booking.id}", headers=seed.headers(user))
+    assert response.status_code == 200
+    mine = client.get("/bookings/mine", headers=seed.headers(waiting)).json()
+    assert [item["status"] for item in mine["items"]] == ["confirmed"]
+
+
+def test_waitlist_listing_and_leave(client, seed):
+    holder, waiting = seed.user(), seed.user()
+    service = seed.service()
+    slots = seed.slots(service, DAY, ROWS, capacity=1)
+    headers = seed.headers(waiting)
+    for slot in slots:
+        seed.booking(holder, slot)
+        response = client.post(
+            "/waitlist",
+            json={
+                "service_id": service.id,
+                "date": DAY.isoformat(),
+                "start_time": slot.start_time.strftime("%H:%M"),
+            },
+            headers=headers,
+        )
+        assert response.status_code == 201
+
+    entries = client.get("/waitlist/mine", headers=headers).json()
+    assert len(entries) == ROWS
+    response = client.delete(f"/waitlist/{entries[0]['id']}", headers=headers)
+    assert response.status_code == 204
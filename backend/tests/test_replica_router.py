@@ -0,0 +1,61 @@
+"""Read-your-writes must hold on any worker, and replica lag must not hide a stall"""
+
+import asyncio
+import time
+from datetime import date
+import pytest
+from fastapi import Response
+from app.db.replica import LAST_WRITE_HEADER, REPLICA_LAG_SQL, ReplicaRouter
+
+DAY = date(2030, 1, 7)
+
+
+def _worker() -> ReplicaRouter:
+    """A router whose replica is up and caught up (no lag query is made)"""
+    router = ReplicaRouter(
+        lambda: object(),
+        max_lag_seconds=5,
+        lag_check_seconds=60,
+        retry_seconds=30,
+        sticky_seconds=10,
+        timeout_seconds=2,
+    )
+    router.lag_seconds = 0.0
+    router._lag_checked_at = time.monotonic()
+    return router
+
+
+def test_write_on_one_worker_keeps_reads_on_primary_on_another():
+    user_id = 1
+    writer, reader = _worker(), _worker()
+    response = Response()
+
+    writer.mark_write(user_id, response)
+    last_write = response.headers[LAST_WRITE_HEADER]
+
+    assert not asyncio.run(reader.use_replica(user_id, last_write))
+    assert asyncio.run(reader.use_replica(user_id))
+    assert asyncio.run(reader.use_replica(user_id, f"{time.time() - 60:.3f}"))
+    assert asyncio.run(reader.use_replica(user_id, "not-a-timestamp"))
+
+
+def test_booking_response_carries_last_write(client, seed):
+    service = seed.service()
+    (slot,) = seed.slots(service, DAY, 1)
+    response = client.post(
+        "/bookings",
+        json={
+            "service_id": service.id,
+            "slot_id": slot.id,
+            "date": DAY.isoformat(),
+            "start_time": "06:00",
+        },
+        headers=seed.headers(seed.user()),
+    )
+    assert response.status_code == 201
+    assert abs(float(response.headers[LAST_WRITE_HEADER]) - time.time()) < 60
+
+
+@pytest.mark.postgres
+def test_lag_query_reports_zero_on_a_primary(db):
+    assert db.execute(REPLICA_LAG_SQL).scalar() == 0
@@ -0,0 +1,39 @@
+"""The service catalog is cached per worker; a stale cache must not cause 404s"""
+
+from datetime import date
+
+DAY = date(2030, 1, 7)
+
+
+def test_service_added_by_another_worker_is_found(client, seed):
+    headers = seed.headers(seed.user())
+    assert client.get("/services", headers=headers).json() == []
+
+    # Inserted behind this worker's back: its catalog is still loaded and fresh
+    service = seed.service("Pilates")
+    (slot,) = seed.slots(service, DAY, 1)
+
+    response = client.get(f"/services/{service.id}", headers=headers)
+    assert response.status_code == 200
+    assert response.json()["name"] == "Pilates"
+
+    response = client.post(
+        "/bookings",
+        json={
+            "service_id": service.id,
+            "slot_id": slot.id,
+            "date": DAY.isoformat(),
+            "start_time": "06:00",
+        },
+        headers=headers,
+    )
+    assert response.status_code == 201
+
+    # The lookup also reloads the list on the next request
+    names = [item["name"] for item in client.get("/services", headers=headers).json()]
+    assert names == ["Pilates"]
+
+
+def test_unknown_service_is_still_not_found(client, seed):
+    headers = seed.headers(seed.user())
+    assert client.get("/services/999", headers=headers).status_code == 404
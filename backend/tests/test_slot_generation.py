@@ -0,0 +1,44 @@
+"""Generated slots are published like bookings, so no worker serves a stale day"""
+
+from datetime import date
+
+from app.core.availability_hub import availability_hub
+
+DAY = date(2030, 1, 7)  # a Monday
+
+
+def test_generated_slots_reach_cache_and_subscribers(client, seed):
+    service = seed.service()
+    seed.slots(service, DAY, 1)
+    headers = seed.headers(seed.user("admin"))
+
+    url = f"/services/{service.id}/slots?date={DAY.isoformat()}"
+    assert len(client.get(url, headers=headers).json()["slots"]) == 1
+
+    subscription = availability_hub.subscribe((service.id, DAY))
+    try:
+        template = client.post(
+            "/admin/schedule-templates",
+            json={
+                "service_id": service.id,
+                "weekdays": [0],
+                "start_times": ["06:00", "09:00", "18:00"],
+                "capacity": 12,
+                "valid_from": DAY.isoformat(),
+                "valid_to": DAY.isoformat(),
+            },
+            headers=headers,
+        ).json()
+        response = client.post(
+            f"/admin/schedule-templates/{template['id']}/generate", headers=headers
+        )
+        assert response.json() == {"requested": 3, "created": 2}
+
+        # One day-level change (no slot_id): subscribers re-send the snapshot
+        change = subscription.queue.get_nowait()
+        assert change == {"service_id": service.id, "date": DAY.isoformat()}
+        assert subscription.queue.empty()
+    finally:
+        availability_hub.unsubscribe(subscription)
+
+    assert len(client.get(url, headers=headers).json()["slots"]) == 3
@@ -0,0 +1,36 @@
+"""GET /services/{id}/slots must not issue more SQL as a day gains slots"""
+
+from datetime import date
+
+import pytest
+from app.core.query_budget import QUERY_COUNT_HEADER
+
+pytestmark = pytest.mark.postgres
+
+SLOTS = 4
+
+
+def test_slot_listing_query_count_is_independent_of_slot_count(client, seed):
+    user = seed.user()
+    service = seed.service()
+    few, many = date(2030, 1, 7), date(2030, 1, 8)
+    seed.slots(service, few, SLOTS)
+    seed.slots(service, many, SLOTS * 3)
+    headers = seed.headers(user)
+
+    # Load the service catalog and cache the token so both requests below
+    # only pay for the slot query itself
+    assert client.get("/services", headers=headers).status_code == 200
+
+    counts = {}
+    for day, expected in ((few, SLOTS), (many, SLOTS * 3)):
+        response = client.get(
+            f"/services/{service.id}/slots",
+            params={"date": day.isoformat()},
+            headers=headers,
+        )
+        assert response.status_code == 200
+        assert len(response.json()["slots"]) == expected
+        counts[day] = int(response.headers[QUERY_COUNT_HEADER])
+
+    assert counts[few] == counts[many] == 1
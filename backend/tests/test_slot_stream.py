@@ -0,0 +1,146 @@
+"""GET /services/{id}/slots/stream sends a snapshot, then a delta per change
+
+TestClient cannot read an endless response, so the stream is driven through
+the ASGI interface on the same event loop as the requests that change slots.
+"""
+
+import asyncio
+import json
+from datetime import date
+import httpx
+from app.main import app
+
+DAY = date(2030, 1, 7)
+
+
+class SlotStream:
+    """An open SSE request; next_event() returns (event, data) in order"""
+
+    def __init__(self, path: str, query: str, headers: dict):
+        self.scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "root_path": "",
+            "query_string": query.encode(),
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in headers.items()
+            ],
+            "client": ("testclient", 50000),
+            "server": ("testserver", 80),
+        }
+        self.messages: asyncio.Queue = asyncio.Queue()
+        self.closed = asyncio.Event()
+        self.requested = False
+        self.buffer = ""
+
+    async def _receive(self) -> dict:
+        if not self.requested:
+            self.requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await self.closed.wait()
+        return {"type": "http.disconnect"}
+
+    async def __aenter__(self):
+        self.task = asyncio.create_task(
+            app(self.scope, self._receive, self.messages.put)
+        )
+        start = await asyncio.wait_for(self.messages.get(), 5)
+        assert start["type"] == "http.response.start"
+        self.status = start["status"]
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.closed.set()
+        await asyncio.wait_for(self.task, 5)
+
+    async def next_event(self) -> tuple[str, dict]:
+        while "\n\n" not in self.buffer:
+            message = await asyncio.wait_for(self.messages.get(), 5)
+            self.buffer += message.get("body", b"").decode()
+        block, self.buffer = self.buffer.split("\n\n", 1)
+        fields = dict(line.split(": ", 1) for line in block.splitlines())
+        return fields["event"], json.loads(fields["data"])
+
+
+def _stream(service, headers) -> SlotStream:
+    return SlotStream(
+        f"/services/{service.id}/slots/stream", f"date={DAY.isoformat()}", headers
+    )
+
+
+def _client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://testserver"
+    )
+
+
+def test_snapshot_then_delta_after_booking(client, seed):
+    service = seed.service()
+    slots = seed.slots(service, DAY, 2, capacity=3)
+    headers = seed.headers(seed.user())
+
+    async def scenario():
+        async with _stream(service, headers) as stream, _client() as http:
+            assert stream.status == 200
+            event, snapshot = await stream.next_event()
+            assert event == "snapshot"
+            assert [slot["reserved"] for slot in snapshot["slots"]] == [0, 0]
+
+            response = await http.post(
+                "/bookings",
+                json={
+                    "service_id": service.id,
+                    "slot_id": slots[1].id,
+                    "date": DAY.isoformat(),
+                    "start_time": slots[1].start_time.strftime("%H:%M"),
+                },
+                headers=headers,
+            )
+            assert response.status_code == 201
+
+            assert await stream.next_event() == (
+                "delta",
+                {"slot_id": slots[1].id, "reserved": 1, "available": 2},
+            )
+
+    asyncio.run(scenario())
+
+
+def test_generated_slots_resend_snapshot(client, seed):
+    service = seed.service()
+    seed.slots(service, DAY, 1)
+    headers = seed.headers(seed.user("admin"))
+
+    async def scenario():
+        async with _stream(service, headers) as stream, _client() as http:
+            event, snapshot = await stream.next_event()
+            assert (event, len(snapshot["slots"])) == ("snapshot", 1)
+
+            template = await http.post(
+                "/admin/schedule-templates",
+                json={
+                    "service_id": service.id,
+                    "weekdays": [DAY.weekday()],
+                    "start_times": ["18:00"],
+                    "capacity": 10,
+                    "valid_from": DAY.isoformat(),
+                    "valid_to": DAY.isoformat(),
+                },
+                headers=headers,
+            )
+            response = await http.post(
+                f"/admin/schedule-templates/{template.json()['id']}/generate",
+                headers=headers,
+            )
+            assert response.json()["created"] == 1
+
+            event, snapshot = await stream.next_event()
+            assert (event, len(snapshot["slots"])) == ("snapshot", 2)
+
+    asyncio.run(scenario())
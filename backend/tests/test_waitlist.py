@@ -0,0 +1,53 @@
+"""A cancellation promotes the oldest waiting user and drops stale entries"""
+
+from datetime import date
+
+DAY = date(2030, 1, 7)
+
+
+def _join_waitlist(client, seed, service, user):
+    response = client.post(
+        "/waitlist",
+        json={"service_id": service.id, "date": DAY.isoformat(), "start_time": "06:00"},
+        headers=seed.headers(user),
+    )
+    assert response.status_code == 201
+
+
+def _statuses(client, seed, user) -> list[str]:
+    page = client.get("/bookings/mine", headers=seed.headers(user)).json()
+    return [item["status"] for item in page["items"]]
+
+
+def test_promotion_is_first_in_first_out(client, seed):
+    holder, first, second = seed.user(), seed.user(), seed.user()
+    service = seed.service()
+    (slot,) = seed.slots(service, DAY, 1, capacity=1)
+    booking = seed.booking(holder, slot)
+    _join_waitlist(client, seed, service, first)
+    _join_waitlist(client, seed, service, second)
+
+    response = client.delete(f"/bookings/{booking.id}", headers=seed.headers(holder))
+    assert response.status_code == 200
+
+    assert _statuses(client, seed, first) == ["confirmed"]
+    assert _statuses(client, seed, second) == []
+    (entry,) = client.get("/waitlist/mine", headers=seed.headers(second)).json()
+    assert entry["position"] == 1
+
+
+def test_promotion_drops_entries_of_users_who_already_booked(client, seed):
+    holder, booked, waiting = seed.user(), seed.user(), seed.user()
+    service = seed.service()
+    (slot,) = seed.slots(service, DAY, 1, capacity=1)
+    booking = seed.booking(holder, slot)
+    _join_waitlist(client, seed, service, booked)
+    _join_waitlist(client, seed, service, waiting)
+    # Booked behind the waitlist's back (e.g. by an admin)
+    seed.booking(booked, slot)
+
+    response = client.delete(f"/bookings/{booking.id}", headers=seed.headers(holder))
+    assert response.status_code == 200
+
+    assert _statuses(client, seed, waiting) == ["confirmed"]
+    assert client.get("/waitlist/mine", headers=seed.headers(booked)).json() == []
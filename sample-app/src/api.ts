@@ -15,6 +15,26 @@ const getAuthToken = (): string | null => {
   return localStorage.getItem('accessToken');
 };
 
+// Remember when we last wrote, so the next reads skip a lagging read replica
+const LAST_WRITE_KEY = 'lastWrite';
+
+const rememberWrite = (response: Response) => {
+  const lastWrite = response.headers.get('X-Last-Write');
+  if (lastWrite) {
+    localStorage.setItem(LAST_WRITE_KEY, lastWrite);
+  }
+};
+
+// Helper function to build headers for reads that must see our own writes
+const readHeaders = (token: string): Record<string, string> => {
+  const headers: Record<string, string> = { 'Authorization': `Bearer ${token}` };
+  const lastWrite = localStorage.getItem(LAST_WRITE_KEY);
+  if (lastWrite) {
+    headers['X-Last-Write'] = lastWrite;
+  }
+  return headers;
+};
+
 // Helper function to handle API errors
 const handleResponse = async (response: Response) => {
   if (!response.ok) {
@@ -24,6 +44,31 @@ const handleResponse = async (response: Response) => {
   return response.json();
 };
 
+// Page size used when following next_cursor (the API allows up to 200)
+const PAGE_LIMIT = 200;
+
+// Helper function to fetch every page of a cursor-paginated list endpoint
+const fetchAllPages = async <T>(path: string, token: string): Promise<T[]> => {
+  const items: T[] = [];
+  let cursor: string | null = null;
+
+  do {
+    const params = new URLSearchParams({ limit: String(PAGE_LIMIT) });
+    if (cursor) {
+      params.set('cursor', cursor);
+    }
+
+    const response = await fetch(`${API_BASE_URL}${path}?${params}`, {
+      headers: readHeaders(token),
+    });
+    const data: { items: T[]; next_cursor: string | null } = await handleResponse(response);
+    items.push(...data.items);
+    cursor = data.next_cursor;
+  } while (cursor);
+
+  return items;
+};
+
 // Auth API
 export const login = async (credentials: LoginCredentials): Promise<{ user: User; accessToken: string; refreshToken: string }> => {
   const response = await fetch(`${API_BASE_URL}/auth/login`, {
@@ -75,6 +120,7 @@ export const logout = async (): Promise<void> => {
   localStorage.removeItem('accessToken');
   localStorage.removeItem('refreshToken');
   localStorage.removeItem('user');
+  localStorage.removeItem(LAST_WRITE_KEY);
 };
 
 // Services API
@@ -152,6 +198,7 @@ export const createBooking = async (
       start_time: startTime,
     }),
   });
+  rememberWrite(response);
   
   return handleResponse(response);
 };
@@ -162,13 +209,7 @@ export const getMyBookings = async (): Promise<Booking[]> => {
     throw new Error('Not authenticated');
   }
 
-  const response = await fetch(`${API_BASE_URL}/bookings/mine`, {
-    headers: {
-      'Authorization': `Bearer ${token}`,
-    },
-  });
-  
-  return handleResponse(response);
+  return fetchAllPages<Booking>('/bookings/mine', token);
 };
 
 export const cancelBooking = async (bookingId: number): Promise<void> => {
@@ -183,6 +224,7 @@ export const cancelBooking = async (bookingId: number): Promise<void> => {
       'Authorization': `Bearer ${token}`,
     },
   });
+  rememberWrite(response);
   
   if (!response.ok) {
     const error = await response.json().catch(() => ({ detail: 'Failed to cancel booking' }));
@@ -197,11 +239,5 @@ export const getAllBookings = async (): Promise<Booking[]> => {
     throw new Error('Not authenticated');
   }
 
-  const response = await fetch(`${API_BASE_URL}/admin/bookings`, {
-    headers: {
-      'Authorization': `Bearer ${token}`,
-    },
-  });
-  
-  return handleResponse(response);
+  return fetchAllPages<Booking>('/admin/bookings', token);
 };